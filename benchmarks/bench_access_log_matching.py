@@ -0,0 +1,141 @@
+"""
+Benchmark del emparejamiento acceso → accessLog.
+
+Compara las versiones cuadráticas originales de
+`validate_missing_access_log` / `validate_sp_obligations` con las
+implementaciones actuales sobre trazas sintéticas de 10k–100k eventos.
+
+Uso:
+    python -m benchmarks.bench_access_log_matching [--sizes 10000 50000 100000]
+"""
+
+import argparse
+import time
+from datetime import datetime, timedelta
+
+from gdpr.sticky_policies import StickyPolicy
+from gdpr.validators.phase4_accountability import validate_missing_access_log
+from gdpr.validators.sticky_policy import validate_sp_obligations
+from gdpr.vocabulary import GDPR_EVENTS
+
+ACTIVITIES = [f"activity_{i}" for i in range(16)]
+
+# Por encima de este tamaño las versiones O(n²) tardan demasiado
+MAX_QUADRATIC_SIZE = 20000
+
+
+class SyntheticTrace(list):
+    def __init__(self, events):
+        super().__init__(events)
+        self.attributes = {"concept:name": "synthetic"}
+
+
+def build_synthetic_trace(n_events, missing_every=50):
+    """
+    Traza de `n_events` eventos: accesos seguidos de su accessLog,
+    omitiendo uno de cada `missing_every` logs.
+    """
+    t0 = datetime(2024, 1, 1)
+    events = []
+    i = 0
+
+    while len(events) < n_events:
+        ts = t0 + timedelta(minutes=i)
+        activity = ACTIVITIES[i % len(ACTIVITIES)]
+
+        events.append({
+            "concept:name": activity,
+            "time:timestamp": ts,
+            "gdpr:access": True,
+        })
+
+        if i % missing_every:
+            events.append({
+                "concept:name": GDPR_EVENTS["ACCESS_LOG"],
+                "time:timestamp": ts,
+                "gdpr:related_activity": activity,
+            })
+        i += 1
+
+    return SyntheticTrace(events[:n_events])
+
+
+# ============================================================
+# VERSIONES ORIGINALES (O(n²))
+# ============================================================
+
+def quadratic_missing_access_log(trace):
+    access_events = [e for e in trace if e.get("gdpr:access")]
+    access_logs = [
+        e for e in trace
+        if e["concept:name"] == GDPR_EVENTS["ACCESS_LOG"]
+    ]
+
+    missing = 0
+    for access in access_events:
+        if not [
+            log for log in access_logs
+            if log["time:timestamp"] >= access["time:timestamp"]
+            and log.get("gdpr:related_activity") == access["concept:name"]
+        ]:
+            missing += 1
+    return missing
+
+
+def quadratic_sp_obligations(trace):
+    missing = 0
+    for event in trace:
+        if not event.get("gdpr:access"):
+            continue
+        if not any(
+            e["concept:name"] == "gdpr:accessLog"
+            and e["time:timestamp"] >= event["time:timestamp"]
+            for e in trace
+        ):
+            missing += 1
+    return missing
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10000, 20000, 50000, 100000]
+    )
+    args = parser.parse_args()
+
+    sp = StickyPolicy(data_id="synthetic", obligations={"log_access"})
+
+    print(f"{'events':>8} | {'rule':<22} | {'O(n²) s':>9} | {'actual s':>9}")
+    print("-" * 58)
+
+    for size in args.sizes:
+        trace = build_synthetic_trace(size)
+
+        rules = [
+            ("missing_access_log", quadratic_missing_access_log,
+             lambda t: validate_missing_access_log(t)),
+            ("sp_missing_access_log", quadratic_sp_obligations,
+             lambda t: validate_sp_obligations(t, sp)),
+        ]
+
+        for label, reference, current in rules:
+            result, t_new = timed(current, trace)
+
+            if size <= MAX_QUADRATIC_SIZE:
+                expected, t_old = timed(reference, trace)
+                assert expected == len(result), label
+                old = f"{t_old:9.3f}"
+            else:
+                old = f"{'-':>9}"
+
+            print(f"{size:>8} | {label:<22} | {old} | {t_new:9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Benchmark del importador CSV.
+
+Genera un CSV sintético (por defecto 10M filas) y mide:
+- el importador original (groupby + iterrows), solo hasta
+  `MAX_REFERENCE_ROWS` filas
+- `CSVImporter.load` (vectorizado, log completo en memoria)
+- `CSVImporter.iter_traces` (lectura por bloques)
+
+Uso:
+    python -m benchmarks.bench_csv_import [--rows 10000000] [--path log.csv]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from gdpr.importers.csv_importer import CSVImporter
+
+ACTIVITIES = np.array([f"activity_{i}" for i in range(16)])
+
+# Por encima de este tamaño el importador original tarda demasiado
+MAX_REFERENCE_ROWS = 200_000
+# Por encima de este tamaño el log completo no cabe cómodamente en RAM
+MAX_FULL_LOAD_ROWS = 2_000_000
+
+
+def write_synthetic_csv(path, n_rows, events_per_case=20, block=1_000_000):
+    """
+    CSV agrupado por case_id con `events_per_case` eventos por caso,
+    escrito por bloques para no materializar las 10M filas.
+    """
+    t0 = np.datetime64("2024-01-01T00:00:00")
+    header = True
+
+    for start in range(0, n_rows, block):
+        rows = np.arange(start, min(start + block, n_rows))
+        timestamps = t0 + rows.astype("timedelta64[m]")
+
+        pd.DataFrame({
+            "case_id": rows // events_per_case,
+            "activity": ACTIVITIES[rows % len(ACTIVITIES)],
+            "timestamp": np.datetime_as_string(timestamps, unit="s"),
+            "gdpr_access": (rows % 3 == 0).astype(int),
+        }).to_csv(path, mode="w" if header else "a", header=header, index=False)
+        header = False
+
+
+def reference_load(path):
+    df = pd.read_csv(path)
+    n_events = 0
+
+    for _, group in df.groupby("case_id"):
+        for _, row in group.iterrows():
+            datetime.fromisoformat(row["timestamp"])
+            n_events += 1
+
+    return n_events
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--path", default=None)
+    args = parser.parse_args()
+
+    path = args.path or os.path.join(tempfile.gettempdir(), "bench_log.csv")
+
+    if not os.path.exists(path):
+        _, t = timed(write_synthetic_csv, path, args.rows)
+        print(f"CSV sintético ({args.rows} filas) generado en {t:.1f}s: {path}")
+
+    importer = CSVImporter()
+
+    print(f"{'loader':<24} | {'events':>10} | {'s':>8}")
+    print("-" * 48)
+
+    if args.rows <= MAX_REFERENCE_ROWS:
+        n, t = timed(reference_load, path)
+        print(f"{'groupby + iterrows':<24} | {n:>10} | {t:8.2f}")
+
+    if args.rows <= MAX_FULL_LOAD_ROWS:
+        log, t = timed(importer.load, path)
+        n = sum(len(trace) for trace in log)
+        print(f"{'CSVImporter.load':<24} | {n:>10} | {t:8.2f}")
+        del log
+
+    n, t = timed(
+        lambda p: sum(len(trace) for trace in importer.iter_traces(p)), path
+    )
+    print(f"{'CSVImporter.iter_traces':<24} | {n:>10} | {t:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
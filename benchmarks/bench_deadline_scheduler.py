@@ -0,0 +1,87 @@
+"""
+Benchmark del emparejamiento de plazos (brechas y derechos ARCO).
+
+Compara el emparejamiento anterior (cada solicitud recorre todas las
+respuestas posteriores: O(n²)) con `DeadlineScheduler` en trazas
+sintéticas con `n` brechas y sus notificaciones.
+
+Uso:
+    python -m benchmarks.bench_deadline_scheduler
+"""
+
+import random
+import time
+from datetime import datetime, timedelta
+
+from pm4py.objects.log.obj import Event, Trace
+
+from gdpr.trace_index import invalidate_trace_index
+from gdpr.validators.engine import BreachNotificationRule, FusedValidator
+from gdpr.validators.phase5_breach import validate_breach_notification_time
+from gdpr.vocabulary import GDPR_EVENTS
+
+
+def make_trace(n, seed=0):
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    trace = Trace()
+    # una brecha cada 4 días; el 10% sin notificar y el resto entre
+    # 1 y 100 horas después (algunas fuera de plazo)
+    for i in range(n):
+        t = start + timedelta(days=4 * i)
+        trace.append(Event({
+            "concept:name": GDPR_EVENTS["BREACH"], "time:timestamp": t
+        }))
+        if rng.random() < 0.9:
+            trace.append(Event({
+                "concept:name": GDPR_EVENTS["NOTIFY_BREACH"],
+                "time:timestamp": t + timedelta(hours=rng.randint(1, 100)),
+            }))
+    return trace
+
+
+def quadratic_breach_notification(trace):
+    # implementación anterior
+    detects = [e for e in trace if e["concept:name"] == GDPR_EVENTS["BREACH"]]
+    notifies = [
+        e for e in trace if e["concept:name"] == GDPR_EVENTS["NOTIFY_BREACH"]
+    ]
+
+    violations = []
+    for detect in detects:
+        detect_ts = detect["time:timestamp"]
+        related = [n for n in notifies if n["time:timestamp"] > detect_ts]
+        if not related:
+            violations.append(("missing_breach_notification", detect))
+        elif related[0]["time:timestamp"] > detect_ts + timedelta(hours=72):
+            violations.append(("late_breach_notification", detect))
+    return violations
+
+
+def timed(fn, trace):
+    invalidate_trace_index(trace)
+    start = time.perf_counter()
+    result = fn(trace)
+    return time.perf_counter() - start, len(result)
+
+
+def main():
+    print(f"{'n':>6} | {'O(n²)':>9} | {'phase5':>9} | {'motor':>9} | violaciones")
+    print("-" * 60)
+
+    for n in (100, 1_000, 5_000, 20_000):
+        trace = make_trace(n)
+
+        old, expected = timed(quadratic_breach_notification, trace)
+        new, found = timed(validate_breach_notification_time, trace)
+        fused, found_fused = timed(
+            lambda t: FusedValidator(t, (BreachNotificationRule,)).run(t),
+            trace
+        )
+        assert found == found_fused == expected
+
+        print(f"{n:>6} | {old:>9.3f} | {new:>9.3f} | {fused:>9.3f} | {found}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Benchmark de la inserción de accessLog en el generador.
+
+Compara la versión original de `insert_access_logs_and_history`
+(un `trace.insert` por acceso, O(n²)) con la actual (una sola
+pasada) sobre trazas pm4py sintéticas de 10k–200k eventos.
+
+Uso:
+    python -m benchmarks.bench_generator_insertions [--sizes 10000 50000]
+"""
+
+import argparse
+import time
+from datetime import datetime, timedelta
+
+from pm4py.objects.log.obj import Event, Trace
+
+from gdpr.generators import (
+    create_access_history_update_event,
+    create_access_log_event,
+    insert_access_logs_and_history
+)
+
+# Por encima de este tamaño la versión O(n²) tarda demasiado
+MAX_QUADRATIC_SIZE = 100000
+
+
+def build_synthetic_trace(n_events, access_every=2):
+    t0 = datetime(2024, 1, 1)
+    return Trace([
+        Event({
+            "concept:name": f"activity_{i % 16}",
+            "time:timestamp": t0 + timedelta(minutes=i),
+            "gdpr:access": i % access_every == 0,
+            "gdpr:actor": "controller",
+            "gdpr:purpose": "service_provision",
+        })
+        for i in range(n_events)
+    ])
+
+
+# ============================================================
+# VERSIÓN ORIGINAL (O(n²))
+# ============================================================
+
+def quadratic_insert_access_logs(trace):
+    i = 0
+    last_log_ts = None
+
+    while i < len(trace):
+        if trace[i].get("gdpr:access"):
+            access_log = create_access_log_event(trace[i])
+            trace.insert(i + 1, access_log)
+            last_log_ts = access_log["time:timestamp"]
+            i += 1
+        i += 1
+
+    if last_log_ts:
+        trace.append(
+            create_access_history_update_event(
+                last_log_ts + timedelta(seconds=1)
+            )
+        )
+
+
+def timed(fn, trace):
+    start = time.perf_counter()
+    fn(trace)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10000, 50000, 100000, 200000]
+    )
+    args = parser.parse_args()
+
+    print(f"{'events':>8} | {'O(n²) s':>9} | {'actual s':>9}")
+    print("-" * 34)
+
+    for size in args.sizes:
+        current = build_synthetic_trace(size)
+        t_new = timed(insert_access_logs_and_history, current)
+
+        if size <= MAX_QUADRATIC_SIZE:
+            reference = build_synthetic_trace(size)
+            t_old = timed(quadratic_insert_access_logs, reference)
+            assert [e["concept:name"] for e in reference] == [
+                e["concept:name"] for e in current
+            ]
+            old = f"{t_old:9.3f}"
+        else:
+            old = f"{'-':>9}"
+
+        print(f"{size:>8} | {old} | {t_new:9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Benchmark de la revalidación incremental.
+
+Simula la llegada diaria de eventos a casos existentes: cada traza
+no conforme del log Sepsis se divide en un prefijo ya procesado
+(`--prefix`, fracción de eventos) y un sufijo nuevo. Compara:
+
+- revalidación completa: Sticky Policy + `validate_trace` de cada
+  traza completa (lo que exige hoy re-ejecutar el pipeline)
+- incremental en memoria: `IncrementalValidator.extend(sufijo)`
+- incremental con checkpoints en SQLite: carga del caso, `extend`
+  y escritura (`IncrementalLogValidator`), con todos los casos
+  creciendo y con solo una fracción de ellos (`--active`); el resto
+  llega sin eventos nuevos
+
+Uso:
+    python -m benchmarks.bench_incremental_validation [--prefix 0.8] [--repeat 5] [--active 0.1]
+"""
+
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from pm4py.objects.log.obj import Trace
+
+from gdpr.importers import load_event_log
+from gdpr.pipelines import build_compliant_trace, build_non_compliant_trace
+from gdpr.sticky_policies import build_sticky_policy_from_trace
+from gdpr.trace_index import invalidate_trace_index
+from gdpr.validators.incremental import (
+    IncrementalLogValidator,
+    IncrementalValidator,
+)
+from gdpr.validators.validators import validate_trace
+
+LOG_PATH = "data/input/Sepsis Cases - Event Log.xes.gz"
+
+
+def build_traces(repeat):
+    rng = random.Random(0)
+    traces = []
+    for _ in range(repeat):
+        for trace in load_event_log(LOG_PATH):
+            compliant = build_compliant_trace(trace, rng=rng)
+            traces.append(build_non_compliant_trace(compliant, rng=rng))
+    for i, trace in enumerate(traces):
+        trace.attributes["concept:name"] = f"case_{i}"
+        invalidate_trace_index(trace)
+    return traces
+
+
+def full_revalidation(traces):
+    for trace in traces:
+        invalidate_trace_index(trace)
+        trace.attributes["gdpr:sticky_policy"] = (
+            build_sticky_policy_from_trace(trace)
+        )
+        validate_trace(trace)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--prefix", type=float, default=0.8)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--active", type=float, default=0.1)
+    args = parser.parse_args()
+
+    traces = build_traces(args.repeat)
+    splits = [int(len(t) * args.prefix) for t in traces]
+    n_events = sum(len(t) for t in traces)
+    n_new = sum(len(t) - k for t, k in zip(traces, splits))
+
+    print(f"{len(traces)} casos, {n_events} eventos, {n_new} nuevos")
+
+    start = time.perf_counter()
+    full_revalidation(traces)
+    full = time.perf_counter() - start
+    print(f"revalidación completa       : {full:.2f} s")
+
+    states = []
+    for trace, k in zip(traces, splits):
+        state = IncrementalValidator(trace.attributes)
+        state.extend(trace[:k])
+        states.append(state)
+
+    start = time.perf_counter()
+    for state, trace, k in zip(states, traces, splits):
+        state.extend(trace[k:])
+    elapsed = time.perf_counter() - start
+    print(f"incremental (memoria)       : {elapsed:.2f} s "
+          f"({full / elapsed:.1f}x)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "checkpoints.sqlite")
+
+        with IncrementalLogValidator(path) as store:
+            for trace, k in zip(traces, splits):
+                store.extend(
+                    trace.attributes["concept:name"], trace[:k],
+                    trace.attributes
+                )
+
+        shutil.copyfile(path, path + ".base")
+
+        start = time.perf_counter()
+        with IncrementalLogValidator(path) as store:
+            for trace in traces:
+                store.update(trace)
+        elapsed = time.perf_counter() - start
+        print(f"incremental (checkpoints)   : {elapsed:.2f} s "
+              f"({full / elapsed:.1f}x)")
+
+        # solo una fracción de casos recibe eventos nuevos
+        shutil.copyfile(path + ".base", path)
+        rng = random.Random(1)
+        active = set(rng.sample(range(len(traces)),
+                                int(len(traces) * args.active)))
+        batch = [
+            trace if i in active
+            else Trace(trace[:k], attributes=trace.attributes)
+            for i, (trace, k) in enumerate(zip(traces, splits))
+        ]
+
+        start = time.perf_counter()
+        with IncrementalLogValidator(path) as store:
+            for trace in batch:
+                store.update(trace)
+        elapsed = time.perf_counter() - start
+        print(f"checkpoints, {args.active:.0%} activos    : {elapsed:.2f} s "
+              f"({full / elapsed:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
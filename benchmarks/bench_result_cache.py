@@ -0,0 +1,72 @@
+"""
+Benchmark de la caché de resultados por traza.
+
+Ejecuta `run_log` sobre el log Sepsis sin caché, con la caché vacía,
+con la caché completa y con una fracción de casos modificados
+(`--changed`), simulando la re-ejecución nocturna de un log que
+apenas cambia.
+
+Uso:
+    python -m benchmarks.bench_result_cache [--changed 0.05] [--workers 1]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from gdpr.importers import load_event_log
+from gdpr.pipelines import run_log
+from gdpr.result_cache import ResultCache
+
+LOG_PATH = "data/input/Sepsis Cases - Event Log.xes.gz"
+
+
+def load_traces(changed=0.0, seed=0):
+    traces = list(load_event_log(LOG_PATH))
+
+    rng = random.Random(seed)
+    for trace in rng.sample(traces, int(len(traces) * changed)):
+        trace[0]["org:group"] = "changed"
+
+    return traces
+
+
+def timed(traces, workers, cache=None):
+    start = time.perf_counter()
+    run_log(traces, workers=workers, chunksize=8, seed=0, cache=cache)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--changed", type=float, default=0.05)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cache.sqlite")
+
+        print(f"{'run':<28} | {'s':>7} | {'processed':>9}")
+        print("-" * 52)
+
+        elapsed = timed(load_traces(), args.workers)
+        print(f"{'sin caché':<28} | {elapsed:>7.2f} | {'todas':>9}")
+
+        for label, changed in (
+            ("caché vacía", 0.0),
+            ("caché completa", 0.0),
+            (f"{args.changed:.0%} de casos cambiados", args.changed),
+        ):
+            traces = load_traces(changed)
+            with ResultCache(path) as cache:
+                elapsed = timed(traces, args.workers, cache)
+                processed = cache.misses
+            print(f"{label:<28} | {elapsed:>7.2f} | {processed:>9}")
+
+        print(f"\nTamaño de la caché: {os.path.getsize(path) / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Benchmark de memoria de la Sticky Policy.
+
+Compara el historial de accesos original (una lista de dicts de
+cinco claves por acceso) y los terceros como dicts con
+`AccessHistory` y `ThirdPartyRecord`, midiendo con tracemalloc la
+memoria retenida para historiales sintéticos de 100k–1M accesos.
+
+Uso:
+    python -m benchmarks.bench_sticky_policy_memory [--sizes 100000 1000000]
+"""
+
+import argparse
+import tracemalloc
+from datetime import datetime, timedelta
+
+from gdpr.sticky_policies import AccessHistory, ThirdPartyRecord
+
+ACCESS = ["read", "write", "share", "delete"]
+PURPOSES = [f"purpose_{i}" for i in range(8)]
+ACTORS = [f"actor_{i}" for i in range(64)]
+ACTIVITIES = [f"activity_{i}" for i in range(32)]
+
+N_THIRD_PARTIES = 10000
+
+
+def synthetic_accesses(n):
+    """
+    Valores de los accesos (los timestamps y cadenas ya existen en
+    los eventos: no cuentan en la medida).
+    """
+    t0 = datetime(2024, 1, 1)
+    return [
+        (
+            t0 + timedelta(seconds=i),
+            ACCESS[i % len(ACCESS)],
+            PURPOSES[i % len(PURPOSES)],
+            ACTORS[i % len(ACTORS)],
+            ACTIVITIES[i % len(ACTIVITIES)],
+        )
+        for i in range(n)
+    ]
+
+
+# ============================================================
+# VERSIONES ORIGINALES (dicts)
+# ============================================================
+
+def dict_history(accesses):
+    return [
+        {
+            "timestamp": ts,
+            "access": access,
+            "purpose": purpose,
+            "actor": actor,
+            "activity": activity,
+        }
+        for ts, access, purpose, actor, activity in accesses
+    ]
+
+
+def dict_third_parties(n):
+    return {
+        f"tp_{i}": {
+            "role": "processor",
+            "purposes": set(),
+            "permissions": set(),
+            "active": True,
+            "shared_timestamp": None,
+            "retention_until": None,
+            "country": None,
+            "transfer_mechanism": None,
+            "legal_basis": None,
+            "own_legal_basis": False,
+            "notified_of_erasure": False,
+        }
+        for i in range(n)
+    }
+
+
+# ============================================================
+# VERSIONES COMPACTAS
+# ============================================================
+
+def compact_history(accesses):
+    history = AccessHistory()
+    for entry in accesses:
+        history.add(*entry)
+    return history
+
+
+def compact_third_parties(n):
+    return {f"tp_{i}": ThirdPartyRecord() for i in range(n)}
+
+
+def measure(fn, *args):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = fn(*args)
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del result
+    return retained
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[100000, 1000000]
+    )
+    args = parser.parse_args()
+
+    print(f"{'accesses':>9} | {'dicts MB':>9} | {'compact MB':>10} | {'ratio':>6}")
+    print("-" * 45)
+
+    for size in args.sizes:
+        accesses = synthetic_accesses(size)
+        original = measure(dict_history, accesses)
+        compact = measure(compact_history, accesses)
+        print(
+            f"{size:>9} | {original / 1e6:>9.1f} | {compact / 1e6:>10.1f} "
+            f"| {original / compact:>5.1f}x"
+        )
+
+    original = measure(dict_third_parties, N_THIRD_PARTIES)
+    compact = measure(compact_third_parties, N_THIRD_PARTIES)
+    print(
+        f"\n{N_THIRD_PARTIES} terceros: dicts {original / 1e6:.1f} MB, "
+        f"ThirdPartyRecord {compact / 1e6:.1f} MB "
+        f"({original / compact:.1f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main()
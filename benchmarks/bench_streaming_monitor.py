@@ -0,0 +1,98 @@
+"""
+Benchmark del monitor de cumplimiento en streaming.
+
+Intercala por timestamp los eventos de las trazas no conformes del
+log Sepsis (como llegarían en tiempo real) y los pasa uno a uno por
+`ComplianceMonitor.feed`. Compara con la validación batch
+(`validate_trace` sin Sticky Policy) de todas las trazas y muestra el
+máximo de casos abiertos.
+
+Uso:
+    python -m benchmarks.bench_streaming_monitor [--repeat 1] [--max-cases 100000]
+"""
+
+import argparse
+import heapq
+import random
+import time
+from collections import Counter
+
+from gdpr.importers import load_event_log
+from gdpr.monitor import ComplianceMonitor
+from gdpr.pipelines import build_compliant_trace, build_non_compliant_trace
+from gdpr.trace_index import invalidate_trace_index
+from gdpr.validators.validators import validate_trace
+
+LOG_PATH = "data/input/Sepsis Cases - Event Log.xes.gz"
+
+
+def build_traces(repeat):
+    rng = random.Random(0)
+    traces = []
+    for _ in range(repeat):
+        for trace in load_event_log(LOG_PATH):
+            compliant = build_compliant_trace(trace, rng=rng)
+            traces.append(build_non_compliant_trace(compliant, rng=rng))
+    for i, trace in enumerate(traces):
+        trace.attributes["concept:name"] = f"case_{i}"
+        trace.attributes.pop("gdpr:sticky_policy", None)
+        invalidate_trace_index(trace)
+    return traces
+
+
+def stream(traces):
+    # eventos de todos los casos en orden de timestamp
+    return heapq.merge(
+        *(
+            [(e["time:timestamp"], i, e) for e in trace]
+            for i, trace in enumerate(traces)
+        ),
+        key=lambda item: item[:2],
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--max-cases", type=int, default=100_000)
+    args = parser.parse_args()
+
+    traces = build_traces(args.repeat)
+    events = list(stream(traces))
+    print(f"{len(traces)} casos, {len(events)} eventos")
+
+    start = time.perf_counter()
+    batch = Counter()
+    for trace in traces:
+        batch.update(v["type"] for v in validate_trace(trace))
+    elapsed = time.perf_counter() - start
+    print(f"batch (validate_trace) : {elapsed:.2f} s")
+
+    monitor = ComplianceMonitor(max_cases=args.max_cases)
+    found = Counter()
+    peak = 0
+
+    start = time.perf_counter()
+    for _, i, event in events:
+        trace = traces[i]
+        for v in monitor.feed(
+            trace.attributes["concept:name"], event, trace.attributes
+        ):
+            found[v["type"]] += 1
+        peak = max(peak, len(monitor))
+    for v in monitor.close_all():
+        found[v["type"]] += 1
+    elapsed = time.perf_counter() - start
+
+    print(f"monitor (feed)         : {elapsed:.2f} s "
+          f"({len(events) / elapsed:,.0f} eventos/s, "
+          f"máx. {peak} casos abiertos)")
+
+    print(f"\n{'violación':<36} | {'batch':>7} | {'monitor':>7}")
+    print("-" * 56)
+    for kind in sorted(batch.keys() | found.keys()):
+        print(f"{kind:<36} | {batch[kind]:>7} | {found[kind]:>7}")
+
+
+if __name__ == "__main__":
+    main()
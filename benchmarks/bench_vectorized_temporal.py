@@ -0,0 +1,100 @@
+"""
+Benchmark de las reglas temporales vectorizadas.
+
+Compara los validadores de expiración, retirada, restricción,
+borrado, brechas y derechos (un bucle Python por evento y traza)
+con `validate_temporal_log` sobre el log compacto, con el log
+Sepsis procesado (trazas conformes y no conformes) replicado
+`--repeat` veces.
+
+Uso:
+    python -m benchmarks.bench_vectorized_temporal [--repeat 1 10 50]
+"""
+
+import argparse
+import random
+import time
+
+from gdpr.compact import CompactLog
+from gdpr.importers import load_event_log
+from gdpr.pipelines import build_compliant_trace, build_non_compliant_trace
+from gdpr.validators.phase2_processing_loop import (
+    validate_access_after_consent_expiration,
+    validate_withdrawn_consent
+)
+from gdpr.validators.phase3_rights import (
+    validate_access_after_erasure,
+    validate_processing_restriction
+)
+from gdpr.validators.phase5_breach import validate_breach_notification_time
+from gdpr.validators.phase6_rights_arco import validate_data_subject_rights
+from gdpr.validators.vectorized import validate_temporal_log
+
+LOG_PATH = "data/input/Sepsis Cases - Event Log.xes.gz"
+
+PYTHON_RULES = (
+    validate_access_after_consent_expiration,
+    validate_withdrawn_consent,
+    validate_processing_restriction,
+    validate_access_after_erasure,
+    validate_breach_notification_time,
+    validate_data_subject_rights,
+)
+
+
+def build_traces(seed=0):
+    rng = random.Random(seed)
+    traces = []
+
+    for trace in load_event_log(LOG_PATH):
+        compliant = build_compliant_trace(trace, rng=rng)
+        traces.append(compliant)
+        traces.append(build_non_compliant_trace(compliant, rng=rng))
+
+    return traces
+
+
+def python_rules(views):
+    count = 0
+    for trace in views:
+        for rule in PYTHON_RULES:
+            count += len(rule(trace))
+    return count
+
+
+def vectorized_rules(log):
+    return sum(len(v) for v in validate_temporal_log(log).values())
+
+
+def timed(fn, arg):
+    start = time.perf_counter()
+    result = fn(arg)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, nargs="+", default=[1, 10])
+    args = parser.parse_args()
+
+    traces = build_traces()
+
+    print(f"{'traces':>8} | {'events':>9} | {'python s':>9} | {'numpy s':>9}")
+    print("-" * 45)
+
+    for repeat in args.repeat:
+        log = CompactLog.from_traces(traces * repeat)
+        views = list(log)
+
+        t_python, expected = timed(python_rules, views)
+        t_numpy, found = timed(vectorized_rules, log)
+        assert expected == found, (expected, found)
+
+        print(
+            f"{len(log):>8} | {log.num_events:>9} | "
+            f"{t_python:9.3f} | {t_numpy:9.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,427 @@
+# gdpr/compact.py
+
+"""
+Representación compacta (struct-of-arrays) de un event log.
+
+En lugar de un dict por evento, el log guarda arrays NumPy por
+columna, concatenados para todas las trazas (offsets por caso):
+
+- activity / related_activity: códigos int sobre un codebook común
+- timestamp: int64 (nanosegundos desde epoch)
+- flags: bits para gdpr:access, gdpr:event y bloqueo
+- operation / purpose / data_scope / blocked_reason: enums pequeños
+
+El resto de atributos (poco frecuentes o no categóricos) se guarda
+de forma dispersa por columna. `CompactTrace` y `CompactEvent`
+presentan la API tipo dict que usan los validadores, de modo que
+`validate_trace(log[i])` funciona sin reconstruir objetos pm4py.
+
+Uso:
+    log = CompactLog.from_traces(load_event_log(path, lazy=True))
+    violations = validate_trace(log[0])
+"""
+
+from collections.abc import MutableMapping, Sequence
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+from pm4py.objects.log.obj import Event, EventLog, Trace
+
+
+# ============================================================
+# COLUMNAS
+# ============================================================
+
+ACCESS = 1          # valor de gdpr:access
+ACCESS_SET = 2      # gdpr:access presente
+GDPR_EVENT = 4      # valor de gdpr:event
+GDPR_EVENT_SET = 8  # gdpr:event presente
+BLOCKED = 16        # gdpr:blocked_reason presente
+
+# atributo booleano -> (bit de valor, bit de presencia)
+FLAG_ATTRIBUTES = {
+    "gdpr:access": (ACCESS, ACCESS_SET),
+    "gdpr:event": (GDPR_EVENT, GDPR_EVENT_SET),
+}
+
+# atributo categórico -> (columna, codebook)
+ENUM_ATTRIBUTES = {
+    "concept:name": ("activity", "activity"),
+    "gdpr:related_activity": ("related_activity", "activity"),
+    "gdpr:operation": ("operation", "operation"),
+    "gdpr:purpose": ("purpose", "purpose"),
+    "gdpr:data_scope": ("data_scope", "data_scope"),
+    "gdpr:blocked_reason": ("blocked_reason", "blocked_reason"),
+}
+
+TIMESTAMP = "time:timestamp"
+
+MISSING = -1
+MISSING_TIMESTAMP = np.iinfo(np.int64).min
+
+_EPOCH_UTC = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_EPOCH_NAIVE = datetime(1970, 1, 1)
+
+
+class Codebook:
+    """
+    Valores categóricos <-> códigos enteros consecutivos.
+    """
+
+    def __init__(self):
+        self.values = []
+        self.codes = {}
+
+    def encode(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def decode(self, code):
+        return self.values[code]
+
+    def __len__(self):
+        return len(self.values)
+
+
+def _enum_dtype(codebook):
+    return np.int16 if len(codebook) < np.iinfo(np.int16).max else np.int32
+
+
+def _is_code(value):
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    return True
+
+
+# ============================================================
+# LOG COMPACTO
+# ============================================================
+
+class CompactLog(Sequence):
+
+    def __init__(self):
+        self.codebooks = {
+            name: Codebook() for name in {
+                codebook for _, codebook in ENUM_ATTRIBUTES.values()
+            }
+        }
+        self.trace_attributes = []
+        # atributo -> {posición del evento: valor}
+        self.extras = {}
+        self.aware = None
+
+        self.offsets = np.zeros(1, dtype=np.int64)
+        self.timestamp = np.zeros(0, dtype=np.int64)
+        self.flags = np.zeros(0, dtype=np.uint8)
+        self.columns = {
+            column: np.zeros(0, dtype=np.int16)
+            for column, _ in ENUM_ATTRIBUTES.values()
+        }
+
+    # --------------------------------------------------------
+    # CONSTRUCCIÓN
+    # --------------------------------------------------------
+
+    @classmethod
+    def from_traces(cls, traces):
+        """
+        Construye el log a partir de cualquier iterable de trazas
+        (p.ej. `load_event_log(path, lazy=True)`), sin necesidad de
+        tener el log pm4py completo en memoria.
+        """
+        log = cls()
+
+        offsets = [0]
+        timestamps = []
+        flags = []
+        columns = {column: [] for column in log.columns}
+
+        for trace in traces:
+            log.trace_attributes.append(dict(trace.attributes))
+
+            for event in trace:
+                position = len(timestamps)
+                timestamps.append(log._encode_timestamp(event.get(TIMESTAMP)))
+
+                bits = 0
+                row = dict.fromkeys(columns, MISSING)
+
+                for key, value in event.items():
+                    if key == TIMESTAMP:
+                        continue
+
+                    if key in FLAG_ATTRIBUTES and type(value) is bool:
+                        value_bit, set_bit = FLAG_ATTRIBUTES[key]
+                        bits |= set_bit | (value_bit if value else 0)
+
+                    elif key in ENUM_ATTRIBUTES and _is_code(value):
+                        column, codebook = ENUM_ATTRIBUTES[key]
+                        row[column] = log.codebooks[codebook].encode(value)
+                        if key == "gdpr:blocked_reason":
+                            bits |= BLOCKED
+
+                    else:
+                        log.extras.setdefault(key, {})[position] = value
+
+                flags.append(bits)
+                for column, code in row.items():
+                    columns[column].append(code)
+
+            offsets.append(len(timestamps))
+
+        log.offsets = np.array(offsets, dtype=np.int64)
+        log.timestamp = np.array(timestamps, dtype=np.int64)
+        log.flags = np.array(flags, dtype=np.uint8)
+        log.columns = {
+            column: np.array(
+                values,
+                dtype=_enum_dtype(log.codebooks[ENUM_ATTRIBUTES_BY_COLUMN[column]])
+            )
+            for column, values in columns.items()
+        }
+
+        return log
+
+    def _encode_timestamp(self, ts):
+        if ts is None:
+            return MISSING_TIMESTAMP
+
+        aware = ts.tzinfo is not None
+        if self.aware is None:
+            self.aware = aware
+        elif aware != self.aware:
+            raise ValueError(
+                "El log mezcla timestamps con y sin zona horaria"
+            )
+
+        delta = ts - (_EPOCH_UTC if aware else _EPOCH_NAIVE)
+        return (
+            (delta.days * 86400 + delta.seconds) * 1_000_000
+            + delta.microseconds
+        ) * 1000
+
+    def decode_timestamp(self, ns):
+        if ns == MISSING_TIMESTAMP:
+            return None
+        epoch = _EPOCH_UTC if self.aware else _EPOCH_NAIVE
+        return epoch + timedelta(microseconds=int(ns) // 1000)
+
+    # --------------------------------------------------------
+    # ACCESO
+    # --------------------------------------------------------
+
+    def __len__(self):
+        return len(self.trace_attributes)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return CompactTrace(self, i)
+
+    @property
+    def num_events(self):
+        return len(self.timestamp)
+
+    def code(self, column, value):
+        """
+        Código de `value` en la columna (MISSING si no aparece).
+        """
+        codebook = self.codebooks[ENUM_ATTRIBUTES_BY_COLUMN[column]]
+        return codebook.codes.get(value, MISSING)
+
+    def nbytes(self):
+        """
+        Memoria de los arrays (sin contar codebooks ni extras).
+        """
+        return (
+            self.offsets.nbytes + self.timestamp.nbytes + self.flags.nbytes
+            + sum(column.nbytes for column in self.columns.values())
+        )
+
+    def to_event_log(self):
+        """
+        Reconstruye un EventLog de pm4py (p.ej. para exportar a XES).
+        """
+        log = EventLog()
+        for trace in self:
+            log.append(Trace(
+                [Event(dict(e)) for e in trace],
+                attributes=dict(trace.attributes)
+            ))
+        return log
+
+
+ENUM_ATTRIBUTES_BY_COLUMN = {
+    column: codebook for column, codebook in ENUM_ATTRIBUTES.values()
+}
+_COLUMN_ATTRIBUTES = {
+    column: key for key, (column, _) in ENUM_ATTRIBUTES.items()
+}
+
+
+# ============================================================
+# VISTAS (API tipo pm4py)
+# ============================================================
+
+class CompactTrace(Sequence):
+    """
+    Vista de una traza del log compacto. Los eventos se crean una
+    sola vez por vista, para que las violaciones puedan referenciar
+    eventos por identidad como con pm4py.
+    """
+
+    def __init__(self, log, index):
+        self.log = log
+        self.index = index
+        self.start = int(log.offsets[index])
+        self.end = int(log.offsets[index + 1])
+        self.attributes = log.trace_attributes[index]
+        self._events = None
+
+    @property
+    def events(self):
+        if self._events is None:
+            self._events = [
+                CompactEvent(self.log, i) for i in range(self.start, self.end)
+            ]
+        return self._events
+
+    def __len__(self):
+        return self.end - self.start
+
+    def __getitem__(self, i):
+        return self.events[i]
+
+    def __iter__(self):
+        return iter(self.events)
+
+    # arrays de la traza (vistas, sin copia)
+    def column(self, name):
+        if name == "timestamp":
+            return self.log.timestamp[self.start:self.end]
+        if name == "flags":
+            return self.log.flags[self.start:self.end]
+        return self.log.columns[name][self.start:self.end]
+
+
+class CompactEvent(MutableMapping):
+    """
+    Evento del log compacto con la API de un dict de pm4py.
+    Las escrituras se guardan en las columnas correspondientes.
+    """
+
+    __slots__ = ("log", "position")
+
+    def __init__(self, log, position):
+        self.log = log
+        self.position = position
+
+    def __getitem__(self, key):
+        log, i = self.log, self.position
+
+        if key == TIMESTAMP:
+            value = log.decode_timestamp(log.timestamp[i])
+            if value is None:
+                raise KeyError(key)
+            return value
+
+        if key in FLAG_ATTRIBUTES:
+            value_bit, set_bit = FLAG_ATTRIBUTES[key]
+            bits = int(log.flags[i])
+            if bits & set_bit:
+                return bool(bits & value_bit)
+
+        elif key in ENUM_ATTRIBUTES:
+            column, codebook = ENUM_ATTRIBUTES[key]
+            code = int(log.columns[column][i])
+            if code != MISSING:
+                return log.codebooks[codebook].decode(code)
+
+        values = log.extras.get(key)
+        if values is not None and i in values:
+            return values[i]
+
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        self._delete(key)
+        log, i = self.log, self.position
+
+        if key == TIMESTAMP:
+            log.timestamp[i] = log._encode_timestamp(value)
+
+        elif key in FLAG_ATTRIBUTES and type(value) is bool:
+            value_bit, set_bit = FLAG_ATTRIBUTES[key]
+            log.flags[i] |= set_bit | (value_bit if value else 0)
+
+        elif key in ENUM_ATTRIBUTES and _is_code(value):
+            column, codebook = ENUM_ATTRIBUTES[key]
+            code = log.codebooks[codebook].encode(value)
+            if code > np.iinfo(log.columns[column].dtype).max:
+                log.columns[column] = log.columns[column].astype(np.int32)
+            log.columns[column][i] = code
+            if key == "gdpr:blocked_reason":
+                log.flags[i] |= BLOCKED
+
+        else:
+            log.extras.setdefault(key, {})[i] = value
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        self._delete(key)
+
+    def _delete(self, key):
+        log, i = self.log, self.position
+
+        if key == TIMESTAMP:
+            log.timestamp[i] = MISSING_TIMESTAMP
+        elif key in FLAG_ATTRIBUTES:
+            value_bit, set_bit = FLAG_ATTRIBUTES[key]
+            log.flags[i] &= ~np.uint8(value_bit | set_bit)
+        elif key in ENUM_ATTRIBUTES:
+            column, _ = ENUM_ATTRIBUTES[key]
+            log.columns[column][i] = MISSING
+            if key == "gdpr:blocked_reason":
+                log.flags[i] &= ~np.uint8(BLOCKED)
+
+        values = log.extras.get(key)
+        if values is not None:
+            values.pop(i, None)
+
+    def __iter__(self):
+        log, i = self.log, self.position
+
+        for column, key in _COLUMN_ATTRIBUTES.items():
+            if key == "concept:name" and log.columns[column][i] != MISSING:
+                yield key
+        if log.timestamp[i] != MISSING_TIMESTAMP:
+            yield TIMESTAMP
+
+        bits = int(log.flags[i])
+        for key, (_, set_bit) in FLAG_ATTRIBUTES.items():
+            if bits & set_bit:
+                yield key
+
+        for column, key in _COLUMN_ATTRIBUTES.items():
+            if key != "concept:name" and log.columns[column][i] != MISSING:
+                yield key
+
+        for key, values in log.extras.items():
+            if i in values:
+                yield key
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return str(dict(self))
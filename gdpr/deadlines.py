@@ -0,0 +1,180 @@
+# gdpr/deadlines.py
+
+"""
+Planificador de plazos legales (notificación de brechas en 72 h,
+respuesta a derechos en 30 días).
+
+Cada solicitud abre una obligación con vencimiento; la resuelve la
+primera respuesta (en orden de llegada) con timestamp posterior al
+de la solicitud, como en los validadores batch:
+
+- respuestas anteriores en la llegada pero posteriores en el tiempo:
+  se guardan solo las que superan el timestamp de todas las previas
+  (las únicas candidatas) y se buscan con bisección
+- solicitudes abiertas: heap por instante de apertura; una respuesta
+  resuelve las abiertas antes de su timestamp (O(log n) por
+  obligación)
+- vencimientos: heap global por fecha de vencimiento;
+  `expire(watermark)` devuelve las obligaciones vencidas y aún
+  abiertas
+
+Las obligaciones se agrupan por clave (p.ej. una regla de un caso):
+las respuestas de una clave solo resuelven solicitudes de esa clave.
+"""
+
+import heapq
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any
+
+BREACH_NOTIFICATION_DEADLINE = timedelta(hours=72)
+RIGHT_RESPONSE_DEADLINE = timedelta(days=30)
+
+
+@dataclass(slots=True, eq=False)
+class Obligation:
+    """
+    Solicitud pendiente de respuesta.
+
+    - `response` / `resolved_at`: respuesta que la resuelve (None si
+      sigue abierta)
+    - `overdue`: ya devuelta por `expire` (sigue abierta)
+    """
+
+    key: Any
+    request: Any
+    opened_at: Any
+    due: Any
+    response: Any = None
+    resolved_at: Any = None
+    overdue: bool = False
+
+    @property
+    def is_open(self):
+        return self.resolved_at is None
+
+    @property
+    def late(self):
+        return self.resolved_at is not None and self.resolved_at > self.due
+
+
+class _KeyState:
+    __slots__ = ("open", "answer_times", "answers")
+
+    def __init__(self):
+        # (apertura, nº de orden, obligación)
+        self.open = []
+        # respuestas con timestamp mayor que todas las anteriores
+        self.answer_times = []
+        self.answers = []
+
+
+class DeadlineScheduler:
+    """
+    - `request(key, request, at, deadline)`: abre una obligación (o la
+      devuelve ya resuelta si una respuesta previa es posterior a `at`)
+    - `respond(key, response, at)`: obligaciones que resuelve
+    - `expire(watermark)`: obligaciones abiertas con vencimiento
+      anterior a `watermark` (cada una se devuelve una sola vez)
+    - `pending(key)` / `discard(key)`: obligaciones abiertas de la clave
+    """
+
+    def __init__(self):
+        self._keys = {}
+        # (vencimiento, nº de orden, obligación, estado de su clave)
+        self._due = []
+        self._seq = 0
+        self._open = 0
+
+    def __len__(self):
+        return self._open
+
+    def request(self, key, request, at, deadline):
+        state = self._keys.get(key)
+        if state is None:
+            state = self._keys[key] = _KeyState()
+
+        obligation = Obligation(key, request, at, at + deadline)
+
+        i = bisect_right(state.answer_times, at)
+        if i < len(state.answers):
+            obligation.response = state.answers[i]
+            obligation.resolved_at = state.answer_times[i]
+            return obligation
+
+        self._seq += 1
+        heapq.heappush(state.open, (at, self._seq, obligation))
+        heapq.heappush(
+            self._due, (obligation.due, self._seq, obligation, state)
+        )
+        self._open += 1
+        return obligation
+
+    def respond(self, key, response, at):
+        state = self._keys.get(key)
+        if state is None:
+            state = self._keys[key] = _KeyState()
+
+        if not state.answer_times or at > state.answer_times[-1]:
+            state.answer_times.append(at)
+            state.answers.append(response)
+
+        resolved = []
+        open_ = state.open
+        while open_ and open_[0][0] < at:
+            obligation = heapq.heappop(open_)[2]
+            obligation.response = response
+            obligation.resolved_at = at
+            resolved.append(obligation)
+
+        self._open -= len(resolved)
+        self._compact()
+        return resolved
+
+    def expire(self, watermark):
+        expired = []
+        due = self._due
+        while due and due[0][0] < watermark:
+            _, _, obligation, state = heapq.heappop(due)
+            if self._live(obligation, state):
+                obligation.overdue = True
+                expired.append(obligation)
+        return expired
+
+    def pending(self, key):
+        """
+        Obligaciones abiertas de la clave, por instante de apertura.
+        """
+        state = self._keys.get(key)
+        if state is None:
+            return []
+        return [item[2] for item in sorted(state.open)]
+
+    def discard(self, key):
+        """
+        Olvida la clave y devuelve sus obligaciones abiertas (ya no se
+        resolverán ni vencerán).
+        """
+        pending = self.pending(key)
+        self._keys.pop(key, None)
+        self._open -= len(pending)
+        self._compact()
+        return pending
+
+    def _compact(self):
+        # las obligaciones resueltas siguen en el heap de vencimientos
+        # hasta vencer: se purgan cuando son mayoría
+        if len(self._due) > 2 * self._open + 64:
+            self._due = [
+                item for item in self._due if self._live(item[2], item[3])
+            ]
+            heapq.heapify(self._due)
+
+    def _live(self, obligation, state):
+        # abierta, sin avisar y de una clave no descartada
+        return (
+            obligation.is_open
+            and not obligation.overdue
+            and self._keys.get(obligation.key) is state
+        )
@@ -4,6 +4,8 @@ import os
 import json
 from datetime import datetime
 
+from pm4py.objects.log.obj import Event
+
 
 def export_recommendations(data, output_dir, filename="recommendations.json"):
     os.makedirs(output_dir, exist_ok=True)
@@ -42,8 +44,8 @@ def sanitize(obj):
     if isinstance(obj, datetime):
         return obj.isoformat()
 
-    # pm4py Event (dict-like)
-    if hasattr(obj, "items") and obj.__class__.__name__ == "Event":
+    # pm4py Event (dict-like), incluidas las subclases como CowEvent
+    if isinstance(obj, Event):
         return serialize_event(obj)
 
     # dict
@@ -505,3 +507,309 @@ def export_pdf_report(md_path, cleanup_images=True):
                     pass
 
     return pdf_path
+
+
+# ============================================================
+# EXPORTACIÓN XES EN STREAMING
+# ============================================================
+
+import gzip
+from pm4py.objects.log.exporter.xes.variants.line_by_line import (
+    export_trace_line_by_line
+)
+
+
+class XESStreamWriter:
+    """
+    Escritor XES incremental: abre el fichero al inicio, añade cada
+    traza en cuanto se produce y cierra el log al final.
+    La memoria no depende del tamaño del log.
+
+    Usa el mismo formato de atributos que el exportador de pm4py.
+    """
+
+    def __init__(self, path, compress=None, encoding="utf-8"):
+        if compress is None:
+            compress = path.lower().endswith(".gz")
+
+        self.path = path
+        self.encoding = encoding
+        self.num_traces = 0
+        self._f = gzip.open(path, "wb") if compress else open(path, "wb")
+
+        self._write('<?xml version="1.0" encoding="%s" ?>\n' % encoding)
+        self._write(
+            '<log xes.version="1849-2016" '
+            'xes.features="nested-attributes" '
+            'xmlns="http://www.xes-standard.org/">\n'
+        )
+
+    def _write(self, text):
+        self._f.write(text.encode(self.encoding))
+
+    def write_trace(self, trace):
+        export_trace_line_by_line(trace, self._f, self.encoding)
+        self.num_traces += 1
+
+    def close(self):
+        if self._f is None:
+            return
+        self._write("</log>\n")
+        self._f.close()
+        self._f = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+# ============================================================
+# EXPORTACIÓN PARQUET
+# ============================================================
+
+from gdpr.importers.parquet_importer import (
+    EXTRA_COLUMN,
+    JSON_COLUMNS_KEY,
+    column_name,
+    encode_json_value,
+    import_pyarrow,
+    trace_column_name
+)
+
+# Filas (eventos) por row group
+ROW_GROUP_SIZE = 131072
+
+
+class ParquetStreamWriter:
+    """
+    Escritor Parquet incremental (una fila por evento, ver
+    `gdpr.importers.parquet_importer`). Acumula los valores por
+    columna y escribe un row group cada `row_group_size` eventos.
+
+    El esquema se fija con el primer row group: las columnas con
+    tipos mezclados, objetos o sin valores se guardan como JSON y se
+    anotan en los metadatos del esquema para decodificarlas al leer.
+    Los valores de row groups posteriores que no encajan en el
+    esquema (columnas nuevas u otro tipo) van a la columna JSON
+    `_extra` de su fila.
+    """
+
+    def __init__(self, path, row_group_size=ROW_GROUP_SIZE,
+                 compression="zstd"):
+        self._pa, self._pq = import_pyarrow()
+
+        self.path = path
+        self.row_group_size = row_group_size
+        self.compression = compression
+        self.num_traces = 0
+
+        # buffer por columnas: nombre -> valores (None si falta)
+        self._columns = {}
+        self._num_rows = 0
+        self._names = {}
+        self._schema = None
+        self._json_columns = set()
+        self._writer = None
+
+    def _column(self, key, name_fn):
+        name = self._names.get((name_fn, key))
+        if name is None:
+            name = self._names[(name_fn, key)] = name_fn(key)
+
+        column = self._columns.get(name)
+        if column is None:
+            column = self._columns[name] = []
+        if len(column) < self._num_rows:
+            column.extend([None] * (self._num_rows - len(column)))
+        return column
+
+    def write_trace(self, trace):
+        case_values = [
+            (self._column(k, trace_column_name), v)
+            for k, v in trace.attributes.items()
+        ]
+
+        # una traza sin eventos se guarda como una fila sin atributos
+        for event in list(trace) or [{}]:
+            for column, v in case_values:
+                column.extend([None] * (self._num_rows - len(column)))
+                column.append(v)
+            for k, v in event.items():
+                self._column(k, column_name).append(v)
+            self._num_rows += 1
+
+        self.num_traces += 1
+
+        if self._num_rows >= self.row_group_size:
+            self._flush()
+
+    def _flush(self):
+        if not self._num_rows:
+            return
+
+        pa = self._pa
+        columns, num_rows = self._columns, self._num_rows
+        self._columns, self._num_rows = {}, 0
+
+        for values in columns.values():
+            values.extend([None] * (num_rows - len(values)))
+
+        if self._schema is None:
+            self._open(columns)
+
+        # valores fuera del esquema (columnas nuevas o de otro tipo)
+        extras = [None] * num_rows
+
+        def overflow(name, values):
+            for i, v in enumerate(values):
+                if v is not None:
+                    if extras[i] is None:
+                        extras[i] = {}
+                    extras[i][name] = v
+
+        for name in set(columns) - set(self._schema.names):
+            overflow(name, columns.pop(name))
+
+        arrays = []
+        for field in self._schema:
+            if field.name == EXTRA_COLUMN:
+                values = extras
+            else:
+                values = columns.get(field.name) or [None] * num_rows
+
+            if field.name in self._json_columns:
+                values = _encode_json_column(values)
+            elif not _fits(pa, values, field.type):
+                overflow(field.name, [
+                    None if _fits(pa, [v], field.type) else v
+                    for v in values
+                ])
+                values = [
+                    v if _fits(pa, [v], field.type) else None
+                    for v in values
+                ]
+
+            arrays.append(pa.array(values, type=field.type))
+
+        self._writer.write_table(
+            pa.Table.from_arrays(arrays, schema=self._schema)
+        )
+
+    def _open(self, columns):
+        pa = self._pa
+
+        # case_id primero, luego atributos de traza y de evento;
+        # _extra al final (se rellena al recorrer el resto)
+        names = sorted(columns, key=lambda n: n != "case_id")
+        names.append(EXTRA_COLUMN)
+        self._json_columns.add(EXTRA_COLUMN)
+
+        fields = []
+        for name in names:
+            arrow_type = None
+            if name != EXTRA_COLUMN:
+                arrow_type = _arrow_type(pa, columns[name])
+            if arrow_type is None:
+                self._json_columns.add(name)
+                arrow_type = pa.string()
+            fields.append(pa.field(name, arrow_type))
+
+        self._schema = pa.schema(fields, metadata={
+            JSON_COLUMNS_KEY: json.dumps(
+                [n for n in names if n in self._json_columns]
+            )
+        })
+        self._writer = self._pq.ParquetWriter(
+            self.path, self._schema, compression=self.compression
+        )
+
+    def close(self):
+        if self._num_rows:
+            self._flush()
+
+        if self._writer is None and self._schema is None:
+            # log vacío: fichero válido solo con case_id
+            self._schema = self._pa.schema([("case_id", self._pa.string())])
+            self._writer = self._pq.ParquetWriter(self.path, self._schema)
+
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def _arrow_type(pa, values):
+    """
+    Tipo Arrow nativo de una columna, o None si debe guardarse
+    como JSON (tipos mezclados, objetos o columna sin valores).
+    """
+    types = {type(v) for v in values if v is not None}
+
+    if len(types) != 1:
+        return None
+
+    (value_type,) = types
+
+    if value_type is bool:
+        return pa.bool_()
+    if value_type is int:
+        return pa.int64()
+    if value_type is float:
+        return pa.float64()
+    if value_type is str:
+        return pa.string()
+
+    if issubclass(value_type, datetime):
+        aware = {v.tzinfo is not None for v in values if v is not None}
+        if aware == {True}:
+            return pa.timestamp("us", tz="UTC")
+        if aware == {False}:
+            return pa.timestamp("us")
+
+    return None
+
+
+def _encode_json_column(values):
+    """
+    Codifica en JSON; los atributos de traza se repiten en todas las
+    filas del caso, así que se reutiliza la codificación del mismo
+    objeto consecutivo.
+    """
+    encoded = []
+    last, text = object(), None
+
+    for v in values:
+        if v is not last:
+            last = v
+            text = None if v is None else encode_json_value(v)
+        encoded.append(text)
+
+    return encoded
+
+
+def _fits(pa, values, arrow_type):
+    """
+    True si todos los valores no nulos tienen el tipo de la columna.
+    """
+    types = {type(v) for v in values if v is not None}
+    if not types:
+        return True
+    return _arrow_type(pa, values) == arrow_type
+
+
+def export_parquet(log, path, **kwargs):
+    """
+    Exporta un log completo (o cualquier iterable de trazas) a Parquet.
+    """
+    with ParquetStreamWriter(path, **kwargs) as writer:
+        for trace in log:
+            writer.write_trace(trace)
+
+    return path
@@ -1,10 +1,18 @@
 # gdpr/generators.py
 import copy
-from random import choice, sample
-from gdpr.vocabulary import GDPR_EVENTS
-from gdpr.utils import sort_trace_by_time, get_first_event_timestamp
+import random
+from gdpr.vocabulary import (
+    GDPR_EVENTS,
+    classify_data_access,  # noqa: F401 (antes definida aquí)
+    classify_data_operation
+)
+from gdpr.utils import (
+    sort_trace_by_time,
+    get_first_event_timestamp,
+    insert_events
+)
+from gdpr.trace_overlay import cow_trace
 from datetime import timedelta
-from random import random, randint
 from pm4py.objects.log.obj import Event
 
 # ============================================================
@@ -96,10 +104,12 @@ def insert_initial_consent_flow(trace, default_purpose="service_provision"):
     permission_event["gdpr:legal_basis"] = "consent"
 
 
-    trace.insert(0, send_data_event)
-    trace.insert(1, inform_event)
-    trace.insert(2, consent_event)
-    trace.insert(3, permission_event)
+    insert_events(trace, [
+        (0, send_data_event),
+        (0, inform_event),
+        (0, consent_event),
+        (0, permission_event),
+    ])
 
 
 # ============================================================
@@ -148,7 +158,6 @@ def insert_consent_expiration(trace):
 
 REMOVE_PROBABILITY = 0.1 #0.1
 MAX_ERASE_DAYS = 7
-from random import random, randint
 from datetime import timedelta
 
 
@@ -189,8 +198,10 @@ def create_erase_data_event(timestamp, deadline_ts):
 # ------------------------------------------------------------
 # Inserción correcta según el diagrama UML
 # ------------------------------------------------------------
-def insert_remove_data_flow(trace):
-    if random() > REMOVE_PROBABILITY:
+def insert_remove_data_flow(trace, rng=None):
+    rng = rng or random
+
+    if rng.random() > REMOVE_PROBABILITY:
         return
 
     # El usuario solo puede pedir borrado tras haber dado consentimiento
@@ -213,7 +224,7 @@ def insert_remove_data_flow(trace):
     trace.append(search_event)
 
     # eraseData(Data, machines) con restricción temporal
-    erase_delay = randint(1, MAX_ERASE_DAYS)
+    erase_delay = rng.randint(1, MAX_ERASE_DAYS)
     deadline_ts = remove_ts + timedelta(days=MAX_ERASE_DAYS)
     erase_ts = remove_ts + timedelta(days=erase_delay)
 
@@ -241,8 +252,10 @@ def create_rectify_event(timestamp):
         purpose="data_rectification"
     )
 
-def insert_rectification(trace):
-    if random() > RECTIFY_PROBABILITY:
+def insert_rectification(trace, rng=None):
+    rng = rng or random
+
+    if rng.random() > RECTIFY_PROBABILITY:
         return
 
     # Buscar consentimiento
@@ -251,7 +264,7 @@ def insert_rectification(trace):
             base_ts = trace[i + 1]["time:timestamp"]
             rectify_ts = base_ts + timedelta(days=2)
 
-            trace.insert(i + 2, create_rectify_event(rectify_ts))
+            insert_events(trace, [(i + 2, create_rectify_event(rectify_ts))])
             break
 
 
@@ -278,8 +291,10 @@ def create_lift_restriction_event(timestamp):
         purpose="lift_processing_restriction"
     )
 
-def insert_processing_restriction(trace):
-    if random() > RESTRICT_PROBABILITY:
+def insert_processing_restriction(trace, rng=None):
+    rng = rng or random
+
+    if rng.random() > RESTRICT_PROBABILITY:
         return
 
     for i, event in enumerate(trace):
@@ -287,8 +302,10 @@ def insert_processing_restriction(trace):
             restrict_ts = trace[i + 1]["time:timestamp"] + timedelta(days=3)
             lift_ts = restrict_ts + timedelta(days=RESTRICTION_DAYS)
 
-            trace.insert(i + 2, create_restrict_event(restrict_ts))
-            trace.insert(i + 3, create_lift_restriction_event(lift_ts))
+            insert_events(trace, [
+                (i + 2, create_restrict_event(restrict_ts)),
+                (i + 2, create_lift_restriction_event(lift_ts)),
+            ])
             break
 
 
@@ -302,26 +319,10 @@ from datetime import timedelta
 # ------------------------------------------------------------
 # Clasificación del tipo de acceso
 # ------------------------------------------------------------
-def classify_data_access(event_name):
-    write_verbs = ["create", "update", "modify", "delete", "write", "set", "register"]
-    return GDPR_EVENTS["WRITE"] if any(v in event_name.lower() for v in write_verbs) else GDPR_EVENTS["READ"]
-
-def classify_data_operation(event_name):
-    name = event_name.lower()
-
-    if any(v in name for v in ["delete", "erase", "remove"]):
-        return "delete"
-
-    if any(v in name for v in ["share", "send", "export"]):
-        return "share"
-
-    if any(v in name for v in ["update", "modify", "set"]):
-        return "update"
-
-    if any(v in name for v in ["register", "create", "insert"]):
-        return "collect"
-
-    return "read"
+# `classify_data_access` / `classify_data_operation` viven en
+# gdpr/vocabulary.py (clasificador precompilado con caché LRU por
+# nombre de actividad); se importan arriba para que
+# `gdpr.generators.classify_data_access` siga disponible.
 
 # ------------------------------------------------------------
 # Evento de autorización explícita (permissionGranted)
@@ -467,16 +468,17 @@ def create_access_history_update_event(timestamp):
 # Inserción de accessLog y cierre del ciclo
 # ------------------------------------------------------------
 def insert_access_logs_and_history(trace):
-    i = 0
-    last_log_ts = None
+    # Un accessLog justo detrás de cada acceso, en una sola pasada
+    insertions = [
+        (i + 1, create_access_log_event(event))
+        for i, event in enumerate(trace)
+        if event.get("gdpr:access")
+    ]
+    insert_events(trace, insertions)
 
-    while i < len(trace):
-        if trace[i].get("gdpr:access"):
-            access_log = create_access_log_event(trace[i])
-            trace.insert(i + 1, access_log)
-            last_log_ts = access_log["time:timestamp"]
-            i += 1
-        i += 1
+    last_log_ts = None
+    if insertions:
+        last_log_ts = insertions[-1][1]["time:timestamp"]
 
     if last_log_ts:
         trace.append(create_access_history_update_event(last_log_ts + timedelta(seconds=1)))
@@ -514,8 +516,10 @@ def create_notify_breach_event(timestamp):
 
 
 # Insertar eventos de violación de datos
-def insert_breach_events(trace):
-    if random() > BREACH_PROBABILITY:
+def insert_breach_events(trace, rng=None):
+    rng = rng or random
+
+    if rng.random() > BREACH_PROBABILITY:
         return
     
     # Elegir un evento base (último evento con timestamp)
@@ -528,7 +532,7 @@ def insert_breach_events(trace):
     trace.append(detect_event)
     
     # Notify breach (≤ 72h)
-    notify_delay = randint(1, MAX_NOTIFY_HOURS)
+    notify_delay = rng.randint(1, MAX_NOTIFY_HOURS)
     notify_ts = detect_ts + timedelta(hours=notify_delay)
     notify_event = create_notify_breach_event(notify_ts)
     
@@ -543,7 +547,6 @@ def insert_breach_events(trace):
 # Simular ejercicio de derechos ARCO
 RIGHTS_PROBABILITY = 0.2     # 20% de los casos ejercen derechos
 MAX_RESPONSE_DAYS = 30
-from random import random, randint
 
 # Crear evento de requestInfo
 def create_request_info_event(timestamp):
@@ -567,9 +570,11 @@ def create_provide_info_event(timestamp):
 
 
 # Insertar eventos de ejercicio de derechos
-def insert_data_subject_rights(trace):
+def insert_data_subject_rights(trace, rng=None):
+    rng = rng or random
+
     # Decidir si esta traza ejerce derechos
-    if random() > RIGHTS_PROBABILITY:
+    if rng.random() > RIGHTS_PROBABILITY:
         return
     
     # Elegimos un punto válido de la traza (después del consentimiento)
@@ -588,17 +593,19 @@ def insert_data_subject_rights(trace):
     
     request_event = create_request_info_event(request_ts)
     
-    # Insertamos requestInfo
     insert_pos = consent_index + 2
-    trace.insert(insert_pos, request_event)
     
     # Generar provideInfo dentro de 30 días
-    response_delay = randint(1, MAX_RESPONSE_DAYS)
+    response_delay = rng.randint(1, MAX_RESPONSE_DAYS)
     provide_ts = request_ts + timedelta(days=response_delay)
     
     provide_event = create_provide_info_event(provide_ts)
     
-    trace.insert(insert_pos + 1, provide_event)
+    # Insertamos requestInfo → provideInfo
+    insert_events(trace, [
+        (insert_pos, request_event),
+        (insert_pos, provide_event),
+    ])
 
 
 
@@ -641,15 +648,16 @@ def finalize_erasure_after_loop(trace):
 
     base_ts = trace[last_erase_index]["time:timestamp"]
 
-    trace.insert(
-        last_erase_index + 1,
-        create_remove_sp_log_event(base_ts + timedelta(minutes=5))
-    )
-
-    trace.insert(
-        last_erase_index + 2,
-        create_erase_all_copies_event(base_ts + timedelta(minutes=10))
-    )
+    insert_events(trace, [
+        (
+            last_erase_index + 1,
+            create_remove_sp_log_event(base_ts + timedelta(minutes=5))
+        ),
+        (
+            last_erase_index + 1,
+            create_erase_all_copies_event(base_ts + timedelta(minutes=10))
+        ),
+    ])
 
 
 # ============================================================
@@ -710,12 +718,14 @@ def create_revoke_third_party_event(timestamp, third_party):
     return event
 
 
-def insert_third_party_flow(trace):
+def insert_third_party_flow(trace, rng=None):
     """
     Inserta un flujo de compartición con terceros:
     consent → share → (optional) revoke
     """
-    if random() > THIRD_PARTY_PROBABILITY:
+    rng = rng or random
+
+    if rng.random() > THIRD_PARTY_PROBABILITY:
         return
 
     # 1️⃣ Buscar consentimiento
@@ -731,7 +741,7 @@ def insert_third_party_flow(trace):
     # 2️⃣ Momento base (siempre después del consentimiento)
     base_ts = consent_event["time:timestamp"] + timedelta(days=1)
 
-    third_party = choice(THIRD_PARTIES)
+    third_party = rng.choice(THIRD_PARTIES)
 
     share_event = create_share_data_event(
         timestamp=base_ts,
@@ -744,7 +754,7 @@ def insert_third_party_flow(trace):
     trace.append(share_event)
 
     # 3️⃣ Posible revocación posterior
-    if random() < REVOKE_THIRD_PARTY_PROBABILITY:
+    if rng.random() < REVOKE_THIRD_PARTY_PROBABILITY:
         revoke_ts = base_ts + timedelta(days=30)
 
         revoke_event = create_revoke_third_party_event(
@@ -761,12 +771,15 @@ def insert_third_party_flow(trace):
 ###################################################
 
 
-def generate_non_compliant_trace(trace, max_violations=3):
+def generate_non_compliant_trace(trace, max_violations=3, rng=None):
     """
     Genera una versión NO conforme con GDPR a partir de una traza compliant.
     Introduce múltiples violaciones aleatorias.
+
+    `rng`: instancia de `random.Random` (por defecto, el RNG global).
     """
-    new_trace = copy.deepcopy(trace)
+    rng = rng or random
+    new_trace = cow_trace(trace)
 
     possible_violations = [
         "consent_after_access",
@@ -784,8 +797,8 @@ def generate_non_compliant_trace(trace, max_violations=3):
         "access_after_erasure"
     ]
 
-    n = randint(1, max_violations)
-    selected = sample(possible_violations, n)
+    n = rng.randint(1, max_violations)
+    selected = rng.sample(possible_violations, n)
 
     new_trace.attributes["gdpr:violation_types"] = selected
 
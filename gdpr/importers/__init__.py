@@ -1,19 +1,41 @@
 from gdpr.importers.xes_importer import XESImporter
 from gdpr.importers.csv_importer import CSVImporter
-from gdpr.importers.json_importer import JSONImporter
+from gdpr.importers.json_importer import JSONImporter, JSONLinesImporter
+from gdpr.importers.parquet_importer import ParquetImporter
 
 
-def load_event_log(path):
-    path = path.lower()
+def get_importer(path):
+    ext = path.lower()
 
-    if path.endswith(".xes") or path.endswith(".xes.gz"):
-        return XESImporter().load(path)
+    if ext.endswith(".xes") or ext.endswith(".xes.gz"):
+        return XESImporter()
 
-    elif path.endswith(".csv"):
-        return CSVImporter().load(path)
+    elif ext.endswith(".csv"):
+        return CSVImporter()
 
-    elif path.endswith(".json"):
-        return JSONImporter().load(path)
+    elif ext.endswith(".json"):
+        return JSONImporter()
+
+    elif ext.endswith(".jsonl") or ext.endswith(".ndjson"):
+        return JSONLinesImporter()
+
+    elif ext.endswith(".parquet"):
+        return ParquetImporter()
 
     else:
         raise ValueError(f"Formato no soportado: {path}")
+
+
+def load_event_log(path, lazy=False):
+    """
+    Carga un event log.
+
+    Con `lazy=True` devuelve un iterador de trazas en lugar del
+    EventLog completo (streaming cuando el formato lo permite).
+    """
+    importer = get_importer(path)
+
+    if lazy:
+        return importer.iter_traces(path)
+
+    return importer.load(path)
@@ -8,3 +8,11 @@ class BaseImporter(ABC):
         Carga un archivo y devuelve un pm4py EventLog
         """
         pass
+
+    def iter_traces(self, path):
+        """
+        Devuelve las trazas una a una.
+        Por defecto carga el log completo; los importadores
+        con soporte de streaming lo sobrescriben.
+        """
+        yield from self.load(path)
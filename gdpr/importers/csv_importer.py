@@ -1,30 +1,134 @@
+import numpy as np
 import pandas as pd
 from datetime import datetime
 from pm4py.objects.log.obj import EventLog, Trace, Event
 from gdpr.importers.base import BaseImporter
 
+# Filas leídas por bloque en modo streaming (`iter_traces`)
+CHUNKSIZE = 1_000_000
+
+
 class CSVImporter(BaseImporter):
+    """
+    Importador CSV (columnas case_id, activity, timestamp y,
+    opcionalmente, gdpr_access).
+
+    - `load`: lee el fichero completo y agrupa por case_id
+      (trazas ordenadas por case_id, eventos en el orden del fichero)
+    - `iter_traces`: lectura por bloques de `chunksize` filas para
+      ficheros mayores que la memoria; requiere que las filas de
+      cada caso sean contiguas
+    """
+
+    def __init__(self, chunksize=CHUNKSIZE):
+        self.chunksize = chunksize
 
     def load(self, path):
         df = pd.read_csv(path)
 
         log = EventLog()
+        for trace in _frame_to_traces(df, sort_cases=True):
+            log.append(trace)
 
-        for case_id, group in df.groupby("case_id"):
-            trace = Trace()
-            trace.attributes["concept:name"] = str(case_id)
+        return log
 
-            for _, row in group.iterrows():
-                event = Event()
-                event["concept:name"] = row["activity"]
-                event["time:timestamp"] = datetime.fromisoformat(row["timestamp"])
+    def iter_traces(self, path):
+        seen = set()
+        pending = None
 
-                # Campo GDPR opcional
-                if "gdpr_access" in row:
-                    event["gdpr:access"] = bool(row["gdpr_access"])
+        for chunk in pd.read_csv(path, chunksize=self.chunksize):
+            if pending is not None:
+                chunk = pd.concat([pending, chunk], ignore_index=True)
 
-                trace.append(event)
+            # El último caso del bloque puede continuar en el siguiente
+            bounds = _case_bounds(chunk["case_id"].to_numpy())
+            split = bounds[-2]
+            pending = chunk.iloc[split:]
 
-            log.append(trace)
+            yield from _unique_cases(
+                _frame_to_traces(chunk.iloc[:split], sort_cases=False),
+                seen
+            )
 
-        return log
+        if pending is not None:
+            yield from _unique_cases(
+                _frame_to_traces(pending, sort_cases=False),
+                seen
+            )
+
+
+# ============================================================
+# CONSTRUCCIÓN VECTORIZADA DE TRAZAS
+# ============================================================
+
+def _case_bounds(cases):
+    """
+    Offsets [0, ..., n] de los tramos contiguos con el mismo case_id.
+    """
+    changes = np.flatnonzero(cases[1:] != cases[:-1]) + 1
+    return np.concatenate(([0], changes, [len(cases)]))
+
+
+def _parse_timestamps(column):
+    try:
+        parsed = pd.to_datetime(column, format="ISO8601")
+        return pd.DatetimeIndex(parsed).to_pydatetime()
+    except (ValueError, TypeError):
+        # p.ej. offsets de zona horaria mezclados
+        return [datetime.fromisoformat(value) for value in column]
+
+
+def _frame_to_traces(df, sort_cases):
+    """
+    Convierte un DataFrame en trazas a partir de arrays por columna:
+    un único parseo de timestamps, una ordenación estable por
+    case_id y separación de casos por offsets.
+    """
+    if df.empty:
+        return
+
+    if sort_cases:
+        df = df.sort_values("case_id", kind="stable")
+
+    cases = df["case_id"].to_numpy()
+    activities = df["activity"].tolist()
+    timestamps = _parse_timestamps(df["timestamp"])
+
+    # Campo GDPR opcional
+    access = None
+    if "gdpr_access" in df.columns:
+        access = df["gdpr_access"].to_numpy(dtype=bool).tolist()
+
+    bounds = _case_bounds(cases)
+
+    for start, end in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+        events = []
+
+        for i in range(start, end):
+            event = Event()
+            event["concept:name"] = activities[i]
+            event["time:timestamp"] = timestamps[i]
+
+            if access is not None:
+                event["gdpr:access"] = access[i]
+
+            events.append(event)
+
+        yield Trace(
+            events,
+            attributes={"concept:name": str(cases[start])}
+        )
+
+
+def _unique_cases(traces, seen):
+    for trace in traces:
+        case_id = trace.attributes["concept:name"]
+
+        if case_id in seen:
+            raise ValueError(
+                f"El caso {case_id} no es contiguo en el CSV; "
+                "usa load() o agrupa el fichero por case_id"
+            )
+
+        seen.add(case_id)
+        yield trace
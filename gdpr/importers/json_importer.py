@@ -3,26 +3,193 @@ from datetime import datetime
 from pm4py.objects.log.obj import EventLog, Trace, Event
 from gdpr.importers.base import BaseImporter
 
+# Caracteres leídos por bloque al parsear incrementalmente
+READ_SIZE = 1 << 16
+
+_WHITESPACE = " \t\n\r"
+
+
 class JSONImporter(BaseImporter):
+    """
+    Importador JSON: array de casos
+    `[{"case_id": ..., "events": [{"activity", "timestamp", ...}]}, ...]`.
+
+    `iter_traces` parsea el array de forma incremental
+    (`json.JSONDecoder.raw_decode`), caso a caso, sin cargar el
+    documento completo en memoria.
+    """
 
     def load(self, path):
+        log = EventLog()
+
+        for trace in self.iter_traces(path):
+            log.append(trace)
+
+        return log
+
+    def iter_traces(self, path):
         with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
+            for case in _iter_json_array(f):
+                yield _case_to_trace(case)
 
-        log = EventLog()
 
-        for case in data:
-            trace = Trace()
-            trace.attributes["concept:name"] = case["case_id"]
+class JSONLinesImporter(BaseImporter):
+    """
+    Importador JSON Lines (.jsonl / .ndjson). Cada línea es:
+    - un caso completo (`{"case_id": ..., "events": [...]}`), o
+    - un evento (`{"case_id": ..., "activity": ..., "timestamp": ...}`)
 
-            for e in case["events"]:
-                event = Event()
-                event["concept:name"] = e["activity"]
-                event["time:timestamp"] = datetime.fromisoformat(e["timestamp"])
-                event["gdpr:access"] = e.get("gdpr_access", False)
+    `load` agrupa los eventos por case_id (orden de primera aparición),
+    también los de varias líneas del mismo caso (casos completos o
+    eventos), en el orden del fichero; `iter_traces` los agrupa en
+    streaming y requiere que las líneas de cada caso sean contiguas.
+    """
 
-                trace.append(event)
+    def load(self, path):
+        cases = {}
 
+        for record in _iter_json_lines(path):
+            trace = cases.get(record["case_id"])
+            if trace is None:
+                trace = cases[record["case_id"]] = _new_trace(record)
+
+            _append_record(trace, record)
+
+        log = EventLog()
+        for trace in cases.values():
             log.append(trace)
 
         return log
+
+    def iter_traces(self, path):
+        seen = set()
+        current = None
+
+        for record in _iter_json_lines(path):
+            case_id = record["case_id"]
+
+            if current is None or case_id != current.attributes["concept:name"]:
+                if current is not None:
+                    yield current
+
+                if case_id in seen:
+                    raise ValueError(
+                        f"El caso {case_id} no es contiguo en {path}; "
+                        "usa load() o agrupa el fichero por case_id"
+                    )
+                seen.add(case_id)
+                current = _new_trace(record)
+
+            _append_record(current, record)
+
+        if current is not None:
+            yield current
+
+
+# ============================================================
+# CONVERSIÓN A OBJETOS PM4PY
+# ============================================================
+
+def _new_trace(record):
+    trace = Trace()
+    trace.attributes["concept:name"] = record["case_id"]
+    return trace
+
+
+def _record_to_event(e):
+    event = Event()
+    event["concept:name"] = e["activity"]
+    event["time:timestamp"] = datetime.fromisoformat(e["timestamp"])
+    event["gdpr:access"] = e.get("gdpr_access", False)
+    return event
+
+
+def _append_record(trace, record):
+    """
+    Añade a la traza los eventos de una línea (caso completo o evento).
+    """
+    if "events" in record:
+        for e in record["events"]:
+            trace.append(_record_to_event(e))
+    else:
+        trace.append(_record_to_event(record))
+
+
+def _case_to_trace(case):
+    trace = _new_trace(case)
+    _append_record(trace, case)
+    return trace
+
+
+# ============================================================
+# PARSEO INCREMENTAL
+# ============================================================
+
+def _iter_json_lines(path):
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def _iter_json_array(f, read_size=READ_SIZE):
+    """
+    Elementos de un array JSON de nivel superior, uno a uno.
+
+    Mantiene en memoria solo el elemento en curso: si un elemento
+    no está completo en el buffer se leen más datos (bloques
+    crecientes, coste lineal aunque el elemento sea grande).
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    eof = False
+
+    def fill(size):
+        nonlocal buffer, pos, eof
+        chunk = f.read(size)
+        if not chunk:
+            eof = True
+        buffer = buffer[pos:] + chunk
+        pos = 0
+
+    def skip(chars):
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in chars:
+                pos += 1
+            if pos < len(buffer) or eof:
+                return
+            fill(read_size)
+
+    skip(_WHITESPACE)
+    if buffer[pos:pos + 1] != "[":
+        raise ValueError("Se esperaba un array JSON de casos")
+    pos += 1
+
+    while True:
+        skip(_WHITESPACE + ",")
+
+        if pos >= len(buffer):
+            raise ValueError("Array JSON incompleto")
+
+        if buffer[pos] == "]":
+            return
+
+        try:
+            item, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            fill(max(read_size, len(buffer)))
+            continue
+
+        # un elemento que acaba justo al final del buffer puede estar
+        # truncado (p.ej. un número): se confirma con más datos
+        if end == len(buffer) and not eof:
+            fill(max(read_size, len(buffer)))
+            continue
+
+        pos = end
+        yield item
@@ -0,0 +1,254 @@
+import json
+from datetime import datetime
+from pm4py.objects.log.obj import EventLog, Trace, Event
+from gdpr.importers.base import BaseImporter
+
+# Filas por lote en modo streaming (`iter_traces`)
+BATCH_SIZE = 65536
+
+# Metadatos del esquema con las columnas codificadas en JSON
+JSON_COLUMNS_KEY = b"gdpr:json_columns"
+
+# Columna JSON con los valores que no encajan en el esquema fijado
+# por el primer row group (columnas nuevas o de otro tipo)
+EXTRA_COLUMN = "_extra"
+
+CASE_PREFIX = "case:"
+
+# Marca de los datetime dentro de valores JSON
+DATETIME_KEY = "$datetime"
+
+
+def import_pyarrow():
+    """
+    pyarrow es una dependencia opcional: solo se importa al
+    leer o escribir Parquet.
+    """
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as exc:
+        raise ImportError(
+            "El formato Parquet requiere pyarrow (pip install pyarrow)"
+        ) from exc
+
+    return pyarrow, pyarrow.parquet
+
+
+# ============================================================
+# NOMBRES DE COLUMNA ↔ ATRIBUTOS
+# ============================================================
+# Una fila por evento:
+#   case_id, activity, timestamp, gdpr_* y demás atributos del evento
+#   case:* → atributos de la traza (repetidos en cada fila del caso)
+#   _extra → {columna: valor} que no encajan en el esquema
+
+_EVENT_COLUMNS = {
+    "concept:name": "activity",
+    "time:timestamp": "timestamp",
+}
+_EVENT_KEYS = {v: k for k, v in _EVENT_COLUMNS.items()}
+
+
+def column_name(key):
+    if key in _EVENT_COLUMNS:
+        return _EVENT_COLUMNS[key]
+    if key.startswith("gdpr:"):
+        return "gdpr_" + key[len("gdpr:"):]
+    return key
+
+
+def attribute_name(column):
+    if column in _EVENT_KEYS:
+        return _EVENT_KEYS[column]
+    if column.startswith("gdpr_"):
+        return "gdpr:" + column[len("gdpr_"):]
+    return column
+
+
+def trace_column_name(key):
+    if key == "concept:name":
+        return "case_id"
+    return CASE_PREFIX + column_name(key)
+
+
+# ============================================================
+# VALORES JSON
+# ============================================================
+
+def _json_default(obj):
+    if isinstance(obj, datetime):
+        return {DATETIME_KEY: obj.isoformat()}
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if hasattr(obj, "items"):
+        return dict(obj.items())
+    # p.ej. StickyPolicy: como texto, igual que en XES
+    return str(obj)
+
+
+def _json_object_hook(obj):
+    if len(obj) == 1 and DATETIME_KEY in obj:
+        return datetime.fromisoformat(obj[DATETIME_KEY])
+    return obj
+
+
+def encode_json_value(value):
+    return json.dumps(value, default=_json_default, ensure_ascii=False)
+
+
+def decode_json_value(text):
+    return json.loads(text, object_hook=_json_object_hook)
+
+
+# ============================================================
+# IMPORTADOR
+# ============================================================
+
+class ParquetImporter(BaseImporter):
+    """
+    Importador Parquet (una fila por evento, ver `column_name`).
+
+    - `columns`: proyección de columnas (siempre se lee case_id)
+    - `iter_traces` recorre el fichero por lotes (`iter_batches`)
+      y requiere que las filas de cada caso sean contiguas, como
+      las escribe `ParquetStreamWriter`
+    """
+
+    def __init__(self, columns=None, batch_size=BATCH_SIZE):
+        self.columns = columns
+        self.batch_size = batch_size
+
+    def load(self, path):
+        _, pq = import_pyarrow()
+
+        table = pq.read_table(path, columns=self._projection(path))
+        cases = {}
+
+        for case_id, trace, event in _iter_rows(table, self.columns):
+            if case_id not in cases:
+                cases[case_id] = trace
+            if event is not None:
+                cases[case_id].append(event)
+
+        log = EventLog()
+        for trace in cases.values():
+            log.append(trace)
+
+        return log
+
+    def iter_traces(self, path):
+        _, pq = import_pyarrow()
+
+        parquet_file = pq.ParquetFile(path)
+        batches = parquet_file.iter_batches(
+            batch_size=self.batch_size,
+            columns=self._projection(path)
+        )
+
+        seen = set()
+        current = None
+        current_id = None
+
+        for batch in batches:
+            for case_id, trace, event in _iter_rows(batch, self.columns):
+                if case_id != current_id:
+                    if current is not None:
+                        yield current
+
+                    if case_id in seen:
+                        raise ValueError(
+                            f"El caso {case_id} no es contiguo en {path}; "
+                            "usa load()"
+                        )
+                    seen.add(case_id)
+                    current, current_id = trace, case_id
+
+                if event is not None:
+                    current.append(event)
+
+        if current is not None:
+            yield current
+
+    def _projection(self, path):
+        if self.columns is None:
+            return None
+
+        _, pq = import_pyarrow()
+
+        columns = list(self.columns)
+        if "case_id" not in columns:
+            columns.insert(0, "case_id")
+        if EXTRA_COLUMN in pq.read_schema(path).names:
+            columns.append(EXTRA_COLUMN)
+        return columns
+
+
+def _iter_rows(batch, projection=None):
+    """
+    (case_id, traza | None, evento | None) por fila; la traza solo
+    se devuelve en la primera fila de cada tramo del caso. Las columnas se
+    convierten a listas Python de una vez; los valores nulos se
+    omiten (el atributo no existía en el evento original).
+
+    Con `projection`, de `_extra` solo se toman esas columnas.
+    """
+    metadata = batch.schema.metadata or {}
+    json_columns = set(json.loads(metadata.get(JSON_COLUMNS_KEY, b"[]")))
+
+    names = batch.schema.names
+    columns = {}
+    for name in names:
+        values = batch.column(name).to_pylist()
+        if name in json_columns:
+            values = [
+                None if v is None else decode_json_value(v) for v in values
+            ]
+        columns[name] = values
+
+    case_ids = columns.pop("case_id")
+    extras = columns.pop(EXTRA_COLUMN, None)
+    names = [n for n in names if n != EXTRA_COLUMN]
+
+    trace_columns = [
+        (attribute_name(name[len(CASE_PREFIX):]), columns[name])
+        for name in names if name.startswith(CASE_PREFIX)
+    ]
+    event_columns = [
+        (attribute_name(name), columns[name])
+        for name in names
+        if name != "case_id" and not name.startswith(CASE_PREFIX)
+    ]
+
+    previous = object()
+
+    for i, case_id in enumerate(case_ids):
+        extra = extras[i] if extras is not None and extras[i] else {}
+        if extra and projection is not None:
+            extra = {k: v for k, v in extra.items() if k in projection}
+
+        # la traza solo se construye al cambiar de caso
+        trace = None
+        if case_id != previous:
+            trace = Trace()
+            trace.attributes["concept:name"] = case_id
+            for key, values in trace_columns:
+                if values[i] is not None:
+                    trace.attributes[key] = values[i]
+            for name, value in extra.items():
+                if name.startswith(CASE_PREFIX):
+                    trace.attributes[
+                        attribute_name(name[len(CASE_PREFIX):])
+                    ] = value
+            previous = case_id
+
+        event = Event()
+        for key, values in event_columns:
+            if values[i] is not None:
+                event[key] = values[i]
+        for name, value in extra.items():
+            if not name.startswith(CASE_PREFIX):
+                event[attribute_name(name)] = value
+
+        # trazas sin eventos se exportan como una fila sin atributos
+        yield case_id, trace, (event if len(event) else None)
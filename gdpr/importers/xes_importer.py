@@ -1,7 +1,106 @@
+import gzip
+from lxml import etree
 from pm4py.objects.log.importer.xes import importer as xes_importer
+from pm4py.objects.log.obj import Trace, Event
+from pm4py.util.dt_parsing import parser as dt_parser
 from gdpr.importers.base import BaseImporter
 
+
+def _local(tag):
+    return tag.rsplit("}", 1)[-1]
+
+
 class XESImporter(BaseImporter):
 
     def load(self, path):
         return xes_importer.apply(path)
+
+    def iter_traces(self, path):
+        """
+        Lector XES en streaming (.xes / .xes.gz) basado en iterparse.
+
+        Devuelve las trazas una a una; la memoria ocupada queda acotada
+        por la traza en curso, no por el log completo.
+        """
+        opener = gzip.open if path.lower().endswith(".gz") else open
+        date_parser = dt_parser.get()
+
+        with opener(path, "rb") as f:
+            events = []
+
+            for _, elem in etree.iterparse(f, events=("end",)):
+                tag = _local(elem.tag)
+
+                if tag == "event":
+                    event = Event()
+                    self._parse_attributes(elem, event, date_parser)
+                    events.append(event)
+                    self._release(elem)
+
+                elif tag == "trace":
+                    trace = Trace(events)
+                    self._parse_attributes(elem, trace.attributes, date_parser)
+                    events = []
+                    self._release(elem)
+                    yield trace
+
+    # --------------------------------------------------------
+    # ATRIBUTOS
+    # --------------------------------------------------------
+
+    def _parse_attributes(self, elem, store, date_parser):
+        for child in elem:
+            if not isinstance(child.tag, str):
+                continue  # comentarios / instrucciones XML
+
+            tag = _local(child.tag)
+            if tag in ("event", "trace"):
+                continue
+
+            key = child.get("key")
+            if key is None:
+                continue
+
+            store[key] = self._parse_value(child, tag, date_parser)
+
+    def _parse_value(self, elem, tag, date_parser):
+        raw = elem.get("value")
+
+        if tag == "date":
+            value = date_parser.apply(raw)
+        elif tag == "int":
+            value = int(raw)
+        elif tag == "float":
+            value = float(raw)
+        elif tag == "boolean":
+            value = str(raw).lower() == "true"
+        elif tag == "list":
+            value = None
+        else:  # string / id
+            value = raw
+
+        # Atributos anidados (mismo formato que pm4py)
+        if len(elem):
+            first = elem[0]
+            if _local(first.tag) == "values":
+                children = [
+                    (c.get("key"), self._parse_value(c, _local(c.tag), date_parser))
+                    for c in first
+                    if isinstance(c.tag, str)
+                ]
+            else:
+                children = {}
+                self._parse_attributes(elem, children, date_parser)
+            value = {"value": value, "children": children}
+
+        return value
+
+    def _release(self, elem):
+        """
+        Libera el elemento ya procesado y sus hermanos anteriores.
+        """
+        elem.clear()
+        parent = elem.getparent()
+        if parent is not None and _local(elem.tag) == "trace":
+            while elem.getprevious() is not None:
+                del parent[0]
@@ -0,0 +1,420 @@
+# gdpr/monitor.py
+
+"""
+Monitor de cumplimiento en streaming.
+
+Los validadores trabajan sobre trazas completas; el monitor recibe
+los eventos de uno en uno (`feed(case_id, event)`) y emite cada
+violación en cuanto es decidible:
+
+- inmediatas: las reglas que deciden evento a evento (acceso tras
+  borrado, tras retirada, durante restricción, sin consentimiento
+  activo, propósito, minimización...) al llegar el evento
+- plazos: una brecha sin notificar (72 h) o una solicitud de derechos
+  sin respuesta (30 días) al superar el plazo el reloj del monitor
+  (el mayor timestamp visto, o `advance(now)`), con el
+  `DeadlineScheduler` de `gdpr/deadlines.py`; si la respuesta llega
+  después se emite además la violación de respuesta tardía
+- fin de caso: las reglas que necesitan el caso completo
+  (consentimiento posterior al acceso, accessLog, borrado sin
+  tratamiento) al cerrarse el caso: `close(case_id)`, inactividad
+  (`idle_timeout`, desactivada por defecto) o expulsión por `max_cases`
+
+El estado es acotado: como mucho `max_cases` casos en memoria
+(se expulsa el menos reciente) y, por caso, las reglas de fin de caso
+se compactan cada `max_case_events` eventos (`Rule.compact`): emiten
+lo ya decidido (accesos anteriores al consentimiento, una vez visto)
+y solo conservan los hechos del caso (consentimiento, accesos vistos,
+último accessLog por actividad) y los eventos aún sin decidir, así
+que el resultado no depende de `max_case_events`. Las reglas de
+Sticky Policy no se incluyen (la SP depende del caso completo; sus
+comprobaciones de acceso tienen equivalente inmediato).
+
+Cada violación incluye `case_id`. Fuentes: `tail_events` (fichero
+JSON Lines que crece) y `socket_events` (líneas JSON por TCP), con
+el formato de columnas del export Parquet (`case_id`, `activity`,
+`timestamp`, `gdpr_*`, `case:*`).
+"""
+
+import heapq
+import os
+import socket
+import time
+from collections import OrderedDict
+from datetime import datetime
+from functools import partial
+
+from pm4py.objects.log.obj import Event, Trace
+
+from gdpr.deadlines import DeadlineScheduler
+from gdpr.importers.parquet_importer import (
+    CASE_PREFIX,
+    attribute_name,
+    decode_json_value,
+)
+from gdpr.validators.engine import (
+    DEFAULT_RULES,
+    FusedValidator,
+    Rule,
+    StickyPolicyRule,
+    _RequestResponseRule,
+)
+
+# Casos en memoria
+MAX_CASES = 100_000
+
+# Eventos por caso entre dos compactaciones de las reglas de fin de caso
+MAX_CASE_EVENTS = 10_000
+
+# Inactividad (en tiempo de eventos) tras la que un caso se cierra
+# (None: sin cierre por inactividad). Debe superar el plazo más largo
+# (30 días de los derechos ARCO) y los huecos habituales de los casos:
+# un caso cerrado que recibe eventos se abre de nuevo sin estado
+IDLE_TIMEOUT = None
+
+# Espera entre lecturas de las fuentes sin datos nuevos (segundos)
+POLL_INTERVAL = 0.5
+
+STREAM_RULES = tuple(r for r in DEFAULT_RULES if r is not StickyPolicyRule)
+
+
+# ============================================================
+# REGLAS CON PLAZO
+# ============================================================
+
+class _DeadlineRule(Rule):
+    """
+    Versión en streaming de una regla solicitud/respuesta
+    (`_RequestResponseRule`): sus obligaciones viven en el
+    `DeadlineScheduler` del monitor (clave: la propia regla), que
+    avisa de los plazos vencidos.
+    """
+
+    def __init__(self, trace, rule, scheduler):
+        super().__init__(trace)
+        self.rule = rule(trace)
+        self.names = self.rule.names
+        self.case_id = trace.attributes["concept:name"]
+        self.scheduler = scheduler
+
+    def on_event(self, event, access):
+        rule = self.rule
+        ts = event["time:timestamp"]
+
+        if event["concept:name"] == rule.request_name:
+            obligation = self.scheduler.request(self, event, ts, rule.deadline)
+            resolved = [] if obligation.is_open else [obligation]
+        else:
+            resolved = self.scheduler.respond(self, event, ts)
+
+        for obligation in resolved:
+            if obligation.late:
+                self.found.append(
+                    rule.late_violation(obligation.request, obligation.response)
+                )
+
+    def finish(self):
+        return [
+            self.rule.missing_violation(obligation.request)
+            for obligation in self.scheduler.pending(self)
+            if not obligation.overdue
+        ]
+
+
+# ============================================================
+# ESTADO POR CASO
+# ============================================================
+
+class _CaseState:
+
+    def __init__(self, case_id, attributes, rules, scheduler):
+        self.case_id = case_id
+        self.trace = Trace(attributes={**attributes, "concept:name": case_id})
+        self.engine = FusedValidator(self.trace, [
+            partial(_DeadlineRule, rule=rule, scheduler=scheduler)
+            if issubclass(rule, _RequestResponseRule) else rule
+            for rule in rules
+        ])
+        self.events = 0
+        self.last_ts = None
+
+    def end_rules(self):
+        """
+        Reglas decididas al final del caso (incluidos los plazos
+        pendientes: el caso ya no va a responderlos).
+        """
+        return [
+            rule for rule in self.engine.rules
+            if type(rule).finish is not Rule.finish
+        ]
+
+    def compact(self):
+        """
+        Violaciones ya decididas de las reglas de fin de caso; estas
+        descartan los eventos que ya no pueden cambiar su resultado.
+        """
+        violations = []
+        for rule in self.engine.rules:
+            violations.extend(_tag(v, self.case_id) for v in rule.compact())
+        return violations
+
+
+# ============================================================
+# MONITOR
+# ============================================================
+
+class ComplianceMonitor:
+    """
+    - `feed(case_id, event, attributes=None)`: violaciones decidibles
+      tras el evento (de este u otros casos); `attributes` solo se usa
+      al abrir el caso (p.ej. `gdpr:default_purpose`)
+    - `advance(now)`: avanza el reloj (p.ej. hora actual sin eventos)
+    - `close(case_id)` / `close_all()`: fin de caso
+    - `run(source)`: consume una fuente y devuelve las violaciones
+    """
+
+    def __init__(
+        self,
+        rules=STREAM_RULES,
+        max_cases=MAX_CASES,
+        max_case_events=MAX_CASE_EVENTS,
+        idle_timeout=IDLE_TIMEOUT,
+    ):
+        self.rules = rules
+        self.max_cases = max_cases
+        self.max_case_events = max_case_events
+        self.idle_timeout = idle_timeout
+        self.watermark = None
+
+        self._cases = OrderedDict()
+        self.scheduler = DeadlineScheduler()
+        # inactividad: (vencimiento, nº de orden, caso, estado)
+        self._idle = []
+        self._seq = 0
+
+    def __len__(self):
+        return len(self._cases)
+
+    def feed(self, case_id, event, attributes=None):
+        violations = []
+
+        state = self._cases.get(case_id)
+        if state is None:
+            state = self._open(case_id, attributes or {}, violations)
+        else:
+            self._cases.move_to_end(case_id)
+
+        engine = state.engine
+        engine.feed(event)
+        state.events += 1
+        ts = event["time:timestamp"]
+        if state.last_ts is None and self.idle_timeout is not None:
+            self._schedule_idle(ts + self.idle_timeout, state)
+        state.last_ts = ts
+
+        for rule in engine.rules:
+            if rule.found:
+                violations.extend(_tag(v, case_id) for v in rule.found)
+                rule.found.clear()
+
+        if self.max_case_events and state.events % self.max_case_events == 0:
+            violations.extend(state.compact())
+
+        violations.extend(self.advance(ts))
+        return violations
+
+    def advance(self, now):
+        """
+        Mueve el reloj a `now` (si es posterior) y devuelve los plazos
+        vencidos y los casos cerrados por inactividad.
+        """
+        if self.watermark is not None and now <= self.watermark:
+            return []
+        self.watermark = now
+
+        violations = []
+        for obligation in self.scheduler.expire(now):
+            rule = obligation.key
+            violations.append(_tag(
+                rule.rule.missing_violation(obligation.request), rule.case_id
+            ))
+
+        idle = self._idle
+        while idle and idle[0][0] < now:
+            _, _, case_id, state = heapq.heappop(idle)
+            if self._cases.get(case_id) is not state:
+                continue
+            # se reprograma si el caso tuvo eventos después
+            if state.last_ts + self.idle_timeout < now:
+                violations.extend(self.close(case_id))
+            else:
+                self._schedule_idle(state.last_ts + self.idle_timeout, state)
+
+        return violations
+
+    def close(self, case_id):
+        state = self._cases.pop(case_id, None)
+        if state is None:
+            return []
+        return self._finish(state)
+
+    def close_all(self):
+        violations = []
+        for case_id in list(self._cases):
+            violations.extend(self.close(case_id))
+        return violations
+
+    def run(self, source, clock=None, close=True):
+        """
+        Violaciones de una fuente de `(case_id, atributos, evento)`;
+        los `None` de la fuente (sin datos) avanzan el reloj a
+        `clock()` si se indica. Con `close`, al agotarse la fuente se
+        cierran los casos abiertos.
+        """
+        for item in source:
+            if item is None:
+                if clock is not None:
+                    yield from self.advance(clock())
+                continue
+
+            case_id, attributes, event = item
+            yield from self.feed(case_id, event, attributes)
+
+        if close:
+            yield from self.close_all()
+
+    def _open(self, case_id, attributes, violations):
+        state = self._cases[case_id] = _CaseState(
+            case_id, attributes, self.rules, self.scheduler
+        )
+        if len(self._cases) > self.max_cases:
+            oldest = next(iter(self._cases))
+            violations.extend(self.close(oldest))
+        return state
+
+    def _finish(self, state):
+        violations = []
+        for rule in state.end_rules():
+            violations.extend(_tag(v, state.case_id) for v in rule.finish())
+            if isinstance(rule, _DeadlineRule):
+                self.scheduler.discard(rule)
+        return violations
+
+    def _schedule_idle(self, due, state):
+        self._seq += 1
+        heapq.heappush(self._idle, (due, self._seq, state.case_id, state))
+
+
+def _tag(v, case_id):
+    return {**v, "events": list(v["events"]), "case_id": case_id}
+
+
+# ============================================================
+# FUENTES
+# ============================================================
+
+def parse_event(record):
+    """
+    (case_id, atributos del caso, evento) de un registro con las
+    columnas del export Parquet; acepta el registro como texto JSON.
+    """
+    if isinstance(record, (str, bytes)):
+        record = decode_json_value(record)
+
+    attributes = {}
+    event = Event()
+
+    for column, value in record.items():
+        if column == "case_id":
+            continue
+        if column.startswith(CASE_PREFIX):
+            attributes[attribute_name(column[len(CASE_PREFIX):])] = value
+        else:
+            event[attribute_name(column)] = value
+
+    ts = event.get("time:timestamp")
+    if isinstance(ts, str):
+        event["time:timestamp"] = datetime.fromisoformat(ts)
+
+    return record["case_id"], attributes, event
+
+
+def tail_events(path, follow=True, from_start=True, poll=POLL_INTERVAL):
+    """
+    Eventos de un fichero JSON Lines a medida que crece (como
+    `tail -f`). Sin datos nuevos devuelve `None` tras cada espera;
+    si el fichero se trunca o se rota, se vuelve a leer desde el
+    principio. Con `follow=False` termina al llegar al final.
+    """
+    f = open(path, "r", encoding="utf-8")
+    try:
+        if not from_start:
+            f.seek(0, os.SEEK_END)
+        partial_line = ""
+
+        while True:
+            line = f.readline()
+            if line.endswith("\n"):
+                line, partial_line = partial_line + line, ""
+                if line.strip():
+                    yield parse_event(line)
+                continue
+
+            # línea incompleta (el escritor aún no ha terminado)
+            partial_line += line
+            if not follow:
+                if partial_line.strip():
+                    yield parse_event(partial_line)
+                return
+
+            if _rotated(f, path):
+                f.close()
+                f = open(path, "r", encoding="utf-8")
+                partial_line = ""
+                continue
+
+            yield None
+            time.sleep(poll)
+    finally:
+        f.close()
+
+
+def _rotated(f, path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return False
+    return (
+        stat.st_ino != os.fstat(f.fileno()).st_ino
+        or stat.st_size < f.tell()
+    )
+
+
+def socket_events(address, timeout=POLL_INTERVAL):
+    """
+    Eventos JSON Lines leídos de una conexión TCP (`(host, puerto)`)
+    hasta que el emisor la cierra; devuelve `None` cada `timeout`
+    segundos sin datos.
+    """
+    with socket.create_connection(address) as conn:
+        conn.settimeout(timeout)
+        buffer = b""
+
+        while True:
+            try:
+                chunk = conn.recv(1 << 16)
+            except socket.timeout:
+                yield None
+                continue
+
+            if not chunk:
+                break
+
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                if line.strip():
+                    yield parse_event(line)
+
+        if buffer.strip():
+            yield parse_event(buffer)
@@ -1,5 +1,12 @@
 # gdpr/pipelines.py
 
+import asyncio
+import random
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import islice
+from multiprocessing import Pool
+
 from gdpr.generators import (
     insert_initial_consent_flow,
     insert_consent_expiration,
@@ -15,14 +22,32 @@ from gdpr.generators import (
     
 )
 
-from gdpr.sticky_policies import build_sticky_policy_from_trace
+from gdpr.sticky_policies import (
+    build_sticky_policy_from_trace,
+    derive_sticky_policy
+)
+from gdpr.trace_index import trace_cache_scope
 from gdpr.utils import sort_trace_by_time
+from gdpr.validators.validators import (
+    validate_trace,
+    annotate_violations_on_trace
+)
+from gdpr.recommendations import (
+    generate_recommendations,
+    generate_sp_recommendations
+)
+from gdpr.scoring import compute_gdpr_risk_score, classify_risk
+from gdpr.remediation import apply_recommendations
 
 
-def build_compliant_trace(trace):
+@trace_cache_scope()
+def build_compliant_trace(trace, rng=None):
     """
     Construye una traza GDPR-compliant a partir de una traza real.
     Implementa las Figuras 3–6 del modelo GDPR.
+
+    `rng`: instancia de `random.Random` para los flujos aleatorios
+    (por defecto, el RNG global).
     """
 
     # =====================================================
@@ -43,20 +68,20 @@ def build_compliant_trace(trace):
         trace,
         default_purpose=trace.attributes["gdpr:default_purpose"]
     )
-    insert_third_party_flow(trace)
+    insert_third_party_flow(trace, rng=rng)
 
     insert_consent_expiration(trace)
 
-    insert_remove_data_flow(trace)
+    insert_remove_data_flow(trace, rng=rng)
     finalize_erasure_after_loop(trace)
-    insert_rectification(trace)
-    insert_processing_restriction(trace)
+    insert_rectification(trace, rng=rng)
+    insert_processing_restriction(trace, rng=rng)
 
     enrich_real_events_with_gdpr(trace)
     insert_access_logs_and_history(trace)
 
-    insert_breach_events(trace)
-    insert_data_subject_rights(trace)
+    insert_breach_events(trace, rng=rng)
+    insert_data_subject_rights(trace, rng=rng)
 
     sort_trace_by_time(trace)
 
@@ -73,9 +98,477 @@ def build_compliant_trace(trace):
 
 from gdpr.generators import generate_non_compliant_trace
 
-def build_non_compliant_trace(trace):
+@trace_cache_scope()
+def build_non_compliant_trace(trace, rng=None):
     """
     Genera una versión NO conforme de una traza GDPR-compliant.
     Introduce una violación aleatoria del modelo.
     """
-    return generate_non_compliant_trace(trace)
+    return generate_non_compliant_trace(trace, rng=rng)
+
+
+# ============================================================
+# PIPELINE COMPLETO POR TRAZA
+# ============================================================
+
+GDPR_TRACE_CONTEXT = {
+    "gdpr:personal_data": True,
+    "gdpr:data_category": "unspecified",
+    "gdpr:processing_context": "generic",
+    "gdpr:legal_basis": "consent",
+    "gdpr:default_purpose": "service_provision"
+}
+
+
+def trace_seed(seed, trace, position):
+    """
+    Semilla determinista por traza (independiente del proceso
+    y del orden de ejecución).
+    """
+    trace_id = trace.attributes.get("concept:name", position)
+    return f"{seed}:{trace_id}"
+
+
+def trace_rng(seed, trace, position):
+    """
+    RNG propio de la traza, derivado de la semilla de ejecución
+    y del identificador de la traza.
+    """
+    return random.Random(trace_seed(seed, trace, position))
+
+
+# ============================================================
+# ETAPAS
+# ============================================================
+# Cada etapa recibe y devuelve el estado de la traza (dict); así
+# pueden encadenarse en `process_trace` o ejecutarse como etapas
+# independientes en `async_run`.
+
+def _stage_compliant(state):
+    # la traza original no se usa en las etapas siguientes
+    trace = state.pop("trace")
+    trace.attributes.update(GDPR_TRACE_CONTEXT)
+
+    # 1️⃣ COMPLIANT (la SP la construye build_compliant_trace)
+    state["compliant"] = build_compliant_trace(trace, rng=state["rng"])
+    return state
+
+
+def _stage_non_compliant(state):
+    compliant = state["compliant"]
+
+    # 2️⃣ NON-COMPLIANT (SP desde el prefijo compartido con la conforme)
+    non_compliant = build_non_compliant_trace(compliant, rng=state["rng"])
+    non_compliant.attributes["gdpr:sticky_policy"] = (
+        derive_sticky_policy(non_compliant, compliant)
+    )
+
+    state["non_compliant"] = non_compliant
+    return state
+
+
+def _stage_validate(state):
+    non_compliant = state["non_compliant"]
+
+    # 3️⃣ VALIDACIÓN
+    violations = validate_trace(non_compliant)
+    annotate_violations_on_trace(non_compliant, violations)
+
+    # 4️⃣ RECOMENDACIONES
+    recommendations = generate_recommendations(violations)
+    recommendations.extend(
+        generate_sp_recommendations(non_compliant)
+    )
+
+    # 5️⃣ SCORING
+    risk_score = compute_gdpr_risk_score(recommendations)
+    risk_level = classify_risk(risk_score)
+
+    non_compliant.attributes.update({
+        "gdpr:risk_score": risk_score,
+        "gdpr:risk_level": risk_level
+    })
+
+    state.update({
+        "violations": violations,
+        "recommendations": recommendations,
+        "risk_score": risk_score,
+        "risk_level": risk_level,
+    })
+    return state
+
+
+def _stage_remediate(state):
+    non_compliant = state["non_compliant"]
+    violations = state["violations"]
+    risk_score = state["risk_score"]
+    risk_level = state["risk_level"]
+
+    # 6️⃣ REMEDIATION
+    remediated = apply_recommendations(
+        non_compliant, state["recommendations"]
+    )
+    remediated.attributes["gdpr:sticky_policy"] = (
+        derive_sticky_policy(remediated, non_compliant)
+    )
+
+    # 7️⃣ REVALIDACIÓN
+    corrected_violations = validate_trace(remediated)
+    corrected_recommendations = generate_recommendations(
+        corrected_violations
+    )
+
+    corrected_score = compute_gdpr_risk_score(
+        corrected_recommendations
+    )
+    corrected_level = classify_risk(corrected_score)
+
+    evidence = {
+        "trace_id": non_compliant.attributes.get("concept:name"),
+
+        # 🔴 ESTADO BASE PARA ANÁLISIS
+        "violations": violations,
+        "recommendations": state["recommendations"],
+        "risk_score": risk_score,
+        "risk_level": risk_level,
+        "sticky_policy": non_compliant.attributes.get("gdpr:sticky_policy"),
+
+        # 🔵 CONTEXTO ADICIONAL (no analítico)
+        "initial_state": {
+            "violations": violations,
+            "risk_score": risk_score,
+            "risk_level": risk_level
+        },
+        "post_remediation_state": {
+            "violations": corrected_violations,
+            "risk_score": corrected_score,
+            "risk_level": corrected_level
+        },
+
+        "remediation": {
+            "corrected_violations": corrected_violations
+        }
+    }
+
+    state["result"] = {
+        "compliant": state["compliant"],
+        "non_compliant": non_compliant,
+        "remediated": remediated,
+        "evidence": evidence
+    }
+    return state
+
+
+STAGES = (
+    _stage_compliant,
+    _stage_non_compliant,
+    _stage_validate,
+    _stage_remediate,
+)
+
+
+@trace_cache_scope()
+def _stage_all(state):
+    for stage in STAGES:
+        state = stage(state)
+    return state
+
+
+def process_trace(trace, rng=None):
+    """
+    Ejecuta el pipeline GDPR completo sobre una traza:
+    build → non-compliant → validate → recommend → score
+    → remediate → revalidate.
+
+    Devuelve las tres variantes de la traza y el registro de evidencia.
+    """
+    return _stage_all({"trace": trace, "rng": rng})["result"]
+
+
+def _process_job(job):
+    trace, seed, position = job
+
+    # las cachés de las trazas se descartan al salir del ámbito de
+    # `process_trace`: no viajan entre procesos
+    return process_trace(trace, rng=trace_rng(seed, trace, position))
+
+
+def _iter_results(jobs, workers, chunksize):
+    if workers <= 1:
+        for job in jobs:
+            yield _process_job(job)
+        return
+
+    with Pool(processes=workers) as pool:
+        yield from pool.imap(_process_job, jobs, chunksize=chunksize)
+
+
+def _iter_cached(jobs, workers, chunksize, cache):
+    """
+    Solo se procesan las trazas sin resultado en `cache`; los
+    resultados se intercalan en el orden original.
+
+    Las trazas se leen por ventanas de `chunksize * workers`: los
+    fallos de una ventana se procesan mientras se devuelven los de la
+    anterior, y de los aciertos solo se guarda la clave hasta que les
+    toca (entonces se leen de la caché). En memoria hay como mucho dos
+    ventanas, aunque casi todas las trazas acierten.
+    """
+    window = max(chunksize, 1) * max(workers, 1)
+    jobs = iter(jobs)
+
+    def next_window(submit):
+        keys = []
+        missed = []
+        for job in islice(jobs, window):
+            trace, seed, position = job
+            key = cache.key(trace, trace_seed(seed, trace, position))
+            hit = cache.contains(key)
+            keys.append((key, hit))
+            if not hit:
+                missed.append(job)
+        return keys, submit(missed) if missed else iter(())
+
+    def drain(submit):
+        in_flight = deque([next_window(submit)])
+        while in_flight[0][0]:
+            in_flight.append(next_window(submit))
+            keys, results = in_flight.popleft()
+            for key, hit in keys:
+                if hit:
+                    yield cache.load(key)
+                    continue
+                result = next(results)
+                cache.put(key, result)
+                yield result
+        cache.flush()
+
+    if workers <= 1:
+        yield from drain(lambda missed: map(_process_job, missed))
+        return
+
+    with Pool(processes=workers) as pool:
+        yield from drain(lambda missed: pool.imap(
+            _process_job, missed, chunksize=chunksize
+        ))
+
+
+def iter_run_log(log, workers=1, chunksize=1, seed=0, cache=None):
+    """
+    Versión perezosa de `run_log`: acepta cualquier iterable de trazas
+    (p.ej. `load_event_log(path, lazy=True)`) y devuelve los resultados
+    uno a uno, en el orden original.
+    """
+    jobs = ((trace, seed, i) for i, trace in enumerate(log))
+
+    if cache is not None:
+        return _iter_cached(jobs, workers, chunksize, cache)
+    return _iter_results(jobs, workers, chunksize)
+
+
+def run_log(log, workers=1, chunksize=1, seed=0, cache=None):
+    """
+    Ejecuta `process_trace` sobre todas las trazas del log.
+
+    - `workers > 1` reparte las trazas en un pool de procesos
+    - `chunksize`: trazas enviadas a cada worker por tarea
+    - `seed`: semilla de la ejecución; cada traza usa una semilla
+      derivada de ella y de su identificador, por lo que el resultado
+      es el mismo en ejecución serie y paralela
+    - `cache`: `ResultCache` opcional; las trazas con el mismo
+      contenido, versión del pipeline y semilla que en una ejecución
+      anterior no se vuelven a procesar
+
+    Devuelve los resultados (trazas + evidencia) en el orden original.
+    """
+    return list(iter_run_log(log, workers, chunksize, seed, cache))
+
+
+# ============================================================
+# PIPELINE ASÍNCRONO
+# ============================================================
+# lectura → conforme → no conforme → validación → remediación →
+# escritura, como tareas asyncio conectadas por colas acotadas
+
+# Bloques de trazas en espera entre dos etapas
+QUEUE_SIZE = 4
+
+_DONE = object()
+
+
+def _apply_stage(stage, chunk):
+    """
+    Aplica la etapa a un bloque de estados; los resueltos por la
+    caché se reenvían sin cambios. Las cachés de las trazas solo
+    viven dentro de la etapa (no viajan entre procesos).
+    """
+    for i, state in enumerate(chunk):
+        if "cached" in state:
+            continue
+
+        with trace_cache_scope():
+            chunk[i] = stage(state)
+
+    return chunk
+
+
+async def _run_stage(submit, inbox, outbox, window):
+    """
+    Envía cada bloque de `inbox` a `submit` con hasta `window`
+    bloques en curso y los pasa a `outbox` en el orden de llegada.
+    Los bloques resueltos por la caché solo se reenvían.
+    """
+    loop = asyncio.get_running_loop()
+    in_flight = asyncio.Queue(window)
+
+    async def feed():
+        while (chunk := await inbox.get()) is not _DONE:
+            if all("cached" in state for state in chunk):
+                future = loop.create_future()
+                future.set_result(chunk)
+            else:
+                future = submit(chunk)
+            await in_flight.put(future)
+        await in_flight.put(None)
+
+    async def drain():
+        while (future := await in_flight.get()) is not None:
+            await outbox.put(await future)
+        await outbox.put(_DONE)
+
+    await asyncio.gather(feed(), drain())
+
+
+async def async_run(
+    log,
+    writers=(),
+    workers=1,
+    chunksize=1,
+    seed=0,
+    cache=None,
+    executor=None,
+    queue_size=QUEUE_SIZE,
+    evidence_record=None,
+):
+    """
+    Ejecuta el pipeline como etapas conectadas por colas acotadas:
+    lectura → conforme → no conforme → validación → remediación →
+    escritura.
+
+    - `log`: iterable de trazas (p.ej. `load_event_log(path, lazy=True)`);
+      la lectura (descompresión y parseo) se hace en un hilo de E/S
+    - `writers`: pares `(clave, writer)`; cada resultado se escribe
+      con `writer.write_trace(resultado[clave])` en el hilo de E/S, en
+      el orden original
+    - etapas de CPU: en `executor` si se indica; si no, en un pool de
+      `workers` procesos (`workers > 1`) o en un hilo. Cada etapa
+      tiene hasta `workers` bloques en curso. Con procesos, las cuatro
+      etapas se ejecutan en una sola llamada por bloque: serializar el
+      estado de la traza entre etapas cuesta tanto como calcularlas
+    - `chunksize`: trazas por bloque entre etapas (menos saltos al
+      executor y, con procesos, menos envíos)
+    - `queue_size`: bloques en espera entre etapas; una etapa lenta
+      (p.ej. la escritura) frena a las anteriores y acota la memoria
+    - `seed` / `cache`: como en `run_log` (mismo resultado)
+    - `evidence_record`: función aplicada a la evidencia de cada traza
+      en el hilo de E/S antes de guardarla (p.ej. `trace_report_record`
+      para no retener las trazas hasta el final)
+
+    Devuelve la evidencia de cada traza (o su `evidence_record`), en el
+    orden original.
+    """
+    loop = asyncio.get_running_loop()
+
+    owned = executor is None
+    if owned:
+        executor = (
+            ProcessPoolExecutor(workers) if workers > 1
+            else ThreadPoolExecutor(1, thread_name_prefix="gdpr-cpu")
+        )
+    in_process = isinstance(executor, ProcessPoolExecutor)
+    io = ThreadPoolExecutor(2, thread_name_prefix="gdpr-io")
+
+    def submitter(stage):
+        return lambda chunk: loop.run_in_executor(
+            executor, _apply_stage, stage, chunk
+        )
+
+    stages = (_stage_all,) if in_process else STAGES
+    queues = [asyncio.Queue(queue_size) for _ in range(len(stages) + 1)]
+    evidence = []
+
+    def read_chunk(traces, position):
+        chunk = []
+        for trace in traces:
+            state = {
+                "trace": trace,
+                "rng": trace_rng(seed, trace, position + len(chunk)),
+            }
+            if cache is not None:
+                key = cache.key(trace, trace_seed(
+                    seed, trace, position + len(chunk)
+                ))
+                cached = cache.get(key)
+                state["key"] = key
+                if cached is not None:
+                    state["result"] = cached
+                    state["cached"] = True
+            chunk.append(state)
+            if len(chunk) == chunksize:
+                break
+        return chunk
+
+    async def read():
+        traces = iter(log)
+        position = 0
+        while chunk := await loop.run_in_executor(
+            io, read_chunk, traces, position
+        ):
+            await queues[0].put(chunk)
+            position += len(chunk)
+        await queues[0].put(_DONE)
+
+    def write(chunk):
+        records = []
+        for state in chunk:
+            result = state["result"]
+            for key, writer in writers:
+                writer.write_trace(result[key])
+            if cache is not None and "cached" not in state:
+                cache.put(state["key"], result)
+            records.append(
+                evidence_record(result["evidence"]) if evidence_record
+                else result["evidence"]
+            )
+        return records
+
+    async def write_all():
+        while (chunk := await queues[-1].get()) is not _DONE:
+            evidence.extend(await loop.run_in_executor(io, write, chunk))
+        if cache is not None:
+            await loop.run_in_executor(io, cache.flush)
+
+    tasks = [
+        asyncio.ensure_future(read()),
+        *(
+            asyncio.ensure_future(_run_stage(
+                submitter(stage), queues[i], queues[i + 1], max(workers, 1)
+            ))
+            for i, stage in enumerate(stages)
+        ),
+        asyncio.ensure_future(write_all()),
+    ]
+
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+    finally:
+        io.shutdown(wait=True)
+        if owned:
+            executor.shutdown(wait=True)
+
+    return evidence
@@ -1,39 +1,46 @@
 from copy import deepcopy
 from datetime import timedelta
 from gdpr.vocabulary import GDPR_EVENTS
+from gdpr.trace_index import (
+    get_trace_index,
+    invalidate_trace_index,
+    trace_cache_scope
+)
+from gdpr.trace_overlay import cow_trace
 
 def _fix_consent_order(trace):
-    consent = None
-    for e in trace:
-        if e["concept:name"] == GDPR_EVENTS["CONSENT"]:
-            consent = e
-            break
+    index = get_trace_index(trace)
+    consent = index.first(GDPR_EVENTS["CONSENT"])
 
     if not consent:
         return
 
     consent_ts = consent["time:timestamp"]
 
-    for e in trace:
-        if e.get("gdpr:access") and e["time:timestamp"] < consent_ts:
+    for e in index.access_events():
+        if e["time:timestamp"] < consent_ts:
             e["time:timestamp"] = consent_ts + timedelta(seconds=1)
 
 
 def _fix_withdrawal_access(trace):
-    withdrawn = False
+    index = get_trace_index(trace)
+    withdrawals = index.positions.get(GDPR_EVENTS["WITHDRAW"])
 
-    for e in trace:
-        if e["concept:name"] == GDPR_EVENTS["WITHDRAW"]:
-            withdrawn = True
+    if not withdrawals:
+        return
 
-        if withdrawn and e.get("gdpr:access"):
-            e["gdpr:access"] = False
+    for i in index.access_positions:
+        if i >= withdrawals[0]:
+            index.events[i]["gdpr:access"] = False
 
 
 def _fix_restriction_access(trace):
     restricted = False
 
-    for e in trace:
+    for e in get_trace_index(trace).select(
+        [GDPR_EVENTS["RESTRICT"], GDPR_EVENTS["LIFT_RESTRICTION"]],
+        access=True
+    ):
         name = e["concept:name"]
 
         if name == GDPR_EVENTS["RESTRICT"]:
@@ -45,8 +52,9 @@ def _fix_restriction_access(trace):
 
 
 def _fix_breach_notification(trace):
-    detects = [e for e in trace if e["concept:name"] == GDPR_EVENTS["BREACH"]]
-    notifies = [e for e in trace if e["concept:name"] == GDPR_EVENTS["NOTIFY_BREACH"]]
+    index = get_trace_index(trace)
+    detects = index.get_events(GDPR_EVENTS["BREACH"])
+    notifies = index.get_events(GDPR_EVENTS["NOTIFY_BREACH"])
 
     for d in detects:
         if not any(n["time:timestamp"] > d["time:timestamp"] for n in notifies):
@@ -57,8 +65,9 @@ def _fix_breach_notification(trace):
 
 
 def _fix_rights_response(trace):
-    requests = [e for e in trace if e["concept:name"] == GDPR_EVENTS["REQUEST_INFO"]]
-    responses = [e for e in trace if e["concept:name"] == GDPR_EVENTS["PROVIDE_INFO"]]
+    index = get_trace_index(trace)
+    requests = index.get_events(GDPR_EVENTS["REQUEST_INFO"])
+    responses = index.get_events(GDPR_EVENTS["PROVIDE_INFO"])
 
     for r in requests:
         if not any(resp["time:timestamp"] > r["time:timestamp"] for resp in responses):
@@ -68,33 +77,41 @@ def _fix_rights_response(trace):
             trace.append(new_resp)
 
 def _fix_implicit_consent(trace):
-    for e in trace:
-        if e["concept:name"] == GDPR_EVENTS["CONSENT"]:
-            e["gdpr:explicit"] = True
+    for e in get_trace_index(trace).get_events(GDPR_EVENTS["CONSENT"]):
+        e["gdpr:explicit"] = True
 
 def _fix_purpose_violation(trace):
-    for e in trace:
-        if e.get("gdpr:access"):
-            e["gdpr:purpose"] = trace.attributes.get(
-                "gdpr:default_purpose", "service_provision"
-            )
+    for e in get_trace_index(trace).access_events():
+        e["gdpr:purpose"] = trace.attributes.get(
+            "gdpr:default_purpose", "service_provision"
+        )
             
 def _fix_data_minimization(trace):
-    for e in trace:
-        if e.get("gdpr:access"):
-            e["gdpr:data_scope"] = "minimal"
+    for e in get_trace_index(trace).access_events():
+        e["gdpr:data_scope"] = "minimal"
 
-def _fix_access_after_erasure(trace):
-    erased = False
+def _disable_access_after(trace, event_name):
+    """
+    Desactiva los accesos posteriores a la primera aparición
+    de `event_name` (excepto los propios eventos `event_name`).
+    """
+    index = get_trace_index(trace)
+    positions = index.positions.get(event_name)
 
-    for e in trace:
-        if e["concept:name"] == GDPR_EVENTS["ERASE"]:
-            erased = True
-        elif erased and e.get("gdpr:access"):
+    if not positions:
+        return
+
+    for i in index.access_positions:
+        e = index.events[i]
+        if i > positions[0] and e["concept:name"] != event_name:
             e["gdpr:access"] = False
 
+
+def _fix_access_after_erasure(trace):
+    _disable_access_after(trace, GDPR_EVENTS["ERASE"])
+
 def _fix_missing_consent(trace):
-    if any(e["concept:name"] == GDPR_EVENTS["CONSENT"] for e in trace):
+    if get_trace_index(trace).has(GDPR_EVENTS["CONSENT"]):
         return
 
     first_event = trace[0]
@@ -109,8 +126,9 @@ def _fix_missing_breach_notification(trace):
 
 
 def _fix_late_right_response(trace):
-    requests = [e for e in trace if e["concept:name"] == GDPR_EVENTS["REQUEST_INFO"]]
-    responses = [e for e in trace if e["concept:name"] == GDPR_EVENTS["PROVIDE_INFO"]]
+    index = get_trace_index(trace)
+    requests = index.get_events(GDPR_EVENTS["REQUEST_INFO"])
+    responses = index.get_events(GDPR_EVENTS["PROVIDE_INFO"])
 
     for r in requests:
         for resp in responses:
@@ -118,13 +136,7 @@ def _fix_late_right_response(trace):
                 resp["time:timestamp"] = r["time:timestamp"] + timedelta(days=1)
 
 def _fix_access_after_consent_expiration(trace):
-    expired = False
-
-    for e in trace:
-        if e["concept:name"] == GDPR_EVENTS["CONSENT_EXPIRED"]:
-            expired = True
-        elif expired and e.get("gdpr:access"):
-            e["gdpr:access"] = False
+    _disable_access_after(trace, GDPR_EVENTS["CONSENT_EXPIRED"])
 
 def _fix_missing_permission(trace):
     from copy import deepcopy
@@ -148,12 +160,13 @@ def _fix_missing_permission(trace):
         i += 1
 
 
+@trace_cache_scope()
 def apply_recommendations(trace, recommendations):
     """
     Aplica de forma SIMULADA las recomendaciones GDPR
     y devuelve una nueva traza corregida.
     """
-    corrected_trace = deepcopy(trace)
+    corrected_trace = cow_trace(trace)
 
     for rec in recommendations:
         if "violation" not in rec:
@@ -203,6 +216,8 @@ def apply_recommendations(trace, recommendations):
         elif v == "access_without_permission":
             _fix_missing_permission(corrected_trace)
 
+        # Los fixers modifican eventos in-place: el índice queda obsoleto
+        invalidate_trace_index(corrected_trace)
 
 
     corrected_trace.attributes["gdpr:remediated"] = True
@@ -5,6 +5,38 @@ from gdpr.audit import generate_audit_report
 from gdpr.exporters import sanitize
 
 
+def trace_report_record(evidence):
+    """
+    Lo que leen los informes de la evidencia de una traza: violaciones
+    y recomendaciones ya serializadas (sin referencias a los eventos de
+    la traza) y sin la Sticky Policy ni su historial de accesos.
+
+    Al acumularla para todo el log en lugar de la evidencia completa,
+    la memoria crece con las violaciones detectadas y no con las trazas.
+    """
+    violations = sanitize(evidence["violations"])
+    corrected = sanitize(evidence["post_remediation_state"]["violations"])
+
+    return {
+        "trace_id": evidence["trace_id"],
+        "violations": violations,
+        "recommendations": sanitize(evidence["recommendations"]),
+        "risk_score": evidence["risk_score"],
+        "risk_level": evidence["risk_level"],
+        "initial_state": {
+            **evidence["initial_state"],
+            "violations": violations
+        },
+        "post_remediation_state": {
+            **evidence["post_remediation_state"],
+            "violations": corrected
+        },
+        "remediation": {
+            "corrected_violations": corrected
+        }
+    }
+
+
 def build_gdpr_analysis_report(all_recommendations, input_log_name):
     """
     Construye el informe completo de análisis GDPR listo para serialización JSON.
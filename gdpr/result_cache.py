@@ -0,0 +1,267 @@
+# gdpr/result_cache.py
+
+"""
+Caché en disco de los resultados del pipeline por traza.
+
+Cada resultado de `process_trace` (las tres trazas y la evidencia) se
+guarda en SQLite bajo una clave de contenido:
+
+- hash de la traza de entrada (atributos y eventos, en orden)
+- versión del pipeline (`PIPELINE_VERSION` + huella del código fuente
+  del paquete `gdpr`: cualquier cambio de reglas o generadores
+  invalida la caché)
+- semilla de la traza (`trace_seed`)
+
+Una re-ejecución sobre un log que solo crece (o en el que cambian
+pocos casos) procesa únicamente los casos nuevos o modificados.
+
+Tamaño acotado: cada fila guarda su versión del pipeline y al abrir
+la caché se borran las de otras versiones (inalcanzables); tras una
+ejecución completa, `prune()` borra las claves no usadas en ella
+(casos modificados o eliminados del log).
+
+Los valores se serializan con pickle: la caché solo debe abrirse
+sobre ficheros propios (no es un formato de intercambio).
+"""
+
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+from datetime import datetime
+from functools import lru_cache
+
+# Subir al cambiar la salida del pipeline sin tocar el código del
+# paquete (p.ej. una dependencia que altera los resultados)
+PIPELINE_VERSION = "1"
+
+# Resultados escritos entre dos commits de SQLite
+COMMIT_EVERY = 256
+
+
+# ============================================================
+# CLAVES
+# ============================================================
+
+@lru_cache(maxsize=None)
+def pipeline_version():
+    """
+    `PIPELINE_VERSION` más una huella de los fuentes de `gdpr`.
+    """
+    package = os.path.dirname(os.path.abspath(__file__))
+    digest = hashlib.blake2b(digest_size=8)
+
+    for root, dirs, files in os.walk(package):
+        dirs[:] = sorted(d for d in dirs if d != "__pycache__")
+        for name in sorted(files):
+            if name.endswith(".py"):
+                path = os.path.join(root, name)
+                digest.update(os.path.relpath(path, package).encode())
+                with open(path, "rb") as f:
+                    digest.update(f.read())
+
+    return f"{PIPELINE_VERSION}:{digest.hexdigest()}"
+
+
+# Valores que se hashean tal cual (su repr es estable)
+_SCALARS = frozenset({str, int, float, bool, type(None), datetime})
+
+
+def _canonical(value):
+    """
+    Forma estable de un valor para el hash (dicts y conjuntos
+    ordenados: su orden de iteración no es parte del contenido).
+    """
+    if type(value) in _SCALARS:
+        return value
+    if isinstance(value, dict) or hasattr(value, "_dict"):
+        return _canonical_items(value.items())
+    if isinstance(value, (set, frozenset)):
+        return tuple(sorted(repr(_canonical(v)) for v in value))
+    if isinstance(value, (list, tuple)):
+        return tuple(_canonical(v) for v in value)
+    return value
+
+
+def _canonical_items(items):
+    return sorted(
+        (str(k), v if type(v) in _SCALARS else _canonical(v))
+        for k, v in items
+    )
+
+
+def trace_digest(trace):
+    """
+    Hash del contenido de la traza: atributos y eventos en orden.
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(repr(_canonical_items(trace.attributes.items())).encode())
+
+    for event in trace:
+        digest.update(b"\x00")
+        digest.update(repr(_canonical_items(event.items())).encode())
+
+    return digest.hexdigest()
+
+
+# ============================================================
+# CACHÉ
+# ============================================================
+
+class ResultCache:
+    """
+    Resultados de `process_trace` en un fichero SQLite.
+
+    - `key(trace, seed)`: clave de contenido (ver módulo); debe
+      calcularse antes de procesar la traza, que se modifica in-place
+    - `get(key)` / `put(key, result)`
+    - `contains(key)` + `load(key)`: `get` en dos pasos, para decidir
+      sin deserializar y leer el resultado cuando se necesita
+    - `hits` / `misses`: contadores de `get` / `contains`
+    - `prune()`: borra las claves no usadas (`get` con acierto o
+      `put`) desde que se abrió; solo tras procesar el log completo
+
+    Se puede usar desde el hilo que alimenta el pool de `run_log`:
+    los accesos a la conexión se serializan con un lock.
+    """
+
+    def __init__(self, path, version=None):
+        self.path = path
+        self.version = version or pipeline_version()
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._pending = 0
+        # claves usadas desde la apertura (para `prune`)
+        self._used = set()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+
+        columns = [
+            row[1] for row in self._db.execute("PRAGMA table_info(results)")
+        ]
+        if columns and "version" not in columns:
+            # formato anterior sin versión por fila: se descarta
+            self._db.execute("DROP TABLE results")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS results "
+            "(key TEXT PRIMARY KEY, version TEXT NOT NULL, "
+            "value BLOB NOT NULL)"
+        )
+        # resultados de otras versiones del pipeline: inalcanzables
+        self._db.execute(
+            "DELETE FROM results WHERE version != ?", (self.version,)
+        )
+        self._db.commit()
+
+    def key(self, trace, seed):
+        """
+        `seed`: semilla de la traza (`trace_seed(...)`).
+        """
+        digest = hashlib.blake2b(digest_size=20)
+        for part in (trace_digest(trace), self.version, str(seed)):
+            digest.update(part.encode())
+            digest.update(b"\x00")
+        return digest.hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            self._count(key, row is not None)
+
+        return None if row is None else pickle.loads(row[0])
+
+    def contains(self, key):
+        """
+        Como `get` (cuenta el acierto o fallo), sin leer el resultado;
+        se lee después con `load`.
+        """
+        with self._lock:
+            found = self._db.execute(
+                "SELECT 1 FROM results WHERE key = ?", (key,)
+            ).fetchone() is not None
+            self._count(key, found)
+
+        return found
+
+    def load(self, key):
+        """
+        Resultado de una clave ya contada con `contains`.
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value FROM results WHERE key = ?", (key,)
+            ).fetchone()
+
+        if row is None:
+            raise KeyError(key)
+        return pickle.loads(row[0])
+
+    def _count(self, key, found):
+        if found:
+            self.hits += 1
+            self._used.add(key)
+        else:
+            self.misses += 1
+
+    def put(self, key, result):
+        value = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO results (key, version, value) "
+                "VALUES (?, ?, ?)",
+                (key, self.version, value)
+            )
+            self._used.add(key)
+            self._pending += 1
+            if self._pending >= COMMIT_EVERY:
+                self._db.commit()
+                self._pending = 0
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute(
+                "SELECT COUNT(*) FROM results"
+            ).fetchone()[0]
+
+    def prune(self):
+        """
+        Borra las claves no usadas desde la apertura y devuelve
+        cuántas. Tras una ejecución parcial borraría resultados aún
+        válidos: llamar solo tras procesar el log completo.
+        """
+        with self._lock:
+            self._db.execute(
+                "CREATE TEMP TABLE IF NOT EXISTS used (key TEXT PRIMARY KEY)"
+            )
+            self._db.execute("DELETE FROM used")
+            self._db.executemany(
+                "INSERT INTO used (key) VALUES (?)",
+                ((key,) for key in self._used)
+            )
+            removed = self._db.execute(
+                "DELETE FROM results WHERE key NOT IN (SELECT key FROM used)"
+            ).rowcount
+            self._db.execute("DELETE FROM used")
+            self._db.commit()
+            self._pending = 0
+        return removed
+
+    def flush(self):
+        with self._lock:
+            self._db.commit()
+            self._pending = 0
+
+    def close(self):
+        self.flush()
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,11 +1,218 @@
 # gdpr/sticky_policies.py
 
-from dataclasses import dataclass, field
+from array import array
+from bisect import bisect_right
+from dataclasses import dataclass, field, fields, replace
 from datetime import datetime, timedelta
-from typing import List, Set, Optional, Dict
+from typing import Set, Optional, Dict
 
+from gdpr.trace_index import get_trace_cache, get_trace_index, set_trace_cache
+from gdpr.trace_overlay import shared_prefix
+from gdpr.vocabulary import ACTIVITIES, ActivityRegistry
 
-@dataclass
+
+# ============================================================
+# TERCEROS
+# ============================================================
+
+@dataclass(slots=True)
+class ThirdPartyRecord:
+    """
+    Mini-Sticky Policy de un tercero.
+
+    Registro con campos fijos en lugar de un dict por tercero;
+    conserva la interfaz de dict (`tp["active"]`, `tp.get(...)`,
+    `keys()`, `items()`) y su representación.
+    """
+
+    role: str = "processor"
+    purposes: Set[str] = field(default_factory=set)
+    permissions: Set[str] = field(default_factory=set)
+    active: bool = True
+    shared_timestamp: Optional[datetime] = None
+    retention_until: Optional[datetime] = None
+    country: Optional[str] = None
+    transfer_mechanism: Optional[str] = None
+    legal_basis: Optional[str] = None
+    own_legal_basis: bool = False
+    notified_of_erasure: bool = False
+
+    def __getitem__(self, key):
+        if key not in _THIRD_PARTY_KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        if key not in _THIRD_PARTY_KEYS:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key):
+        return key in _THIRD_PARTY_KEYS
+
+    def get(self, key, default=None):
+        if key not in _THIRD_PARTY_KEYS:
+            return default
+        return getattr(self, key)
+
+    def keys(self):
+        return iter(_THIRD_PARTY_KEYS)
+
+    def items(self):
+        return ((key, getattr(self, key)) for key in _THIRD_PARTY_KEYS)
+
+    def copy(self):
+        return replace(
+            self,
+            purposes=set(self.purposes),
+            permissions=set(self.permissions),
+        )
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+
+_THIRD_PARTY_KEYS = tuple(f.name for f in fields(ThirdPartyRecord))
+
+
+# ============================================================
+# HISTORIAL DE ACCESOS
+# ============================================================
+
+# Valores de access / purpose / actor del historial (códigos locales
+# al proceso, como los de `ACTIVITIES`)
+HISTORY_VALUES = ActivityRegistry()
+
+HISTORY_KEYS = ("timestamp", "access", "purpose", "actor", "activity")
+
+
+class AccessHistory:
+    """
+    Historial de accesos de la SP en columnas: la lista de timestamps
+    (los mismos objetos de los eventos) y arrays de códigos para el
+    tipo de acceso, propósito, actor y actividad.
+
+    Sustituye a la lista de dicts (uno de cinco claves por acceso)
+    con la misma interfaz: `len`, índices y slices, iteración
+    (dicts creados al vuelo), `append(dict)`, igualdad con listas de
+    dicts y la misma representación.
+    """
+
+    __slots__ = ("timestamps", "access", "purpose", "actor", "activity")
+
+    def __init__(self, entries=()):
+        self.timestamps = []
+        self.access = array("i")
+        self.purpose = array("i")
+        self.actor = array("i")
+        self.activity = array("i")
+
+        for entry in entries:
+            self.append(entry)
+
+    def add(self, timestamp, access, purpose=None, actor=None, activity=None):
+        intern = HISTORY_VALUES.intern
+        self.timestamps.append(timestamp)
+        self.access.append(intern(access))
+        self.purpose.append(intern(purpose))
+        self.actor.append(intern(actor))
+        self.activity.append(ACTIVITIES.intern(activity))
+
+    def append(self, entry):
+        self.add(
+            entry["timestamp"],
+            entry.get("access"),
+            entry.get("purpose"),
+            entry.get("actor"),
+            entry.get("activity"),
+        )
+
+    def has_access_after(self, timestamp):
+        """
+        Algún acceso con timestamp posterior a `timestamp`.
+        """
+        return any(ts > timestamp for ts in self.timestamps)
+
+    # --------------------------------------------------------
+    # Interfaz de lista
+    # --------------------------------------------------------
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def __iter__(self):
+        value = HISTORY_VALUES.names
+        activity = ACTIVITIES.names
+        for ts, a, p, r, n in zip(
+            self.timestamps, self.access, self.purpose, self.actor,
+            self.activity
+        ):
+            yield {
+                "timestamp": ts,
+                "access": value[a],
+                "purpose": value[p],
+                "actor": value[r],
+                "activity": activity[n],
+            }
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            history = AccessHistory.__new__(AccessHistory)
+            for column in self.__slots__:
+                setattr(history, column, getattr(self, column)[index])
+            return history
+
+        value = HISTORY_VALUES.names
+        return {
+            "timestamp": self.timestamps[index],
+            "access": value[self.access[index]],
+            "purpose": value[self.purpose[index]],
+            "actor": value[self.actor[index]],
+            "activity": ACTIVITIES.names[self.activity[index]],
+        }
+
+    def copy(self):
+        return self[:]
+
+    def __eq__(self, other):
+        if isinstance(other, AccessHistory):
+            return all(
+                getattr(self, column) == getattr(other, column)
+                for column in self.__slots__
+            )
+        if isinstance(other, list):
+            return list(self) == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(list(self))
+
+    def __reduce__(self):
+        # los códigos son locales al proceso: se serializan los valores
+        value = HISTORY_VALUES.names
+        return _restore_history, (
+            self.timestamps,
+            [value[c] for c in self.access],
+            [value[c] for c in self.purpose],
+            [value[c] for c in self.actor],
+            [ACTIVITIES.names[c] for c in self.activity],
+        )
+
+
+def _restore_history(timestamps, access, purpose, actor, activity):
+    history = AccessHistory()
+    for entry in zip(timestamps, access, purpose, actor, activity):
+        history.add(*entry)
+    return history
+
+
+# ============================================================
+# STICKY POLICY
+# ============================================================
+
+@dataclass(slots=True)
 class StickyPolicy:
     """
     Sticky Policy (SP) asociada a un dato personal.
@@ -34,7 +241,7 @@ class StickyPolicy:
     obligations: Set[str] = field(default_factory=set)
 
     # 🔹 TERCEROS (mini-Sticky Policies)
-    third_parties: Dict[str, dict] = field(default_factory=dict)
+    third_parties: Dict[str, ThirdPartyRecord] = field(default_factory=dict)
 
     # Estados especiales
     processing_restricted: bool = False
@@ -42,109 +249,280 @@ class StickyPolicy:
     erasure_timestamp: Optional[datetime] = None
 
     # Historial
-    access_history: List[dict] = field(default_factory=list)
+    access_history: AccessHistory = field(default_factory=AccessHistory)
+
+    def __post_init__(self):
+        # compatibilidad: historial como lista de dicts
+        if not isinstance(self.access_history, AccessHistory):
+            self.access_history = AccessHistory(self.access_history)
 
 
 # ============================================================
 # BUILDER
 # ============================================================
 
-def build_sticky_policy_from_trace(trace) -> StickyPolicy:
-    sp = StickyPolicy(
-        data_id=trace.attributes.get("concept:name", "unknown")
-    )
+# Actividades que modifican la SP (además de los accesos)
+SP_EVENTS = (
+    "gdpr:giveConsent",
+    "gdpr:consentExpired",
+    "gdpr:restrictProcessing",
+    "gdpr:liftRestriction",
+    "gdpr:eraseData",
+    "gdpr:shareDataWithThirdParty",
+    "gdpr:revokeThirdPartyAccess",
+)
+_SP_EVENT_SET = frozenset(SP_EVENTS)
+
+
+def _apply_event(sp, event):
+    """
+    Aplica un evento de la traza a la SP (los eventos que no están
+    en SP_EVENTS y no son accesos no la modifican).
+    """
+    name = event["concept:name"]
+    if name not in _SP_EVENT_SET and not event.get("gdpr:access"):
+        return
+
+    ts = event["time:timestamp"]
+
+    # ----------------------------------------------------
+    # CONSENTIMIENTO
+    # ----------------------------------------------------
+    if name == "gdpr:giveConsent":
+        sp.consent_given = True
+        sp.consent_timestamp = ts
+        sp.purposes.add(event.get("gdpr:purpose", "unspecified"))
+        sp.obligations.add("log_access")
+
+        max_days = event.get("gdpr:max_time_days")
+        if max_days:
+            sp.consent_expiration_timestamp = ts + timedelta(days=max_days)
+            sp.max_retention_time = sp.consent_expiration_timestamp
+
+    elif name == "gdpr:consentExpired":
+        sp.consent_expired = True
+        sp.consent_expiration_timestamp = ts
+
+    # ----------------------------------------------------
+    # RESTRICCIÓN
+    # ----------------------------------------------------
+    if name == "gdpr:restrictProcessing":
+        sp.processing_restricted = True
+
+    elif name == "gdpr:liftRestriction":
+        sp.processing_restricted = False
+
+    # ----------------------------------------------------
+    # BORRADO
+    # ----------------------------------------------------
+    if name == "gdpr:eraseData":
+        sp.erased = True
+        sp.erasure_timestamp = ts
+
+        # Propagación normativa (Art. 19)
+        for tp in sp.third_parties.values():
+            tp.notified_of_erasure = True
+            tp.active = False
+
+    # ----------------------------------------------------
+    # TERCEROS
+    # ----------------------------------------------------
+    if name == "gdpr:shareDataWithThirdParty":
+        tp_name = event.get("gdpr:third_party")
+        if not tp_name:
+            return
+
+        retention_days = event.get("gdpr:retention_days")
+        retention_until = (
+            ts + timedelta(days=retention_days)
+            if retention_days else None
+        )
 
-    for event in trace:
-        name = event["concept:name"]
-        ts = event["time:timestamp"]
-
-        # ----------------------------------------------------
-        # CONSENTIMIENTO
-        # ----------------------------------------------------
-        if name == "gdpr:giveConsent":
-            sp.consent_given = True
-            sp.consent_timestamp = ts
-            sp.purposes.add(event.get("gdpr:purpose", "unspecified"))
-            sp.obligations.add("log_access")
-
-            max_days = event.get("gdpr:max_time_days")
-            if max_days:
-                sp.consent_expiration_timestamp = ts + timedelta(days=max_days)
-                sp.max_retention_time = sp.consent_expiration_timestamp
-
-        elif name == "gdpr:consentExpired":
-            sp.consent_expired = True
-            sp.consent_expiration_timestamp = ts
-
-        # ----------------------------------------------------
-        # RESTRICCIÓN
-        # ----------------------------------------------------
-        if name == "gdpr:restrictProcessing":
-            sp.processing_restricted = True
-
-        elif name == "gdpr:liftRestriction":
-            sp.processing_restricted = False
-
-        # ----------------------------------------------------
-        # BORRADO
-        # ----------------------------------------------------
-        if name == "gdpr:eraseData":
-            sp.erased = True
-            sp.erasure_timestamp = ts
-
-            # Propagación normativa (Art. 19)
-            for tp in sp.third_parties.values():
-                tp["notified_of_erasure"] = True
-                tp["active"] = False
-
-        # ----------------------------------------------------
-        # TERCEROS
-        # ----------------------------------------------------
-        if name == "gdpr:shareDataWithThirdParty":
-            tp_name = event.get("gdpr:third_party")
-            if not tp_name:
-                continue
-
-            retention_days = event.get("gdpr:retention_days")
-            retention_until = (
-                ts + timedelta(days=retention_days)
-                if retention_days else None
+        tp = sp.third_parties.get(tp_name)
+        if tp is None:
+            tp = sp.third_parties[tp_name] = ThirdPartyRecord(
+                role=event.get("gdpr:role", "processor"),
+                shared_timestamp=ts,
+                retention_until=retention_until,
+                country=event.get("gdpr:country"),
+                transfer_mechanism=event.get("gdpr:transfer_mechanism"),
+                legal_basis=event.get("gdpr:legal_basis"),
+                own_legal_basis=event.get("gdpr:own_legal_basis", False),
             )
 
-            tp = sp.third_parties.setdefault(tp_name, {
-                "role": event.get("gdpr:role", "processor"),
-                "purposes": set(),
-                "permissions": set(),
-                "active": True,
-                "shared_timestamp": ts,
-                "retention_until": retention_until,
-                "country": event.get("gdpr:country"),
-                "transfer_mechanism": event.get("gdpr:transfer_mechanism"),
-                "legal_basis": event.get("gdpr:legal_basis"),
-                "own_legal_basis": event.get("gdpr:own_legal_basis", False),
-                "notified_of_erasure": False,
-            })
-
-            tp["purposes"].add(event.get("gdpr:purpose", "unspecified"))
-            if event.get("gdpr:access"):
-                tp["permissions"].add(event["gdpr:access"])
-
-        elif name == "gdpr:revokeThirdPartyAccess":
-            tp_name = event.get("gdpr:third_party")
-            if tp_name in sp.third_parties:
-                sp.third_parties[tp_name]["active"] = False
-
-        # ----------------------------------------------------
-        # ACCESOS
-        # ----------------------------------------------------
+        tp.purposes.add(event.get("gdpr:purpose", "unspecified"))
         if event.get("gdpr:access"):
-            sp.permissions.add(event["gdpr:access"])
-            sp.access_history.append({
-                "timestamp": ts,
-                "access": event["gdpr:access"],
-                "purpose": event.get("gdpr:purpose"),
-                "actor": event.get("gdpr:actor"),
-                "activity": name
-            })
+            tp.permissions.add(event["gdpr:access"])
+
+    elif name == "gdpr:revokeThirdPartyAccess":
+        tp_name = event.get("gdpr:third_party")
+        if tp_name in sp.third_parties:
+            sp.third_parties[tp_name].active = False
+
+    # ----------------------------------------------------
+    # ACCESOS
+    # ----------------------------------------------------
+    if event.get("gdpr:access"):
+        sp.permissions.add(event["gdpr:access"])
+        sp.access_history.add(
+            ts,
+            event["gdpr:access"],
+            event.get("gdpr:purpose"),
+            event.get("gdpr:actor"),
+            name,
+        )
+
+
+# Eventos aplicados entre dos checkpoints del builder
+CHECKPOINT_EVERY = 16
+
+
+def _copy_policy(sp, access_history):
+    """
+    Copia independiente de la SP (conjuntos y terceros copiados)
+    con el historial `access_history`.
+    """
+    return replace(
+        sp,
+        purposes=set(sp.purposes),
+        permissions=set(sp.permissions),
+        obligations=set(sp.obligations),
+        third_parties={
+            name: tp.copy() for name, tp in sp.third_parties.items()
+        },
+        access_history=access_history,
+    )
+
+
+class StickyPolicyBuilder:
+    """
+    Construcción incremental de la Sticky Policy.
+
+    - `feed(event)` aplica el siguiente evento de la traza
+    - `snapshot()` devuelve una SP independiente del estado actual
+    - cada `checkpoint_every` eventos aplicados se guarda un
+      checkpoint; `resume_at(position)` devuelve un builder en el
+      último checkpoint anterior a `position`, desde el que una
+      variante derivada de la traza (mismos eventos hasta
+      `position`) continúa sin recorrer de nuevo el prefijo común
+      (`checkpoint_every=None`: sin checkpoints)
+
+    `position` es el nº de posiciones de la traza ya consumidas.
+    """
+
+    def __init__(self, data_id="unknown", checkpoint_every=CHECKPOINT_EVERY):
+        self._sp = StickyPolicy(data_id=data_id)
+        self.position = 0
+        self.checkpoint_every = checkpoint_every
+        self._pending = 0
+        # (posición, SP sin historial, longitud del historial)
+        self._checkpoints = [
+            (0, _copy_policy(self._sp, AccessHistory()), 0)
+        ]
+
+    @classmethod
+    def from_trace(cls, trace):
+        builder = cls(trace.attributes.get("concept:name", "unknown"))
+        builder.feed_trace(trace)
+        return builder
+
+    def feed(self, event):
+        """
+        Aplica el siguiente evento de la traza.
+        """
+        _apply_event(self._sp, event)
+        self.position += 1
+        self._count()
+
+    def feed_trace(self, trace):
+        """
+        Aplica los eventos de la traza desde `self.position`
+        (solo los que pueden modificar la SP).
+        """
+        index = get_trace_index(trace)
+        events = index.events
+        sp = self._sp
+
+        for i in index.select_positions(
+            SP_EVENTS, access=True, start=self.position
+        ):
+            _apply_event(sp, events[i])
+            self.position = i + 1
+            self._count()
+
+        self.position = max(self.position, len(events))
+
+    def _count(self):
+        self._pending += 1
+        if self._pending == self.checkpoint_every:
+            self._checkpoints.append((
+                self.position,
+                _copy_policy(self._sp, AccessHistory()),
+                len(self._sp.access_history)
+            ))
+            self._pending = 0
+
+    @property
+    def policy(self):
+        """
+        SP en construcción (se actualiza con cada evento; no debe
+        modificarse desde fuera: `snapshot()` da una copia).
+        """
+        return self._sp
+
+    def snapshot(self):
+        return _copy_policy(self._sp, self._sp.access_history.copy())
+
+    def resume_at(self, position):
+        """
+        Nuevo builder en el último checkpoint con posición <= `position`.
+        """
+        i = bisect_right([cp[0] for cp in self._checkpoints], position) - 1
+        checkpoint_position, sp, history_length = self._checkpoints[i]
+
+        builder = StickyPolicyBuilder.__new__(StickyPolicyBuilder)
+        builder._sp = _copy_policy(
+            sp, self._sp.access_history[:history_length]
+        )
+        builder.position = checkpoint_position
+        builder.checkpoint_every = self.checkpoint_every
+        builder._pending = 0
+        builder._checkpoints = self._checkpoints[:i + 1]
+        return builder
+
+
+# ============================================================
+# API
+# ============================================================
+
+def _cached_builder(trace):
+    return get_trace_cache(trace, "_gdpr_sp_builder")
+
+
+def _cache_builder(trace, builder):
+    set_trace_cache(trace, "_gdpr_sp_builder", builder)
+
+
+def build_sticky_policy_from_trace(trace) -> StickyPolicy:
+    builder = StickyPolicyBuilder.from_trace(trace)
+    _cache_builder(trace, builder)
+    return builder.snapshot()
+
+
+def derive_sticky_policy(trace, base) -> StickyPolicy:
+    """
+    SP de una variante de `base` creada con `cow_trace` (traza no
+    conforme, remediada): reutiliza el estado de `base` en el
+    prefijo de eventos compartido y solo aplica el resto.
+    Resultado idéntico a `build_sticky_policy_from_trace(trace)`.
+    """
+    base_builder = _cached_builder(base)
+    if base_builder is None:
+        base_builder = StickyPolicyBuilder.from_trace(base)
+        _cache_builder(base, base_builder)
+
+    builder = base_builder.resume_at(shared_prefix(base, trace))
+    builder.feed_trace(trace)
+    _cache_builder(trace, builder)
 
-    return sp
+    return builder.snapshot()
@@ -0,0 +1,241 @@
+# gdpr/trace_index.py
+
+"""
+Índice por traza de actividades, accesos y accessLogs.
+
+Se construye una sola vez por traza y lo consultan los validadores,
+el builder de la Sticky Policy y los fixers de remediación, evitando
+reconstruir listas filtradas (`get_events`) en cada consulta.
+
+Las cachés por traza (este índice, la marca de traza ordenada de
+`sort_trace_by_time` y el builder de la Sticky Policy) solo se
+reutilizan dentro de un `trace_cache_scope()`, que abren el pipeline,
+los generadores, la remediación y la validación secuencial; al salir
+del ámbito se descartan. Fuera de un ámbito cada consulta reconstruye
+el índice, así que los cambios in-place hechos entre dos llamadas
+(p.ej. `trace[1]["gdpr:access"] = True`) nunca dejan un índice
+obsoleto.
+
+Invalidación dentro de un ámbito:
+- Automática si cambia la lista de eventos (reasignación de `_list`
+  o cambio de longitud).
+- Explícita con `invalidate_trace_index(trace)` tras modificar
+  atributos de eventos ya existentes (timestamps, `gdpr:access`...)
+  o sustituir un evento.
+"""
+
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from heapq import merge
+
+from gdpr.vocabulary import GDPR_EVENTS
+
+
+class TraceIndex:
+
+    def __init__(self, trace):
+        self.events = list(trace)
+
+        # actividad -> posiciones (orden de la traza)
+        self.positions = defaultdict(list)
+        # posiciones de eventos con gdpr:access
+        self.access_positions = []
+        # actividad relacionada -> posiciones de sus accessLog
+        self.access_logs_by_activity = defaultdict(list)
+        # actividades con al menos un acceso
+        self.accessed_activities = set()
+
+        access_log = GDPR_EVENTS["ACCESS_LOG"]
+
+        for i, e in enumerate(self.events):
+            name = e["concept:name"]
+            self.positions[name].append(i)
+
+            if e.get("gdpr:access"):
+                self.access_positions.append(i)
+                self.accessed_activities.add(name)
+
+            if name == access_log:
+                self.access_logs_by_activity[
+                    e.get("gdpr:related_activity")
+                ].append(i)
+
+        self._timestamps = {}
+
+    # --------------------------------------------------------
+    # CONSULTAS
+    # --------------------------------------------------------
+
+    def get_events(self, name):
+        return [self.events[i] for i in self.positions.get(name, ())]
+
+    def first(self, name):
+        positions = self.positions.get(name)
+        return self.events[positions[0]] if positions else None
+
+    def last(self, name):
+        positions = self.positions.get(name)
+        return self.events[positions[-1]] if positions else None
+
+    def has(self, name):
+        return bool(self.positions.get(name))
+
+    def access_events(self):
+        return [self.events[i] for i in self.access_positions]
+
+    def access_logs_for(self, activity):
+        return [
+            self.events[i]
+            for i in self.access_logs_by_activity.get(activity, ())
+        ]
+
+    def timestamps(self, name):
+        """
+        Timestamps ordenados de una actividad (cacheado).
+        """
+        if name not in self._timestamps:
+            self._timestamps[name] = sorted(
+                e["time:timestamp"] for e in self.get_events(name)
+            )
+        return self._timestamps[name]
+
+    def access_log_timestamps(self, activity):
+        """
+        Timestamps ordenados de los accessLog de una actividad (cacheado).
+        """
+        key = ("access_log", activity)
+        if key not in self._timestamps:
+            self._timestamps[key] = sorted(
+                e["time:timestamp"] for e in self.access_logs_for(activity)
+            )
+        return self._timestamps[key]
+
+    def select(self, names, access=False):
+        """
+        Eventos cuyo nombre está en `names` (y, opcionalmente,
+        todos los accesos), en el orden original de la traza.
+        """
+        return [
+            self.events[i] for i in self.select_positions(names, access)
+        ]
+
+    def select_positions(self, names, access=False, start=0):
+        """
+        Posiciones de `select(names, access)`, a partir de `start`.
+        """
+        runs = [self.positions[n] for n in names if n in self.positions]
+        if access:
+            runs.append(self.access_positions)
+        if start:
+            runs = [run[bisect_left(run, start):] for run in runs]
+
+        last = None
+        selected = []
+        for i in merge(*runs):
+            if i != last:
+                selected.append(i)
+                last = i
+        return selected
+
+
+# ============================================================
+# CACHÉ POR TRAZA
+# ============================================================
+
+_CACHE_ATTRIBUTES = ("_gdpr_index", "_gdpr_sorted", "_gdpr_sp_builder")
+
+# trazas con cachés en el ámbito activo (id -> traza); None fuera
+# de un ámbito
+_scope = ContextVar("gdpr_trace_cache_scope", default=None)
+
+
+@contextmanager
+def trace_cache_scope():
+    """
+    Ámbito en el que se reutilizan las cachés de las trazas. Los
+    ámbitos anidados comparten el del más externo, que descarta las
+    cachés al salir.
+    """
+    if _scope.get() is not None:
+        yield
+        return
+
+    traces = {}
+    token = _scope.set(traces)
+    try:
+        yield
+    finally:
+        _scope.reset(token)
+        for trace in traces.values():
+            invalidate_trace_index(trace)
+
+
+def _event_list(trace):
+    return getattr(trace, "_list", trace)
+
+
+def get_trace_cache(trace, attribute):
+    """
+    Valor cacheado en `attribute` si hay un ámbito activo y la lista
+    de eventos no ha cambiado desde que se guardó; si no, None.
+    """
+    if _scope.get() is None:
+        return None
+
+    cached = getattr(trace, attribute, None)
+    if cached is None:
+        return None
+
+    value, source, length = cached
+    events = _event_list(trace)
+    if source is events and length == len(events):
+        return value
+    return None
+
+
+def set_trace_cache(trace, attribute, value):
+    """
+    Guarda `value` en `attribute` hasta el final del ámbito activo
+    (fuera de un ámbito no se guarda).
+    """
+    traces = _scope.get()
+    if traces is None:
+        return
+
+    events = _event_list(trace)
+    try:
+        setattr(trace, attribute, (value, events, len(events)))
+    except AttributeError:
+        return  # p.ej. listas planas: sin caché
+    traces[id(trace)] = trace
+
+
+def get_trace_index(trace):
+    """
+    Devuelve el índice de la traza. Dentro de un `trace_cache_scope`
+    se reutiliza mientras no cambie la lista de eventos.
+    """
+    index = get_trace_cache(trace, "_gdpr_index")
+    if index is None:
+        index = TraceIndex(trace)
+        set_trace_cache(trace, "_gdpr_index", index)
+    return index
+
+
+def invalidate_trace_index(trace):
+    """
+    Descarta las cachés de la traza: el índice, la marca de
+    "ordenada" de `sort_trace_by_time` y el builder de la Sticky
+    Policy.
+    """
+    for attribute in _CACHE_ATTRIBUTES:
+        try:
+            delattr(trace, attribute)
+        except AttributeError:
+            pass
+
+
+def get_events(trace, event_name):
+    return get_trace_index(trace).get_events(event_name)
@@ -0,0 +1,101 @@
+# gdpr/trace_overlay.py
+
+"""
+Copias copy-on-write de trazas.
+
+`cow_trace(trace)` sustituye a `copy.deepcopy(trace)` cuando la copia
+solo va a modificar algunos eventos (inyección de violaciones,
+remediación): cada evento de la copia comparte el dict de atributos
+del evento original y solo lo materializa en su primera escritura.
+
+Contrato: el evento original no debe modificarse mientras existan
+copias que lo compartan. Si el original es también un `CowEvent`
+(copia de una copia) la protección es en ambos sentidos.
+"""
+
+import copy
+
+from pm4py.objects.log.obj import Event, Trace
+
+
+class CowEvent(Event):
+    """
+    Evento que lee del dict de su evento base hasta la primera
+    escritura (`__setitem__` / `__delitem__`), momento en que copia
+    los atributos con el mismo criterio que `Event.__deepcopy__`.
+    """
+
+    def __init__(self, base):
+        self._dict = base._dict
+        self._owned = False
+
+    @property
+    def materialized(self):
+        return self._owned
+
+    def _own(self):
+        if not self._owned:
+            self._dict = {
+                k: copy.deepcopy(v) if type(v) is dict else v
+                for k, v in self._dict.items()
+            }
+            self._owned = True
+
+    def __setitem__(self, key, value):
+        self._own()
+        self._dict[key] = value
+
+    def __delitem__(self, key):
+        self._own()
+        del self._dict[key]
+
+
+def cow_trace(trace):
+    """
+    Copia de la traza que comparte los eventos no modificados.
+
+    - Atributos de traza: copia superficial (listas, dicts y sets
+      se copian a su vez; la Sticky Policy se reconstruye en el
+      pipeline, no se modifica in-place)
+    - Eventos: `CowEvent` sobre cada evento original
+
+    Para trazas que no son de pm4py (p.ej. listas de dicts en los
+    tests) se mantiene `copy.deepcopy`.
+    """
+    if not isinstance(trace, Trace):
+        return copy.deepcopy(trace)
+
+    attributes = {
+        k: copy.copy(v) if isinstance(v, (list, dict, set)) else v
+        for k, v in trace.attributes.items()
+    }
+
+    return Trace(
+        [
+            CowEvent(e) if isinstance(e, Event) else copy.deepcopy(e)
+            for e in trace._list
+        ],
+        attributes=attributes
+    )
+
+
+_NO_DICT = object()
+
+
+def shared_prefix(base, derived):
+    """
+    Nº de eventos iniciales que `derived` comparte sin cambios con
+    `base`: el mismo evento o un `CowEvent` aún no materializado
+    sobre el mismo dict de atributos.
+    """
+    base_events = getattr(base, "_list", base)
+    derived_events = getattr(derived, "_list", derived)
+
+    n = 0
+    for b, d in zip(base_events, derived_events):
+        if d is not b and (
+            getattr(d, "_dict", _NO_DICT) is not getattr(b, "_dict", None)
+        ):
+            break
+        n += 1
+    return n
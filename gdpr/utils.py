@@ -2,12 +2,92 @@
 
 from datetime import datetime
 
+from gdpr.trace_index import get_trace_cache, set_trace_cache
+
+
+def _event_list(trace):
+    return getattr(trace, "_list", trace)
+
+
 def sort_trace_by_time(trace):
-    events = sorted(
-        trace,
-        key=lambda e: e.get("time:timestamp", datetime.min)
+    """
+    Ordena la traza por timestamp (orden estable).
+
+    - Extrae los timestamps una sola vez (sin lambda por comparación)
+      y detecta el prefijo ya ordenado: si cubre toda la traza no se
+      reordena; si no, el prefijo es un único run para Timsort, que
+      solo ordena la cola y la mezcla (los eventos originales ya
+      vienen en orden y los sintéticos se añaden al final)
+    - Dentro de un `trace_cache_scope` deja la traza marcada como
+      ordenada: llamadas repetidas son gratuitas mientras no cambie
+      la lista de eventos. Tras modificar timestamps in-place hay que
+      llamar a `invalidate_trace_index(trace)`, que también borra la
+      marca
+    """
+    if get_trace_cache(trace, "_gdpr_sorted"):
+        return
+
+    events = _event_list(trace)
+
+    keys = [e.get("time:timestamp", datetime.min) for e in events]
+
+    # longitud del prefijo ordenado
+    prefix = 1
+    while prefix < len(keys) and not keys[prefix] < keys[prefix - 1]:
+        prefix += 1
+
+    if prefix < len(keys):
+        # Timsort sobre el array de claves: el prefijo es un único run
+        # ya ordenado, así que solo ordena la cola y la mezcla con él
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        set_trace_events(trace, [events[i] for i in order])
+
+    set_trace_cache(trace, "_gdpr_sorted", True)
+
+
+def set_trace_events(trace, events):
+    """
+    Sustituye la lista de eventos de la traza (pm4py o lista plana).
+    """
+    if hasattr(trace, "_list"):
+        trace._list = events
+    else:
+        trace[:] = events
+
+
+def insert_events(trace, insertions):
+    """
+    Inserta varios eventos en una sola pasada lineal.
+
+    `insertions`: pares (pos, evento), con `pos` relativo a la traza
+    ANTES de insertar (el evento queda delante del que ocupaba `pos`;
+    pos >= len(trace) equivale a añadir al final). Con la misma `pos`
+    se respeta el orden dado.
+
+    Equivale a encadenar `trace.insert` corrigiendo los índices, pero
+    en O(n + k) en lugar de O(n·k).
+    """
+    if not insertions:
+        return
+
+    events = list(trace)
+    n = len(events)
+
+    pending = sorted(
+        ((min(pos, n), k, event) for k, (pos, event) in enumerate(insertions)),
+        key=lambda item: item[:2]
     )
-    trace._list = events
+
+    merged = []
+    start = 0
+    for pos, _, event in pending:
+        merged.extend(events[start:pos])
+        merged.append(event)
+        start = pos
+    merged.extend(events[start:])
+
+    set_trace_events(trace, merged)
+
 
 def get_first_event_timestamp(trace):
     return min(event["time:timestamp"] for event in trace)
@@ -0,0 +1,480 @@
+# gdpr/validators/dataframe.py
+
+"""
+Validación del log completo como una tabla plana (modo batch).
+
+`validate_log_dataframe(df)` recibe una fila por evento, con las
+mismas columnas que el export Parquet (`case_id`, `activity`,
+`timestamp`, `gdpr_*` y `case:*` para atributos de traza), y calcula
+las violaciones de todas las trazas con operaciones agrupadas por
+caso (acumulados, forward-fill del último estado, merges por caso),
+sin construir objetos `Trace`.
+
+- El orden de los eventos de cada caso es el orden de las filas
+  (los casos pueden estar intercalados)
+- Devuelve una tabla de violaciones: case_id, type, severity,
+  blocking, message y events (etiquetas del índice de `df`)
+- Reglas: las de `validate_trace_sequential` salvo las de Sticky
+  Policy, que dependen del objeto construido por el pipeline y no
+  existen en una tabla de eventos
+"""
+
+import numpy as np
+import pandas as pd
+
+from gdpr.importers.parquet_importer import column_name, trace_column_name
+from gdpr.validators.vectorized import first_later_response
+from gdpr.vocabulary import GDPR_EVENTS
+
+VIOLATION_COLUMNS = [
+    "case_id", "type", "severity", "blocking", "message", "events"
+]
+
+# columnas opcionales (atributo -> columna de la tabla)
+_OPTIONAL_COLUMNS = {
+    "access": column_name("gdpr:access"),
+    "operation": column_name("gdpr:operation"),
+    "purpose": column_name("gdpr:purpose"),
+    "data_scope": column_name("gdpr:data_scope"),
+    "consent_type": column_name("gdpr:consent_type"),
+    "related": column_name("gdpr:related_activity"),
+    "default_purpose": trace_column_name("gdpr:default_purpose"),
+}
+
+BREACH_DEADLINE = pd.Timedelta(hours=72)
+RIGHTS_DEADLINE = pd.Timedelta(days=30)
+
+
+# ============================================================
+# CONVERSIÓN
+# ============================================================
+
+def log_to_dataframe(log):
+    """
+    Tabla plana (una fila por evento) a partir de un iterable de
+    trazas, con los nombres de columna del export Parquet.
+    """
+    rows = []
+
+    for i, trace in enumerate(log):
+        case_id = trace.attributes.get("concept:name", str(i))
+        case_columns = {
+            trace_column_name(k): v
+            for k, v in trace.attributes.items()
+            if k != "concept:name"
+        }
+
+        for event in trace:
+            row = {"case_id": case_id}
+            row.update(case_columns)
+            for key, value in event.items():
+                row[column_name(key)] = value
+            rows.append(row)
+
+    return pd.DataFrame(rows)
+
+
+def _prepare(df):
+    """
+    Columnas normalizadas: caso (código por orden de aparición),
+    posición global y atributos opcionales (None si no existen).
+    """
+    case, uniques = pd.factorize(df["case_id"], sort=False)
+
+    timestamp = df["timestamp"]
+    if not pd.api.types.is_datetime64_any_dtype(timestamp):
+        timestamp = pd.to_datetime(timestamp, format="ISO8601")
+
+    table = pd.DataFrame({
+        "case": case,
+        "pos": np.arange(len(df)),
+        "label": df.index,
+        "activity": df["activity"].array,
+        "ts": timestamp.array,
+    })
+
+    for name, column in _OPTIONAL_COLUMNS.items():
+        values = df[column].array if column in df.columns else None
+        table[name] = values
+
+    # gdpr:access se evalúa por su valor de verdad, como `e.get(...)`
+    access = table["access"]
+    table["access"] = access.where(access.notna(), False).astype(bool)
+
+    return table, uniques
+
+
+def _is(table, *names):
+    return table["activity"].isin([GDPR_EVENTS[name] for name in names])
+
+
+def _seen_before(table, mask):
+    """
+    Hay algún evento de `mask` antes de cada fila en su caso.
+    """
+    mask = mask.astype(np.int64)
+    return (mask.groupby(table["case"]).cumsum() - mask) > 0
+
+
+def _last_state(table, state):
+    """
+    Último estado definido (no nulo) hasta cada fila en su caso.
+    """
+    return state.groupby(table["case"]).ffill()
+
+
+def _or_default(series, default):
+    return series.where(series.notna(), default).astype(str)
+
+
+def _same(a, b):
+    """
+    Igualdad con nulos iguales entre sí (como None == None).
+    """
+    return (a == b) | (a.isna() & b.isna())
+
+
+# ============================================================
+# REGLAS
+# ============================================================
+
+def _single(table, mask, type, severity, message, blocking=False):
+    rows = table[mask]
+    return pd.DataFrame({
+        "case": rows["case"],
+        "pos": rows["pos"],
+        "type": type,
+        "severity": severity,
+        "blocking": blocking,
+        "message": message[mask] if isinstance(message, pd.Series) else message,
+        "events": [[label] for label in rows["label"].tolist()],
+    })
+
+
+def _grouped(table, mask, cases, type, severity, message, blocking=False):
+    """
+    Una violación por caso de `cases` con todos los eventos de `mask`.
+    """
+    rows = table[mask & table["case"].isin(cases)]
+    groups = rows.groupby("case", sort=False)
+    first = groups["pos"].first()
+    return pd.DataFrame({
+        # int64 explícito: sin grupos, el índice vacío sería object
+        "case": first.index.to_numpy(dtype=np.int64),
+        "pos": first.to_numpy(dtype=np.int64),
+        "type": type,
+        "severity": severity,
+        "blocking": blocking,
+        "message": message,
+        "events": groups["label"].agg(list).tolist(),
+    })
+
+
+def _consent_before_access(table):
+    access = table["access"]
+    is_consent = _is(table, "CONSENT")
+
+    with_consent = table.loc[is_consent, "case"].unique()
+    with_access = table.loc[access, "case"].unique()
+    without_consent = np.setdiff1d(with_access, with_consent)
+
+    missing = _grouped(
+        table, access, without_consent,
+        "missing_consent", "high",
+        "Hay accesos a datos personales sin consentimiento previo",
+        blocking=True
+    )
+
+    # primer consentimiento de cada caso (NaT si no tiene): `reindex`
+    # conserva el tipo datetime aunque no haya ningún consentimiento
+    first_consent = table[is_consent].groupby("case")["ts"].first()
+    consent_ts = first_consent.reindex(table["case"]).set_axis(table.index)
+    early = _single(
+        table, access & (table["ts"] < consent_ts),
+        "consent_after_access", "high",
+        "Acceso a datos antes de obtener el consentimiento",
+        blocking=True
+    )
+
+    return pd.concat([missing, early], ignore_index=True)
+
+
+def _implicit_consent(table):
+    return _single(
+        table,
+        _is(table, "CONSENT")
+        & (_or_default(table["consent_type"], "implicit") != "explicit"),
+        "implicit_consent", "medium",
+        "El consentimiento no fue explícito"
+    )
+
+
+def _access_after_state(table, state, type, severity, default, template):
+    is_state = _is(table, state)
+    mask = table["access"] & ~is_state & _seen_before(table, is_state)
+    return _single(
+        table, mask, type, severity,
+        _format(template, _or_default(table["operation"], default)),
+        blocking=True
+    )
+
+
+def _format(template, values):
+    """
+    `template.format(v)` para cada valor de la serie, vectorizado.
+    """
+    before, after = template.split("{}")
+    return before + values + after
+
+
+def _processing_restriction(table):
+    is_restrict = _is(table, "RESTRICT")
+    is_marker = is_restrict | _is(table, "LIFT_RESTRICTION")
+
+    state = pd.Series(np.nan, index=table.index)
+    state[is_marker] = is_restrict[is_marker].astype(float)
+    active = _last_state(table, state) == 1
+
+    operation = _or_default(table["operation"], "read")
+    mask = table["access"] & ~is_marker & active & (operation != "read")
+
+    return _single(
+        table, mask, "access_during_restriction", "high",
+        _format("Operación '{}' durante restricción de tratamiento", operation),
+        blocking=True
+    )
+
+
+def _erase_without_processing(table):
+    is_erase = _is(table, "ERASE")
+    with_access = table.loc[table["access"], "case"].unique()
+    cases = np.setdiff1d(table.loc[is_erase, "case"].unique(), with_access)
+
+    return _grouped(
+        table, is_erase, cases,
+        "erase_without_processing", "low",
+        "Se solicita borrado sin que conste tratamiento previo"
+    )
+
+
+def _access_log_without_access(table):
+    is_log = _is(table, "ACCESS_LOG")
+
+    accessed = pd.MultiIndex.from_arrays([
+        table.loc[table["access"], "case"],
+        table.loc[table["access"], "activity"],
+    ])
+    logged = pd.MultiIndex.from_arrays([table["case"], table["related"]])
+
+    return _single(
+        table, is_log & ~logged.isin(accessed),
+        "access_log_without_access", "low",
+        "AccessLog sin evento de acceso asociado"
+    )
+
+
+def _data_minimization(table):
+    operation = table["operation"]
+    mask = (
+        table["access"]
+        & (table["data_scope"] == "excessive")
+        & operation.isin(["read", "share", "collect"])
+    )
+    return _single(
+        table, mask, "data_minimization_violation", "medium",
+        _format(
+            "Operación '{}' con acceso excesivo a datos",
+            operation.astype(str)
+        )
+    )
+
+
+def _purpose_limitation(table):
+    operation = _or_default(table["operation"], "read")
+    mask = table["access"] & ~_same(table["purpose"], table["default_purpose"])
+
+    violations = _single(
+        table, mask, "purpose_violation", "high",
+        _format("Operación '{}' con propósito no autorizado", operation),
+        blocking=True
+    )
+    violations.loc[operation[mask] == "share", "severity"] = "critical"
+    return violations
+
+
+def _access_without_permission(table):
+    granted = table["activity"] == "gdpr:permissionGranted"
+    revoked = table["activity"].isin(
+        ["gdpr:withdrawConsent", "gdpr:consentExpired"]
+    )
+    is_marker = granted | revoked | table["activity"].isin(
+        ["gdpr:restrictProcessing", "gdpr:liftRestriction"]
+    )
+
+    state = pd.Series(np.nan, index=table.index)
+    state[granted] = 1.0
+    state[revoked] = 0.0
+    active = _last_state(table, state) == 1
+
+    return _single(
+        table, table["access"] & ~is_marker & ~active,
+        "access_without_consent", "high",
+        "Acceso a datos sin consentimiento activo",
+        blocking=True
+    )
+
+
+def _missing_access_log(table):
+    logs = table[_is(table, "ACCESS_LOG")]
+    last_log = logs.groupby(["case", "related"], dropna=False)["ts"].max()
+
+    access = table[table["access"]]
+    keys = pd.MultiIndex.from_arrays([access["case"], access["activity"]])
+    last = last_log.reindex(keys).set_axis(access.index)
+
+    mask = pd.Series(False, index=table.index)
+    mask[access.index] = last.isna() | (last < access["ts"])
+
+    return _single(
+        table, mask, "missing_access_log", "medium",
+        "Acceso a datos sin registro en accessLog"
+    )
+
+
+def _deadline(table, request, response, deadline, missing, late):
+    """
+    Primera respuesta (en orden de la traza) posterior a cada
+    solicitud, con búsqueda binaria por caso (`first_later_response`):
+    no se empareja cada solicitud con cada respuesta del caso.
+    """
+    requests = np.flatnonzero(_is(table, request).to_numpy())
+    responses = np.flatnonzero(_is(table, response).to_numpy())
+
+    case = table["case"].to_numpy(np.int64)
+    ts = table["ts"].array
+    # los casos pueden estar intercalados: orden creciente de un caso
+    # al siguiente y, dentro de cada caso, el de la traza
+    order = case * len(table) + table["pos"].to_numpy(np.int64)
+
+    first = first_later_response(
+        case[requests], ts.asi8[requests],
+        case[responses], ts.asi8[responses], order[responses],
+    )
+    answered = first >= 0
+    labels = table["label"].to_numpy()
+
+    rows = requests[~answered]
+    missing_rows = pd.DataFrame({
+        "case": case[rows],
+        "pos": rows,
+        **missing,
+        "events": [[label] for label in labels[rows].tolist()],
+    })
+
+    rows = requests[answered]
+    found = first[answered] - case[rows] * len(table)
+    is_late = ts[found] > ts[rows] + deadline
+    rows, found = rows[is_late], found[is_late]
+    late_rows = pd.DataFrame({
+        "case": case[rows],
+        "pos": rows,
+        **late,
+        "events": [
+            [label, label_r]
+            for label, label_r in zip(
+                labels[rows].tolist(), labels[found].tolist()
+            )
+        ],
+    })
+
+    return pd.concat([missing_rows, late_rows], ignore_index=True)
+
+
+def _rules(table):
+    """
+    Violaciones por regla, en el orden de `validate_trace_sequential`.
+    """
+    yield _consent_before_access(table)
+    yield _implicit_consent(table)
+    yield _access_after_state(
+        table, "CONSENT_EXPIRED", "access_after_consent_expiration", "high",
+        "unknown", "Acceso ({}) a datos tras la expiración del consentimiento"
+    )
+    yield _access_after_state(
+        table, "WITHDRAW", "access_after_withdrawal", "high",
+        "read", "Operación '{}' tras la retirada del consentimiento"
+    )
+    yield _processing_restriction(table)
+    yield _erase_without_processing(table)
+    yield _access_after_state(
+        table, "ERASE", "access_after_erasure", "critical",
+        "unknown", "Operación '{}' tras solicitud de borrado"
+    )
+    yield _access_log_without_access(table)
+    yield _data_minimization(table)
+    yield _purpose_limitation(table)
+    yield _access_without_permission(table)
+    yield _missing_access_log(table)
+    yield _deadline(
+        table, "BREACH", "NOTIFY_BREACH", BREACH_DEADLINE,
+        {
+            "type": "missing_breach_notification",
+            "severity": "critical",
+            "blocking": True,
+            "message": "Brecha detectada sin notificación",
+        },
+        {
+            "type": "late_breach_notification",
+            "severity": "critical",
+            "blocking": False,
+            "message": "Notificación de brecha fuera de las 72 horas legales",
+        }
+    )
+    yield _deadline(
+        table, "REQUEST_INFO", "PROVIDE_INFO", RIGHTS_DEADLINE,
+        {
+            "type": "missing_right_response",
+            "severity": "medium",
+            "blocking": False,
+            "message": "Solicitud de información sin respuesta",
+        },
+        {
+            "type": "late_right_response",
+            "severity": "medium",
+            "blocking": False,
+            "message": "Respuesta a derechos fuera del plazo legal (30 días)",
+        }
+    )
+
+
+# ============================================================
+# API
+# ============================================================
+
+def validate_log_dataframe(df):
+    """
+    Valida todas las trazas de la tabla de eventos de una vez.
+
+    Las violaciones se ordenan por caso (orden de aparición) y,
+    dentro de cada caso, como las devuelve `validate_trace` para
+    esa traza (sin las reglas de Sticky Policy).
+    """
+    if df.empty:
+        return pd.DataFrame(columns=VIOLATION_COLUMNS)
+
+    table, uniques = _prepare(df)
+
+    frames = []
+    for rule, frame in enumerate(_rules(table)):
+        if len(frame):
+            frames.append(frame.assign(rule=rule))
+
+    if not frames:
+        return pd.DataFrame(columns=VIOLATION_COLUMNS)
+
+    violations = pd.concat(frames, ignore_index=True)
+    violations = violations.sort_values(["case", "rule", "pos"], kind="stable")
+    violations["case_id"] = uniques[violations["case"].to_numpy(np.int64)]
+    violations["blocking"] = violations["blocking"].astype(bool)
+
+    return violations[VIOLATION_COLUMNS].reset_index(drop=True)
@@ -0,0 +1,785 @@
+"""
+Motor de validación fusionado (single-pass).
+
+En lugar de ejecutar los quince validadores de forma secuencial
+(cada uno recorriendo la traza completa), el motor recorre la traza
+UNA sola vez y reparte cada evento entre un conjunto de reglas con
+estado (máquinas de estado de consentimiento, retirada, restricción,
+borrado, brechas, derechos y Sticky Policy).
+
+Las violaciones emitidas son exactamente las mismas (tipo, severidad,
+mensaje, eventos y orden) que las de la composición secuencial de
+`validate_trace_sequential`.
+"""
+
+from gdpr.deadlines import (
+    BREACH_NOTIFICATION_DEADLINE,
+    RIGHT_RESPONSE_DEADLINE,
+    DeadlineScheduler,
+)
+from gdpr.vocabulary import ACTIVITIES, GDPR_EVENTS
+from .sticky_policy import (
+    validate_sp_internal_consistency,
+    validate_sp_retention,
+    validate_sp_third_parties,
+)
+
+
+# ============================================================
+# BASE
+# ============================================================
+
+class Rule:
+    """
+    Regla con estado alimentada por el motor.
+
+    - `names`: actividades que se enrutan a `on_event`
+    - `handles_access`: si la regla recibe los accesos (`on_access`)
+      cuyo nombre NO está en `names`
+
+    `finish()` no modifica el estado: puede llamarse varias veces.
+    `compact()` descarta el estado que ya no puede cambiar el
+    resultado de `finish()` y devuelve las violaciones que ya están
+    decididas (`finish()` deja de incluirlas); lo usa el monitor en
+    streaming para acotar la memoria de los casos largos.
+    """
+
+    names = frozenset()
+    handles_access = False
+
+    def __init__(self, trace):
+        self.found = []
+
+    def on_event(self, event, access):
+        pass
+
+    def on_access(self, event):
+        pass
+
+    def finish(self):
+        return [_copy_violation(v) for v in self.found]
+
+    def compact(self):
+        return []
+
+
+def _copy_violation(v):
+    return {**v, "events": list(v["events"])}
+
+
+# ============================================================
+# FASE 1 – CONSENTIMIENTO
+# ============================================================
+
+class ConsentBeforeAccessRule(Rule):
+    names = frozenset({GDPR_EVENTS["CONSENT"]})
+    handles_access = True
+
+    def __init__(self, trace):
+        super().__init__(trace)
+        self.consent_ts = None
+        self.access_events = []
+
+    def on_event(self, event, access):
+        if self.consent_ts is None:
+            self.consent_ts = event["time:timestamp"]
+        if access:
+            self.access_events.append(event)
+
+    def on_access(self, event):
+        self.access_events.append(event)
+
+    def finish(self):
+        if self.consent_ts is None and self.access_events:
+            return [{
+                "type": "missing_consent",
+                "severity": "high",
+                "blocking": True,
+                "message": "Hay accesos a datos personales sin consentimiento previo",
+                "events": list(self.access_events)
+            }]
+
+        violations = []
+        for access in self.access_events:
+            if access["time:timestamp"] < self.consent_ts:
+                violations.append({
+                    "type": "consent_after_access",
+                    "severity": "high",
+                    "blocking": True,
+                    "message": "Acceso a datos antes de obtener el consentimiento",
+                    "events": [access]
+                })
+        return violations
+
+    def compact(self):
+        # sin consentimiento aún, los accesos siguen sin decidir
+        # (missing_consent o consent_after_access)
+        if self.consent_ts is None:
+            return []
+        violations = self.finish()
+        self.access_events = []
+        return violations
+
+
+class ImplicitConsentRule(Rule):
+    names = frozenset({GDPR_EVENTS["CONSENT"]})
+
+    def on_event(self, event, access):
+        if event.get("gdpr:consent_type", "implicit") != "explicit":
+            self.found.append({
+                "type": "implicit_consent",
+                "severity": "medium",
+                "message": "El consentimiento no fue explícito",
+                "events": [event]
+            })
+
+
+# ============================================================
+# FASE 2 – LOOP DE TRATAMIENTO
+# ============================================================
+
+class ConsentExpirationRule(Rule):
+    names = frozenset({GDPR_EVENTS["CONSENT_EXPIRED"]})
+    handles_access = True
+
+    def __init__(self, trace):
+        super().__init__(trace)
+        self.expired_ts = None
+
+    def on_event(self, event, access):
+        self.expired_ts = event["time:timestamp"]
+
+    def on_access(self, event):
+        if self.expired_ts:
+            self.found.append({
+                "type": "access_after_consent_expiration",
+                "severity": "high",
+                "blocking": True,
+                "message": (
+                    f"Acceso ({event.get('gdpr:operation', 'unknown')}) "
+                    "a datos tras la expiración del consentimiento"
+                ),
+                "events": [event]
+            })
+
+
+class WithdrawnConsentRule(Rule):
+    names = frozenset({GDPR_EVENTS["WITHDRAW"]})
+    handles_access = True
+
+    def __init__(self, trace):
+        super().__init__(trace)
+        self.consent_valid = True
+
+    def on_event(self, event, access):
+        self.consent_valid = False
+
+    def on_access(self, event):
+        if not self.consent_valid:
+            operation = event.get("gdpr:operation", "read")
+            self.found.append({
+                "type": "access_after_withdrawal",
+                "severity": "high",
+                "blocking": True,
+                "message": (
+                    f"Operación '{operation}' tras la retirada del consentimiento"
+                ),
+                "events": [event]
+            })
+
+
+# ============================================================
+# FASE 3 – DERECHOS (restricción / borrado)
+# ============================================================
+
+class ProcessingRestrictionRule(Rule):
+    names = frozenset({
+        GDPR_EVENTS["RESTRICT"],
+        GDPR_EVENTS["LIFT_RESTRICTION"]
+    })
+    handles_access = True
+
+    def __init__(self, trace):
+        super().__init__(trace)
+        self.restriction_active = False
+
+    def on_event(self, event, access):
+        self.restriction_active = (
+            event["concept:name"] == GDPR_EVENTS["RESTRICT"]
+        )
+
+    def on_access(self, event):
+        if not self.restriction_active:
+            return
+
+        operation = event.get("gdpr:operation", "read")
+        if operation != "read":
+            self.found.append({
+                "type": "access_during_restriction",
+                "severity": "high",
+                "blocking": True,
+                "message": (
+                    f"Operación '{operation}' durante restricción de tratamiento"
+                ),
+                "events": [event]
+            })
+
+
+class EraseWithoutProcessingRule(Rule):
+    names = frozenset({GDPR_EVENTS["ERASE"]})
+    handles_access = True
+
+    def __init__(self, trace):
+        super().__init__(trace)
+        self.erase_events = []
+        self.has_access = False
+
+    def on_event(self, event, access):
+        self.erase_events.append(event)
+        if access:
+            self.has_access = True
+
+    def on_access(self, event):
+        self.has_access = True
+
+    def finish(self):
+        if self.erase_events and not self.has_access:
+            return [{
+                "type": "erase_without_processing",
+                "severity": "low",
+                "message": "Se solicita borrado sin que conste tratamiento previo",
+                "events": list(self.erase_events)
+            }]
+        return []
+
+    def compact(self):
+        if self.has_access:
+            self.erase_events = []
+        return []
+
+
+class AccessAfterErasureRule(Rule):
+    names = frozenset({GDPR_EVENTS["ERASE"]})
+    handles_access = True
+
+    def __init__(self, trace):
+        super().__init__(trace)
+        self.erase_ts = None
+
+    def on_event(self, event, access):
+        self.erase_ts = event["time:timestamp"]
+
+    def on_access(self, event):
+        if self.erase_ts:
+            self.found.append({
+                "type": "access_after_erasure",
+                "severity": "critical",
+                "blocking": True,
+                "message": (
+                    f"Operación '{event.get('gdpr:operation', 'unknown')}' "
+                    "tras solicitud de borrado"
+                ),
+                "events": [event]
+            })
+
+
+class AccessLogWithoutAccessRule(Rule):
+    names = frozenset({GDPR_EVENTS["ACCESS_LOG"]})
+    handles_access = True
+
+    def __init__(self, trace):
+        super().__init__(trace)
+        self.logs = []
+        self.accessed_names = set()
+
+    def on_event(self, event, access):
+        self.logs.append(event)
+        if access:
+            self.accessed_names.add(event["concept:name"])
+
+    def on_access(self, event):
+        self.accessed_names.add(event["concept:name"])
+
+    def finish(self):
+        return [
+            {
+                "type": "access_log_without_access",
+                "severity": "low",
+                "message": "AccessLog sin evento de acceso asociado",
+                "events": [log]
+            }
+            for log in self.logs
+            if log.get("gdpr:related_activity") not in self.accessed_names
+        ]
+
+    def compact(self):
+        # solo quedan los accessLog sin acceso de su actividad
+        self.logs = [
+            log for log in self.logs
+            if log.get("gdpr:related_activity") not in self.accessed_names
+        ]
+        return []
+
+
+# ============================================================
+# FASE 4 – ACCOUNTABILITY
+# ============================================================
+
+class DataMinimizationRule(Rule):
+    handles_access = True
+
+    def on_access(self, event):
+        if (
+            event.get("gdpr:data_scope") == "excessive"
+            and event.get("gdpr:operation") in {"read", "share", "collect"}
+        ):
+            self.found.append({
+                "type": "data_minimization_violation",
+                "severity": "medium",
+                "message": (
+                    f"Operación '{event.get('gdpr:operation')}' "
+                    "con acceso excesivo a datos"
+                ),
+                "events": [event]
+            })
+
+
+class PurposeLimitationRule(Rule):
+    handles_access = True
+
+    def __init__(self, trace):
+        super().__init__(trace)
+        self.allowed_purpose = trace.attributes.get("gdpr:default_purpose")
+
+    def on_access(self, event):
+        if event.get("gdpr:purpose") == self.allowed_purpose:
+            return
+
+        operation = event.get("gdpr:operation", "read")
+        severity = "critical" if operation == "share" else "high"
+
+        self.found.append({
+            "type": "purpose_violation",
+            "severity": severity,
+            "blocking": True,
+            "message": (
+                f"Operación '{operation}' con propósito no autorizado"
+            ),
+            "events": [event]
+        })
+
+
+class AccessWithoutPermissionRule(Rule):
+    names = frozenset({
+        GDPR_EVENTS["PERMISSION_GRANTED"],
+        GDPR_EVENTS["WITHDRAW"],
+        GDPR_EVENTS["CONSENT_EXPIRED"],
+        GDPR_EVENTS["RESTRICT"],
+        GDPR_EVENTS["LIFT_RESTRICTION"]
+    })
+    handles_access = True
+
+    def __init__(self, trace):
+        super().__init__(trace)
+        self.consent_active = False
+
+    def on_event(self, event, access):
+        name = event["concept:name"]
+
+        if name == GDPR_EVENTS["PERMISSION_GRANTED"]:
+            self.consent_active = True
+        elif name in {GDPR_EVENTS["WITHDRAW"], GDPR_EVENTS["CONSENT_EXPIRED"]}:
+            self.consent_active = False
+
+    def on_access(self, event):
+        if not self.consent_active:
+            self.found.append({
+                "type": "access_without_consent",
+                "severity": "high",
+                "blocking": True,
+                "message": "Acceso a datos sin consentimiento activo",
+                "events": [event]
+            })
+
+
+class MissingAccessLogRule(Rule):
+    """
+    Un acceso está registrado si existe un accessLog de la misma
+    actividad con timestamp >= al del acceso: basta con conocer el
+    último accessLog de cada actividad (O(n) en lugar de O(n²)).
+    """
+
+    names = frozenset({GDPR_EVENTS["ACCESS_LOG"]})
+    handles_access = True
+
+    def __init__(self, trace):
+        super().__init__(trace)
+        self.access_events = []
+        self.last_log_ts = {}
+
+    def on_event(self, event, access):
+        related = event.get("gdpr:related_activity")
+        ts = event["time:timestamp"]
+        last = self.last_log_ts.get(related)
+        if last is None or ts > last:
+            self.last_log_ts[related] = ts
+        if access:
+            self.access_events.append(event)
+
+    def on_access(self, event):
+        self.access_events.append(event)
+
+    def finish(self):
+        violations = []
+        for access in self.access_events:
+            if self._unlogged(access):
+                violations.append({
+                    "type": "missing_access_log",
+                    "severity": "medium",
+                    "message": "Acceso a datos sin registro en accessLog",
+                    "events": [access]
+                })
+        return violations
+
+    def compact(self):
+        # un acceso ya registrado lo sigue estando (el último
+        # accessLog de cada actividad solo avanza)
+        self.access_events = [
+            access for access in self.access_events
+            if self._unlogged(access)
+        ]
+        return []
+
+    def _unlogged(self, access):
+        last = self.last_log_ts.get(access["concept:name"])
+        return last is None or last < access["time:timestamp"]
+
+
+# ============================================================
+# FASE 5 / 6 – BRECHAS Y DERECHOS ARCO
+# ============================================================
+
+class _RequestResponseRule(Rule):
+    """
+    Empareja cada solicitud con la primera respuesta (en orden de la
+    traza) de timestamp posterior y comprueba el plazo legal, con un
+    `DeadlineScheduler` en lugar de recorrer todas las respuestas por
+    solicitud.
+    """
+
+    request_name = None
+    response_name = None
+
+    def __init__(self, trace):
+        super().__init__(trace)
+        self.scheduler = DeadlineScheduler()
+        self.obligations = []
+
+    def on_event(self, event, access):
+        ts = event["time:timestamp"]
+        if event["concept:name"] == self.request_name:
+            self.obligations.append(
+                self.scheduler.request(None, event, ts, self.deadline)
+            )
+        else:
+            self.scheduler.respond(None, event, ts)
+
+    def finish(self):
+        violations = []
+
+        for obligation in self.obligations:
+            if obligation.is_open:
+                violations.append(self.missing_violation(obligation.request))
+            elif obligation.late:
+                violations.append(
+                    self.late_violation(obligation.request, obligation.response)
+                )
+
+        return violations
+
+
+class BreachNotificationRule(_RequestResponseRule):
+    request_name = GDPR_EVENTS["BREACH"]
+    response_name = GDPR_EVENTS["NOTIFY_BREACH"]
+    names = frozenset({request_name, response_name})
+    deadline = BREACH_NOTIFICATION_DEADLINE
+
+    def missing_violation(self, detect):
+        return {
+            "type": "missing_breach_notification",
+            "severity": "critical",
+            "blocking": True,
+            "message": "Brecha detectada sin notificación",
+            "events": [detect]
+        }
+
+    def late_violation(self, detect, notify):
+        return {
+            "type": "late_breach_notification",
+            "severity": "critical",
+            "message": "Notificación de brecha fuera de las 72 horas legales",
+            "events": [detect, notify]
+        }
+
+
+class DataSubjectRightsRule(_RequestResponseRule):
+    request_name = GDPR_EVENTS["REQUEST_INFO"]
+    response_name = GDPR_EVENTS["PROVIDE_INFO"]
+    names = frozenset({request_name, response_name})
+    deadline = RIGHT_RESPONSE_DEADLINE
+
+    def missing_violation(self, req):
+        return {
+            "type": "missing_right_response",
+            "severity": "medium",
+            "message": "Solicitud de información sin respuesta",
+            "events": [req]
+        }
+
+    def late_violation(self, req, response):
+        return {
+            "type": "late_right_response",
+            "severity": "medium",
+            "message": "Respuesta a derechos fuera del plazo legal (30 días)",
+            "events": [req, response]
+        }
+
+
+# ============================================================
+# STICKY POLICY
+# ============================================================
+
+class StickyPolicyRule(Rule):
+    """
+    Equivalente single-pass de `validate_sticky_policy`.
+    Las comprobaciones que no dependen de la traza se delegan
+    en las funciones de `sticky_policy.py`.
+    """
+
+    names = frozenset({GDPR_EVENTS["ACCESS_LOG"]})
+    handles_access = True
+
+    def __init__(self, trace):
+        super().__init__(trace)
+        self.sp = trace.attributes.get("gdpr:sticky_policy")
+        self.access_events = []
+        self.last_log_ts = None
+
+        if not self.sp:
+            self.names = frozenset()
+            self.handles_access = False
+
+    def on_event(self, event, access):
+        ts = event["time:timestamp"]
+        if self.last_log_ts is None or ts > self.last_log_ts:
+            self.last_log_ts = ts
+        if access:
+            self.access_events.append(event)
+
+    def on_access(self, event):
+        self.access_events.append(event)
+
+    def finish(self):
+        sp = self.sp
+        if not sp:
+            return []
+
+        violations = []
+        violations.extend(validate_sp_internal_consistency(sp))
+        violations.extend(validate_sp_retention(sp))
+
+        # Limitación de propósito
+        for event in self.access_events:
+            if event.get("gdpr:purpose") not in sp.purposes:
+                violations.append({
+                    "type": "sp_purpose_violation",
+                    "severity": "high",
+                    "message": "Acceso con propósito no autorizado por la Sticky Policy",
+                    "events": [event]
+                })
+
+        # Acceso según el estado de la SP
+        for event in self.access_events:
+            ts = event["time:timestamp"]
+
+            if sp.erasure_timestamp and ts > sp.erasure_timestamp:
+                violations.append({
+                    "type": "sp_access_after_erasure",
+                    "severity": "critical",
+                    "blocking": True,
+                    "message": "Acceso a datos tras el borrado completo",
+                    "events": [event]
+                })
+
+            elif sp.processing_restricted:
+                violations.append({
+                    "type": "sp_access_during_restriction",
+                    "severity": "high",
+                    "blocking": True,
+                    "message": "Acceso a datos durante restricción de tratamiento",
+                    "events": [event]
+                })
+
+            elif sp.consent_expiration_timestamp and ts > sp.consent_expiration_timestamp:
+                violations.append({
+                    "type": "sp_access_after_consent_expiration",
+                    "severity": "high",
+                    "blocking": True,
+                    "message": "Acceso a datos tras la expiración del consentimiento",
+                    "events": [event]
+                })
+
+        # Obligación de logging
+        if "log_access" in sp.obligations:
+            for event in self.access_events:
+                if self.last_log_ts is None or self.last_log_ts < event["time:timestamp"]:
+                    violations.append({
+                        "type": "sp_missing_access_log",
+                        "severity": "medium",
+                        "message": "Acceso sin cumplimiento de la obligación de logging",
+                        "events": [event]
+                    })
+
+        violations.extend(validate_sp_third_parties(sp))
+
+        return violations
+
+
+# ============================================================
+# MOTOR
+# ============================================================
+
+# Mismo orden que la composición secuencial de validate_trace
+DEFAULT_RULES = (
+    ConsentBeforeAccessRule,
+    ImplicitConsentRule,
+    ConsentExpirationRule,
+    WithdrawnConsentRule,
+    ProcessingRestrictionRule,
+    EraseWithoutProcessingRule,
+    AccessAfterErasureRule,
+    AccessLogWithoutAccessRule,
+    DataMinimizationRule,
+    PurposeLimitationRule,
+    AccessWithoutPermissionRule,
+    MissingAccessLogRule,
+    BreachNotificationRule,
+    DataSubjectRightsRule,
+    StickyPolicyRule,
+)
+
+
+class FusedValidator:
+    """
+    Recorre la traza una sola vez y despacha cada evento
+    únicamente a las reglas interesadas en él.
+
+    El despacho se hace por código de actividad (`ACTIVITIES`):
+    tablas indexadas por código en lugar de diccionarios por nombre.
+    Las actividades fuera del vocabulario de las reglas tienen
+    códigos mayores que el tamaño de las tablas.
+    """
+
+    def __init__(self, trace, rules=DEFAULT_RULES):
+        self._bind([rule(trace) for rule in rules])
+
+    def _bind(self, rules):
+        self.rules = rules
+        self._access_rules = [r for r in self.rules if r.handles_access]
+
+        by_code, access_by_code = _dispatch_layout(self.rules)
+        self._by_code = [[self.rules[i] for i in idx] for idx in by_code]
+        self._access_by_code = [
+            self._access_rules if idx is None
+            else [self.rules[i] for i in idx]
+            for idx in access_by_code
+        ]
+
+    def feed(self, event):
+        self._dispatch(event, ACTIVITIES.intern(event["concept:name"]))
+
+    def _dispatch(self, event, code):
+        access = event.get("gdpr:access")
+
+        if code < len(self._by_code):
+            for rule in self._by_code[code]:
+                rule.on_event(event, access)
+            access_rules = self._access_by_code[code]
+        else:
+            access_rules = self._access_rules
+
+        if access:
+            for rule in access_rules:
+                rule.on_access(event)
+
+    def run(self, events):
+        """
+        Equivalente a `feed` por evento, con el bucle local: solo
+        las actividades del vocabulario de las reglas pasan por las
+        tablas de despacho.
+        """
+        by_code = self._by_code
+        size = len(by_code)
+        codes = ACTIVITIES.codes
+
+        for event in events:
+            code = codes.get(event["concept:name"], size)
+            if code < size:
+                self._dispatch(event, code)
+            elif event.get("gdpr:access"):
+                for rule in self._access_rules:
+                    rule.on_access(event)
+
+        return self.finish()
+
+    def finish(self):
+        violations = []
+        for rule in self.rules:
+            violations.extend(rule.finish())
+        return violations
+
+    # Las tablas de despacho usan códigos locales al proceso: solo
+    # se serializan las reglas y las tablas se recalculan al cargar
+    def __getstate__(self):
+        return {"rules": self.rules}
+
+    def __setstate__(self, state):
+        self._bind(state["rules"])
+
+
+# (clase, names, handles_access) de cada regla -> tablas de índices
+_LAYOUTS = {}
+
+
+def _dispatch_layout(rules):
+    """
+    Tablas de despacho por código como índices de reglas; se
+    calculan una vez por combinación de reglas y se reutilizan
+    en todas las trazas.
+    """
+    key = tuple((type(r), r.names, r.handles_access) for r in rules)
+    layout = _LAYOUTS.get(key)
+    if layout is not None:
+        return layout
+
+    by_code = {}
+    for i, rule in enumerate(rules):
+        for name in rule.names:
+            by_code.setdefault(ACTIVITIES.intern(name), []).append(i)
+
+    size = max(by_code, default=-1) + 1
+    layout = _LAYOUTS[key] = (
+        [by_code.get(code, ()) for code in range(size)],
+        [
+            [
+                i for i, r in enumerate(rules)
+                if r.handles_access and ACTIVITIES.name(code) not in r.names
+            ] if code in by_code else None
+            for code in range(size)
+        ],
+    )
+    return layout
+
+
+def validate_trace_fused(trace):
+    return FusedValidator(trace).run(trace)
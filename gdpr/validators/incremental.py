@@ -0,0 +1,275 @@
+"""
+Revalidación incremental de casos cuyo log solo crece.
+
+Cada caso guarda el estado de las reglas del motor fusionado
+(consentimiento, retirada, restricción, borrado, brechas y derechos
+pendientes...) y el builder de su Sticky Policy. Al llegar eventos
+nuevos de un caso solo se recorre ese sufijo y se devuelve el delta
+de violaciones respecto a la evaluación anterior:
+
+- `added`: violaciones nuevas
+- `resolved`: violaciones que ya no se cumplen (p.ej. una brecha
+  sin notificar cuya notificación acaba de llegar)
+
+Tras cada `extend`, las violaciones acumuladas del caso son las
+mismas (y en el mismo orden) que `validate_trace` sobre la traza
+completa con su Sticky Policy.
+
+Los eventos nuevos se añaden al final de la traza en el orden
+recibido: se asume que cada lote es posterior a lo ya procesado.
+"""
+
+import sqlite3
+import pickle
+from collections import Counter
+
+from pm4py.objects.log.obj import Trace
+
+from gdpr.sticky_policies import StickyPolicyBuilder
+from .engine import DEFAULT_RULES, FusedValidator, Rule, _copy_violation
+
+
+def _violation_key(v):
+    # los eventos se identifican por objeto: tras cargar un checkpoint
+    # las claves se recalculan sobre los objetos deserializados
+    return (v["type"], v["message"], tuple(map(id, v["events"])))
+
+
+def _diff(previous, current):
+    """
+    (nuevas, resueltas) entre dos listas de violaciones, como
+    multiconjuntos de claves y conservando el orden de cada lista.
+    """
+    remaining = Counter(map(_violation_key, previous))
+    added = []
+    for v in current:
+        key = _violation_key(v)
+        if remaining[key]:
+            remaining[key] -= 1
+        else:
+            added.append(v)
+
+    still = Counter(map(_violation_key, current))
+    resolved = []
+    for v in previous:
+        key = _violation_key(v)
+        if still[key]:
+            still[key] -= 1
+        else:
+            resolved.append(v)
+
+    return added, resolved
+
+
+# ============================================================
+# CASO
+# ============================================================
+
+class IncrementalValidator:
+    """
+    Estado de validación de un caso.
+
+    - Reglas que solo acumulan violaciones evento a evento
+      (`Rule.finish` por defecto): el delta son sus violaciones
+      nuevas desde la última llamada
+    - Reglas con `finish` propio (emparejamientos, obligaciones,
+      Sticky Policy): se re-evalúa su `finish` (sobre su estado, no
+      sobre la traza) y se compara con el resultado anterior
+
+    Los eventos no se guardan (solo los que retienen las reglas):
+    `position` es el nº de eventos procesados.
+    """
+
+    def __init__(self, attributes=None, rules=DEFAULT_RULES):
+        attributes = dict(attributes or {})
+        self.case_id = attributes.get("concept:name", "unknown")
+        self.position = 0
+
+        # la regla de Sticky Policy lee la SP en construcción
+        self.sp_builder = StickyPolicyBuilder(
+            self.case_id, checkpoint_every=None
+        )
+        attributes["gdpr:sticky_policy"] = self.sp_builder.policy
+
+        self.engine = FusedValidator(Trace(attributes=attributes), rules)
+        # violaciones vigentes por regla (las acumulativas: su `found`)
+        self._current = [
+            rule.found if type(rule).finish is Rule.finish else []
+            for rule in self.engine.rules
+        ]
+        self._seen = [0] * len(self.engine.rules)
+
+    @property
+    def sticky_policy(self):
+        return self.sp_builder.snapshot()
+
+    def extend(self, events):
+        """
+        Añade eventos al final del caso y devuelve el delta
+        {"added": [...], "resolved": [...]}.
+        """
+        for event in events:
+            self.engine.feed(event)
+            self.sp_builder.feed(event)
+            self.position += 1
+
+        added, resolved = [], []
+
+        for i, rule in enumerate(self.engine.rules):
+            if type(rule).finish is Rule.finish:
+                new = rule.found[self._seen[i]:]
+                self._seen[i] = len(rule.found)
+                added.extend(map(_copy_violation, new))
+                continue
+
+            current = rule.finish()
+            new, gone = _diff(self._current[i], current)
+            self._current[i] = current
+            added.extend(map(_copy_violation, new))
+            resolved.extend(map(_copy_violation, gone))
+
+        return {"added": added, "resolved": resolved}
+
+    @property
+    def violations(self):
+        """
+        Violaciones acumuladas del caso, en el orden del motor.
+        """
+        return [
+            _copy_violation(v) for current in self._current for v in current
+        ]
+
+
+# ============================================================
+# LOG (checkpoints en SQLite)
+# ============================================================
+
+class IncrementalLogValidator:
+    """
+    Estado incremental de todos los casos de un log, con un
+    checkpoint por caso en SQLite.
+
+    - `extend(case_id, events, attributes)`: eventos nuevos de un caso
+    - `update(trace)`: traza completa de un caso (p.ej. el log de
+      hoy); solo se evalúan los eventos posteriores al checkpoint. Si
+      la traza es más corta que lo ya procesado, el caso se valida
+      de nuevo desde el principio (las violaciones anteriores se
+      devuelven como resueltas)
+    - `save()`: escribe los casos modificados y los libera de memoria
+
+    Los casos se cargan bajo demanda y la posición de cada uno se
+    guarda aparte: `update` de un caso sin eventos nuevos no
+    deserializa su estado.
+    """
+
+    def __init__(self, path=None, rules=DEFAULT_RULES):
+        self.rules = rules
+        self._cases = {}
+        self._dirty = set()
+
+        self._db = None
+        if path is not None:
+            self._db = sqlite3.connect(path)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS cases "
+                "(case_id TEXT PRIMARY KEY, position INTEGER NOT NULL, "
+                "state BLOB NOT NULL)"
+            )
+            self._db.commit()
+
+    def case(self, case_id):
+        """
+        Estado del caso (None si no se ha visto nunca).
+        """
+        state = self._cases.get(case_id)
+        if state is None and self._db is not None:
+            row = self._db.execute(
+                "SELECT state FROM cases WHERE case_id = ?", (str(case_id),)
+            ).fetchone()
+            if row is not None:
+                state = self._cases[case_id] = pickle.loads(row[0])
+        return state
+
+    def position(self, case_id):
+        """
+        Nº de eventos procesados del caso (0 si no se ha visto nunca).
+        """
+        state = self._cases.get(case_id)
+        if state is not None:
+            return state.position
+        if self._db is not None:
+            row = self._db.execute(
+                "SELECT position FROM cases WHERE case_id = ?",
+                (str(case_id),)
+            ).fetchone()
+            if row is not None:
+                return row[0]
+        return 0
+
+    def extend(self, case_id, events, attributes=None):
+        state = self.case(case_id)
+        if state is None:
+            state = self._new_case(case_id, attributes or {})
+        self._dirty.add(case_id)
+        return state.extend(events)
+
+    def update(self, trace):
+        case_id = trace.attributes.get("concept:name")
+        if len(trace) == self.position(case_id):
+            return {"added": [], "resolved": []}
+
+        state = self.case(case_id)
+
+        if state is None or len(trace) < state.position:
+            previous = state.violations if state is not None else []
+            state = self._new_case(case_id, trace.attributes)
+            delta = state.extend(trace)
+            delta["resolved"] = previous + delta["resolved"]
+        else:
+            delta = state.extend(trace[state.position:])
+
+        self._dirty.add(case_id)
+        return delta
+
+    def _new_case(self, case_id, attributes):
+        state = IncrementalValidator(
+            {**attributes, "concept:name": case_id}, self.rules
+        )
+        self._cases[case_id] = state
+        return state
+
+    def save(self):
+        if self._db is None:
+            return
+
+        self._db.executemany(
+            "INSERT OR REPLACE INTO cases (case_id, position, state) "
+            "VALUES (?, ?, ?)",
+            (
+                (
+                    str(case_id),
+                    self._cases[case_id].position,
+                    pickle.dumps(
+                        self._cases[case_id],
+                        protocol=pickle.HIGHEST_PROTOCOL
+                    ),
+                )
+                for case_id in self._dirty
+            )
+        )
+        self._db.commit()
+
+        for case_id in self._dirty:
+            del self._cases[case_id]
+        self._dirty.clear()
+
+    def close(self):
+        self.save()
+        if self._db is not None:
+            self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
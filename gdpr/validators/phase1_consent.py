@@ -1,24 +1,15 @@
 from datetime import timedelta
 from gdpr.vocabulary import GDPR_EVENTS
-
-
-# ============================================================
-# HELPERS
-# ============================================================
-
-def get_events(trace, event_name):
-    return [
-        e for e in trace
-        if e["concept:name"] == event_name
-    ]
+from gdpr.trace_index import get_trace_index, get_events
 
 
 
 def validate_consent_before_access(trace):
     violations = []
 
-    consent_events = get_events(trace, GDPR_EVENTS["CONSENT"])
-    access_events = [e for e in trace if e.get("gdpr:access")]
+    index = get_trace_index(trace)
+    consent_events = index.get_events(GDPR_EVENTS["CONSENT"])
+    access_events = index.access_events()
 
     # ❌ Accesos sin ningún consentimiento
     if not consent_events and access_events:
@@ -1,16 +1,6 @@
 from datetime import timedelta
 from gdpr.vocabulary import GDPR_EVENTS
-
-
-# ============================================================
-# HELPERS
-# ============================================================
-
-def get_events(trace, event_name):
-    return [
-        e for e in trace
-        if e["concept:name"] == event_name
-    ]
+from gdpr.trace_index import get_trace_index
 
 
 
@@ -22,7 +12,9 @@ def validate_access_after_consent_expiration(trace):
     violations = []
     expired_ts = None
 
-    for e in trace:
+    for e in get_trace_index(trace).select(
+        [GDPR_EVENTS["CONSENT_EXPIRED"]], access=True
+    ):
         name = e["concept:name"]
 
         if name == GDPR_EVENTS["CONSENT_EXPIRED"]:
@@ -47,7 +39,9 @@ def validate_withdrawn_consent(trace):
     violations = []
     consent_valid = True
 
-    for event in trace:
+    for event in get_trace_index(trace).select(
+        [GDPR_EVENTS["WITHDRAW"]], access=True
+    ):
         name = event["concept:name"]
 
         if name == GDPR_EVENTS["WITHDRAW"]:
@@ -1,23 +1,16 @@
 from datetime import timedelta
 from gdpr.vocabulary import GDPR_EVENTS
-
-
-# ============================================================
-# HELPERS
-# ============================================================
-
-def get_events(trace, event_name):
-    return [
-        e for e in trace
-        if e["concept:name"] == event_name
-    ]
+from gdpr.trace_index import get_trace_index
 
 
 def validate_processing_restriction(trace):
     violations = []
     restriction_active = False
 
-    for event in trace:
+    for event in get_trace_index(trace).select(
+        [GDPR_EVENTS["RESTRICT"], GDPR_EVENTS["LIFT_RESTRICTION"]],
+        access=True
+    ):
         name = event["concept:name"]
 
         if name == GDPR_EVENTS["RESTRICT"]:
@@ -49,10 +42,10 @@ def validate_processing_restriction(trace):
 
 
 def validate_erase_without_processing(trace):
-    erase_events = get_events(trace, GDPR_EVENTS["ERASE"])
-    access_events = [e for e in trace if e.get("gdpr:access")]
+    index = get_trace_index(trace)
+    erase_events = index.get_events(GDPR_EVENTS["ERASE"])
 
-    if erase_events and not access_events:
+    if erase_events and not index.access_positions:
         return [{
             "type": "erase_without_processing",
             "severity": "low",
@@ -66,7 +59,9 @@ def validate_access_after_erasure(trace):
     erase_ts = None
     violations = []
 
-    for e in trace:
+    for e in get_trace_index(trace).select(
+        [GDPR_EVENTS["ERASE"]], access=True
+    ):
         if e["concept:name"] == GDPR_EVENTS["ERASE"]:
             erase_ts = e["time:timestamp"]
 
@@ -88,14 +83,12 @@ def validate_access_after_erasure(trace):
 
 def validate_access_log_without_access(trace):
     violations = []
+    index = get_trace_index(trace)
 
-    for log in get_events(trace, GDPR_EVENTS["ACCESS_LOG"]):
+    for log in index.get_events(GDPR_EVENTS["ACCESS_LOG"]):
         related = log.get("gdpr:related_activity")
 
-        if not any(
-            e["concept:name"] == related and e.get("gdpr:access")
-            for e in trace
-        ):
+        if related not in index.accessed_activities:
             violations.append({
                 "type": "access_log_without_access",
                 "severity": "low",
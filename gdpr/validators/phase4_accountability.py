@@ -1,25 +1,14 @@
+from bisect import bisect_left
 from datetime import timedelta
-from gdpr.vocabulary import GDPR_EVENTS
-
-
-# ============================================================
-# HELPERS
-# ============================================================
-
-def get_events(trace, event_name):
-    return [
-        e for e in trace
-        if e["concept:name"] == event_name
-    ]
+from gdpr.trace_index import get_trace_index
 
 
 def validate_data_minimization(trace):
     violations = []
 
-    for e in trace:
+    for e in get_trace_index(trace).access_events():
         if (
-            e.get("gdpr:access")
-            and e.get("gdpr:data_scope") == "excessive"
+            e.get("gdpr:data_scope") == "excessive"
             and e.get("gdpr:operation") in {"read", "share", "collect"}
         ):
             violations.append({
@@ -39,8 +28,8 @@ def validate_purpose_limitation(trace):
     violations = []
     allowed_purpose = trace.attributes.get("gdpr:default_purpose")
 
-    for e in trace:
-        if e.get("gdpr:access") and e.get("gdpr:purpose") != allowed_purpose:
+    for e in get_trace_index(trace).access_events():
+        if e.get("gdpr:purpose") != allowed_purpose:
             operation = e.get("gdpr:operation", "read")
 
             severity = "critical" if operation == "share" else "high"
@@ -64,7 +53,16 @@ def validate_access_without_permission(trace):
     consent_active = False
     processing_restricted = False
 
-    for event in trace:
+    for event in get_trace_index(trace).select(
+        [
+            "gdpr:permissionGranted",
+            "gdpr:withdrawConsent",
+            "gdpr:consentExpired",
+            "gdpr:restrictProcessing",
+            "gdpr:liftRestriction",
+        ],
+        access=True
+    ):
         name = event["concept:name"]
 
         if name == "gdpr:permissionGranted":
@@ -96,27 +94,21 @@ def validate_access_without_permission(trace):
 
 
 def validate_missing_access_log(trace):
+    """
+    Cada acceso necesita un accessLog de la misma actividad con
+    timestamp >= al del acceso. Búsqueda binaria sobre los timestamps
+    ordenados de los logs de cada actividad: O(n log n).
+    """
     violations = []
+    index = get_trace_index(trace)
 
-    access_events = [
-        e for e in trace if e.get("gdpr:access")
-    ]
-
-    access_logs = [
-        e for e in trace
-        if e["concept:name"] == GDPR_EVENTS["ACCESS_LOG"]
-    ]
-
-    for access in access_events:
-        ts = access["time:timestamp"]
+    for access in index.access_events():
+        log_timestamps = index.access_log_timestamps(access["concept:name"])
 
-        matching_logs = [
-            log for log in access_logs
-            if log["time:timestamp"] >= ts
-            and log.get("gdpr:related_activity") == access["concept:name"]
-        ]
+        # Primer log con timestamp >= acceso
+        pos = bisect_left(log_timestamps, access["time:timestamp"])
 
-        if not matching_logs:
+        if pos == len(log_timestamps):
             violations.append({
                 "type": "missing_access_log",
                 "severity": "medium",
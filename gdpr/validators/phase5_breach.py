@@ -1,16 +1,6 @@
-from datetime import timedelta
+from gdpr.deadlines import BREACH_NOTIFICATION_DEADLINE, DeadlineScheduler
 from gdpr.vocabulary import GDPR_EVENTS
-
-
-# ============================================================
-# HELPERS
-# ============================================================
-
-def get_events(trace, event_name):
-    return [
-        e for e in trace
-        if e["concept:name"] == event_name
-    ]
+from gdpr.trace_index import get_events
 
 
 def validate_breach_notification_time(trace):
@@ -19,15 +9,19 @@ def validate_breach_notification_time(trace):
     detects = get_events(trace, GDPR_EVENTS["BREACH"])
     notifies = get_events(trace, GDPR_EVENTS["NOTIFY_BREACH"])
 
-    for detect in detects:
-        detect_ts = detect["time:timestamp"]
+    # todas las notificaciones primero: cada brecha se resuelve con la
+    # primera (en orden de la traza) posterior a ella
+    scheduler = DeadlineScheduler()
+    for notify in notifies:
+        scheduler.respond(None, notify, notify["time:timestamp"])
 
-        related_notify = [
-            n for n in notifies
-            if n["time:timestamp"] > detect_ts
-        ]
+    for detect in detects:
+        obligation = scheduler.request(
+            None, detect, detect["time:timestamp"],
+            BREACH_NOTIFICATION_DEADLINE
+        )
 
-        if not related_notify:
+        if obligation.is_open:
             violations.append({
                 "type": "missing_breach_notification",
                 "severity": "critical",
@@ -37,15 +31,12 @@ def validate_breach_notification_time(trace):
             })
             continue
 
-        notify = related_notify[0]
-        notify_ts = notify["time:timestamp"]
-
-        if notify_ts > detect_ts + timedelta(hours=72):
+        if obligation.late:
             violations.append({
                 "type": "late_breach_notification",
                 "severity": "critical",
                 "message": "Notificación de brecha fuera de las 72 horas legales",
-                "events": [detect, notify]
+                "events": [detect, obligation.response]
             })
 
     return violations
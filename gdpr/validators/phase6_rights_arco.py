@@ -1,16 +1,6 @@
-from datetime import timedelta
+from gdpr.deadlines import RIGHT_RESPONSE_DEADLINE, DeadlineScheduler
 from gdpr.vocabulary import GDPR_EVENTS
-
-
-# ============================================================
-# HELPERS
-# ============================================================
-
-def get_events(trace, event_name):
-    return [
-        e for e in trace
-        if e["concept:name"] == event_name
-    ]
+from gdpr.trace_index import get_events
 
 
 def validate_data_subject_rights(trace):
@@ -19,16 +9,19 @@ def validate_data_subject_rights(trace):
     requests = get_events(trace, GDPR_EVENTS["REQUEST_INFO"])
     responses = get_events(trace, GDPR_EVENTS["PROVIDE_INFO"])
 
-    for req in requests:
-        req_ts = req["time:timestamp"]
+    # todas las respuestas primero: cada solicitud se resuelve con la
+    # primera (en orden de la traza) posterior a ella
+    scheduler = DeadlineScheduler()
+    for response in responses:
+        scheduler.respond(None, response, response["time:timestamp"])
 
-        matching_responses = [
-            r for r in responses
-            if r["time:timestamp"] > req_ts
-        ]
+    for req in requests:
+        obligation = scheduler.request(
+            None, req, req["time:timestamp"], RIGHT_RESPONSE_DEADLINE
+        )
 
         # ❌ Sin respuesta
-        if not matching_responses:
+        if obligation.is_open:
             violations.append({
                 "type": "missing_right_response",
                 "severity": "medium",
@@ -37,16 +30,13 @@ def validate_data_subject_rights(trace):
             })
             continue
 
-        response = matching_responses[0]
-        response_ts = response["time:timestamp"]
-
         # ❌ Respuesta fuera de plazo (>30 días)
-        if response_ts > req_ts + timedelta(days=30):
+        if obligation.late:
             violations.append({
                 "type": "late_right_response",
                 "severity": "medium",
                 "message": "Respuesta a derechos fuera del plazo legal (30 días)",
-                "events": [req, response]
+                "events": [req, obligation.response]
             })
 
     return violations
\ No newline at end of file
@@ -9,6 +9,9 @@ La Sticky Policy se considera:
 
 from datetime import datetime
 
+from gdpr.vocabulary import GDPR_EVENTS
+from gdpr.trace_index import get_trace_index
+
 
 # ============================================================
 # ENTRY POINT
@@ -80,15 +83,13 @@ def validate_sp_retention(sp):
     if not sp.max_retention_time:
         return violations
 
-    for entry in sp.access_history:
-        if entry["timestamp"] > sp.max_retention_time:
-            violations.append({
-                "type": "sp_retention_violation",
-                "severity": "critical",
-                "message": "Acceso a datos tras el periodo máximo de retención",
-                "events": []
-            })
-            break
+    if sp.access_history.has_access_after(sp.max_retention_time):
+        violations.append({
+            "type": "sp_retention_violation",
+            "severity": "critical",
+            "message": "Acceso a datos tras el periodo máximo de retención",
+            "events": []
+        })
 
     return violations
 
@@ -100,10 +101,7 @@ def validate_sp_retention(sp):
 def validate_sp_purpose_limitation(trace, sp):
     violations = []
 
-    for event in trace:
-        if not event.get("gdpr:access"):
-            continue
-
+    for event in get_trace_index(trace).access_events():
         purpose = event.get("gdpr:purpose")
         if purpose not in sp.purposes:
             violations.append({
@@ -123,10 +121,7 @@ def validate_sp_purpose_limitation(trace, sp):
 def validate_sp_access_constraints(trace, sp):
     violations = []
 
-    for event in trace:
-        if not event.get("gdpr:access"):
-            continue
-
+    for event in get_trace_index(trace).access_events():
         ts = event["time:timestamp"]
 
         if sp.erasure_timestamp and ts > sp.erasure_timestamp:
@@ -170,14 +165,17 @@ def validate_sp_obligations(trace, sp):
     if "log_access" not in sp.obligations:
         return violations
 
-    for event in trace:
-        if not event.get("gdpr:access"):
-            continue
+    index = get_trace_index(trace)
+
+    # Un acceso cumple la obligación si existe algún accessLog posterior
+    # o simultáneo: basta con comparar con el último accessLog (O(n)).
+    log_timestamps = index.timestamps(GDPR_EVENTS["ACCESS_LOG"])
+    last_log_ts = log_timestamps[-1] if log_timestamps else None
 
-        has_log = any(
-            e["concept:name"] == "gdpr:accessLog"
-            and e["time:timestamp"] >= event["time:timestamp"]
-            for e in trace
+    for event in index.access_events():
+        has_log = (
+            last_log_ts is not None
+            and last_log_ts >= event["time:timestamp"]
         )
 
         if not has_log:
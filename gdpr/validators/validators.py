@@ -5,6 +5,8 @@ from .phase4_accountability import validate_data_minimization, validate_purpose_
 from .phase5_breach import validate_breach_notification_time
 from .phase6_rights_arco import validate_data_subject_rights
 from .sticky_policy import validate_sticky_policy
+from .engine import validate_trace_fused
+from gdpr.trace_index import trace_cache_scope
 
 def annotate_violations_on_trace(trace, violations):
     """
@@ -50,6 +52,19 @@ def deduplicate_sp_violations(violations):
 
 
 def validate_trace(trace):
+    """
+    Valida una traza GDPR en una sola pasada (motor fusionado).
+    Produce las mismas violaciones que `validate_trace_sequential`.
+    """
+    return validate_trace_fused(trace)
+
+
+@trace_cache_scope()
+def validate_trace_sequential(trace):
+    """
+    Composición secuencial de los validadores (una pasada por regla).
+    Se mantiene como implementación de referencia del motor fusionado.
+    """
     violations = []
     violations.extend(validate_consent_before_access(trace))
     violations.extend(validate_implicit_consent(trace))
@@ -67,6 +82,4 @@ def validate_trace(trace):
     violations.extend(validate_data_subject_rights(trace))
     violations.extend(validate_sticky_policy(trace))
 
-
     return violations
-
@@ -0,0 +1,386 @@
+# gdpr/validators/vectorized.py
+
+"""
+Validadores temporales vectorizados sobre el log compacto.
+
+Implementan con NumPy las reglas de estado (expiración, retirada,
+restricción y borrado) y de plazo (brechas y derechos) sobre los
+arrays de `CompactLog`, sin recorrer los eventos en Python:
+
+- reglas de estado: máscaras acumuladas por caso (el estado en una
+  posición depende de los eventos de estado anteriores de la traza)
+- reglas de plazo: `np.searchsorted` sobre los timestamps de las
+  respuestas para encontrar la primera posterior a cada solicitud
+
+Se aplican a una traza (`validate_temporal_trace`) o al log completo
+de una vez (`validate_temporal_log`) y producen las mismas
+violaciones (tipo, mensaje y eventos) que los validadores de
+phase2/3/5/6 sobre las vistas del log compacto.
+"""
+
+from datetime import timedelta
+
+import numpy as np
+
+from gdpr.compact import ACCESS, MISSING, CompactEvent
+from gdpr.vocabulary import GDPR_EVENTS
+
+
+def _ns(delta):
+    return (delta // timedelta(microseconds=1)) * 1000
+
+
+BREACH_DEADLINE_NS = _ns(timedelta(hours=72))
+RIGHTS_DEADLINE_NS = _ns(timedelta(days=30))
+
+
+# ============================================================
+# ARRAYS DE UN TRAMO DEL LOG
+# ============================================================
+
+class _Segment:
+    """
+    Arrays de un tramo contiguo del log (una traza o el log completo)
+    con offsets relativos al inicio del tramo.
+    """
+
+    def __init__(self, log, start, end, offsets):
+        self.log = log
+        self.start = start
+        self.offsets = offsets - start
+
+        self.activity = log.columns["activity"][start:end]
+        self.operation = log.columns["operation"][start:end]
+        self.timestamp = log.timestamp[start:end]
+
+        n = end - start
+        self.case = np.repeat(
+            np.arange(len(offsets) - 1), np.diff(self.offsets)
+        )
+        self.access = (log.flags[start:end] & ACCESS) != 0
+
+        # gdpr:access no booleano (se guarda en extras): se evalúa
+        # como lo haría `event.get("gdpr:access")`
+        for position, value in self._extras("gdpr:access", n):
+            self.access[position] = bool(value)
+
+    def _extras(self, key, n):
+        values = self.log.extras.get(key, {})
+        for position, value in values.items():
+            position -= self.start
+            if 0 <= position < n:
+                yield position, value
+
+    def is_activity(self, name):
+        code = self.log.code("activity", GDPR_EVENTS[name])
+        if code == MISSING:
+            return np.zeros(len(self.activity), dtype=bool)
+        return self.activity == code
+
+    def count_before(self, mask):
+        """
+        Nº de posiciones de `mask` anteriores a cada evento en su caso.
+        """
+        counts = np.concatenate(([0], np.cumsum(mask)))
+        base = counts[self.offsets[:-1]]
+        return counts[:-1] - base[self.case]
+
+    def not_read(self):
+        """
+        Operación distinta de "read" (ausente cuenta como "read").
+        """
+        read = self.log.code("operation", "read")
+        mask = (self.operation != MISSING) & (self.operation != read)
+
+        for position, value in self._extras("gdpr:operation", len(mask)):
+            mask[position] = value != "read"
+
+        return mask
+
+
+# ============================================================
+# REGLAS DE ESTADO (máscaras acumuladas)
+# ============================================================
+
+def _access_after(segment, state):
+    """
+    Accesos posteriores (en la misma traza) a un evento `state`.
+    Un evento de estado nunca cuenta como acceso, igual que en
+    los validadores secuenciales.
+    """
+    is_state = segment.is_activity(state)
+    after = segment.count_before(is_state) > 0
+    return np.flatnonzero(segment.access & ~is_state & after)
+
+
+def _access_during_restriction(segment):
+    is_restrict = segment.is_activity("RESTRICT")
+    is_marker = is_restrict | segment.is_activity("LIFT_RESTRICTION")
+
+    # último RESTRICT / LIFT_RESTRICTION hasta cada posición
+    last = np.maximum.accumulate(
+        np.where(is_marker, np.arange(len(is_marker)), -1)
+    )
+    in_case = last >= segment.offsets[:-1][segment.case]
+    active = in_case & is_restrict[last]
+
+    return np.flatnonzero(
+        segment.access & ~is_marker & active & segment.not_read()
+    )
+
+
+# ============================================================
+# REGLAS DE PLAZO (searchsorted)
+# ============================================================
+
+def first_later_response(
+    request_case, request_ts, response_case, response_ts, response_order
+):
+    """
+    Para cada solicitud, el menor `response_order` de las respuestas
+    de su caso con timestamp posterior (la primera en orden de la
+    traza), o -1 si no hay.
+
+    Las respuestas se ordenan por (caso, timestamp); el mínimo de
+    `response_order` desde el punto de búsqueda hasta el final da la
+    primera en orden de traza, aunque la traza no esté ordenada por
+    tiempo. `response_order` debe crecer de un caso al siguiente
+    (p.ej. la posición en un log agrupado por caso) para que el
+    mínimo no salte a otro caso. O((n + m) log m), sin emparejar
+    cada solicitud con cada respuesta.
+    """
+    found = np.full(len(request_case), -1, dtype=np.int64)
+    if not len(request_case) or not len(response_case):
+        return found
+
+    # rango denso de timestamps para combinar (caso, timestamp) en
+    # una sola clave int64
+    _, rank = np.unique(
+        np.concatenate((request_ts, response_ts)), return_inverse=True
+    )
+    rank = rank.reshape(-1)
+    width = int(rank.max()) + 1
+    request_keys = request_case * width + rank[:len(request_case)]
+    response_keys = response_case * width + rank[len(request_case):]
+
+    order = np.argsort(response_keys, kind="stable")
+    sorted_keys = response_keys[order]
+    first_order = np.minimum.accumulate(response_order[order][::-1])[::-1]
+
+    k = np.searchsorted(sorted_keys, request_keys, side="right")
+    valid = k < len(sorted_keys)
+    valid[valid] = response_case[order][k[valid]] == request_case[valid]
+
+    found[valid] = first_order[k[valid]]
+    return found
+
+
+def _first_response(segment, request, response):
+    """
+    Para cada solicitud, la primera respuesta (en orden de la traza)
+    con timestamp posterior, o -1 si no hay.
+    """
+    requests = np.flatnonzero(segment.is_activity(request))
+    responses = np.flatnonzero(segment.is_activity(response))
+
+    ts = segment.timestamp
+    case = segment.case
+
+    # las posiciones de casos posteriores son siempre mayores
+    found = first_later_response(
+        case[requests], ts[requests], case[responses], ts[responses],
+        responses
+    )
+    return requests, found
+
+
+def _deadline_rule(segment, request, response, deadline_ns):
+    """
+    (solicitudes sin respuesta, [(solicitud, respuesta tardía)]).
+    """
+    requests, found = _first_response(segment, request, response)
+
+    missing = requests[found < 0]
+
+    answered = found >= 0
+    late = (
+        segment.timestamp[found[answered]]
+        > segment.timestamp[requests[answered]] + deadline_ns
+    )
+    late_pairs = np.stack(
+        (requests[answered][late], found[answered][late]), axis=1
+    )
+
+    return missing, late_pairs
+
+
+# ============================================================
+# VIOLACIONES
+# ============================================================
+
+def _violations(segment):
+    """
+    (posición de referencia, violación sin eventos, posiciones) en
+    el orden de `validate_trace_sequential` para estas reglas.
+    """
+    out = []
+
+    for positions, default, violation, message in (
+        (
+            _access_after(segment, "CONSENT_EXPIRED"), "unknown",
+            {"type": "access_after_consent_expiration", "severity": "high"},
+            "Acceso ({}) a datos tras la expiración del consentimiento"
+        ),
+        (
+            _access_after(segment, "WITHDRAW"), "read",
+            {"type": "access_after_withdrawal", "severity": "high"},
+            "Operación '{}' tras la retirada del consentimiento"
+        ),
+        (
+            _access_during_restriction(segment), "read",
+            {"type": "access_during_restriction", "severity": "high"},
+            "Operación '{}' durante restricción de tratamiento"
+        ),
+        (
+            _access_after(segment, "ERASE"), "unknown",
+            {"type": "access_after_erasure", "severity": "critical"},
+            "Operación '{}' tras solicitud de borrado"
+        ),
+    ):
+        operations = _operations(segment, positions, default)
+
+        for position, operation in zip(positions.tolist(), operations):
+            out.append((position, {
+                **violation,
+                "blocking": True,
+                "message": message.format(operation),
+            }, [position]))
+
+    missing, late = _deadline_rule(
+        segment, "BREACH", "NOTIFY_BREACH", BREACH_DEADLINE_NS
+    )
+    out.extend(_merge_deadlines(
+        missing, late,
+        {
+            "type": "missing_breach_notification",
+            "severity": "critical",
+            "blocking": True,
+            "message": "Brecha detectada sin notificación",
+        },
+        {
+            "type": "late_breach_notification",
+            "severity": "critical",
+            "message": "Notificación de brecha fuera de las 72 horas legales",
+        }
+    ))
+
+    missing, late = _deadline_rule(
+        segment, "REQUEST_INFO", "PROVIDE_INFO", RIGHTS_DEADLINE_NS
+    )
+    out.extend(_merge_deadlines(
+        missing, late,
+        {
+            "type": "missing_right_response",
+            "severity": "medium",
+            "message": "Solicitud de información sin respuesta",
+        },
+        {
+            "type": "late_right_response",
+            "severity": "medium",
+            "message": "Respuesta a derechos fuera del plazo legal (30 días)",
+        }
+    ))
+
+    return out
+
+
+def _operations(segment, positions, default):
+    """
+    Equivalente a `event.get("gdpr:operation", default)` para cada
+    posición (códigos decodificados de una vez).
+    """
+    values = segment.log.codebooks["operation"].values
+    extras = segment.log.extras.get("gdpr:operation", {})
+
+    return [
+        values[code] if code != MISSING
+        else extras.get(segment.start + position, default)
+        for position, code in zip(
+            positions.tolist(), segment.operation[positions].tolist()
+        )
+    ]
+
+
+def _merge_deadlines(missing, late, missing_violation, late_violation):
+    """
+    Violaciones de ausencia y de retraso en el orden de las
+    solicitudes, como en el validador secuencial.
+    """
+    items = [
+        (position, dict(missing_violation), [position])
+        for position in missing.tolist()
+    ]
+    items.extend(
+        (request, dict(late_violation), [request, response])
+        for request, response in late.tolist()
+    )
+    items.sort(key=lambda item: item[0])
+    return items
+
+
+# ============================================================
+# API
+# ============================================================
+
+def validate_temporal_trace(trace):
+    """
+    Reglas temporales vectorizadas sobre una `CompactTrace`.
+    Los eventos de las violaciones son los de la propia vista.
+    """
+    log = trace.log
+    segment = _Segment(
+        log, trace.start, trace.end,
+        np.array([trace.start, trace.end], dtype=np.int64)
+    )
+
+    events = trace.events
+    violations = []
+    for _, violation, positions in _violations(segment):
+        violation["events"] = [events[p] for p in positions]
+        violations.append(violation)
+
+    return violations
+
+
+def validate_temporal_log(log):
+    """
+    Reglas temporales vectorizadas sobre todo un `CompactLog` de una
+    vez. Devuelve {índice de traza: violaciones} solo para las trazas
+    con alguna violación.
+
+    Los eventos de las violaciones son `CompactEvent` creados solo
+    para las posiciones implicadas (uno por posición, compartido
+    entre violaciones), sin materializar los eventos de cada traza.
+    """
+    segment = _Segment(log, 0, log.num_events, log.offsets)
+
+    found = _violations(segment)
+    if not found:
+        return {}
+
+    cases = segment.case[[position for position, _, _ in found]].tolist()
+
+    events = {}
+    result = {}
+    # orden estable por traza: dentro de cada una se mantiene el
+    # orden de reglas de `_violations`
+    for case, (_, violation, positions) in sorted(
+        zip(cases, found), key=lambda item: item[0]
+    ):
+        for p in positions:
+            if p not in events:
+                events[p] = CompactEvent(log, p)
+        violation["events"] = [events[p] for p in positions]
+        result.setdefault(case, []).append(violation)
+
+    return result
@@ -1,5 +1,9 @@
 # gdpr/vocabulary.py
 
+import functools
+import re
+import threading
+
 GDPR_EVENTS = {
     "SEND_DATA": "gdpr:sendData",
     "CONSENT_EXPIRED": "gdpr:consentExpired",
@@ -26,3 +30,193 @@ GDPR_EVENTS = {
     "REVOKE_THIRD_PARTY": "gdpr:revokeThirdPartyAccess",
     "PERMISSION_GRANTED": "gdpr:permissionGranted",
 }
+
+
+# ============================================================
+# CLASIFICACIÓN DE ACTIVIDADES
+# ============================================================
+
+WRITE_VERBS = ("create", "update", "modify", "delete", "write", "set", "register")
+
+# operación -> verbos, por orden de prioridad
+OPERATION_VERBS = (
+    ("delete", ("delete", "erase", "remove")),
+    ("share", ("share", "send", "export")),
+    ("update", ("update", "modify", "set")),
+    ("collect", ("register", "create", "insert")),
+)
+
+# Actividades distintas cacheadas por clasificador
+CLASSIFICATION_CACHE_SIZE = 4096
+
+
+class ActivityClassifier:
+    """
+    Clasificador precompilado: una sola expresión regular con todos
+    los verbos en lugar de un bucle de subcadenas por categoría.
+
+    `categories`: ((etiqueta, verbos), ...) por orden de prioridad;
+    gana la categoría más prioritaria con algún verbo contenido en el
+    nombre (en minúsculas) y, si no hay ninguna, `default`.
+
+    El lookahead encuentra también coincidencias solapadas
+    (p.ej. "delete" dentro de "sendelete"), de modo que el resultado
+    es el mismo que el de comprobar cada verbo por separado.
+    """
+
+    def __init__(self, categories, default):
+        self.categories = tuple(
+            (label, tuple(verbs)) for label, verbs in categories
+        )
+        self.default = default
+
+        self._rank = {}
+        for rank, (_, verbs) in enumerate(self.categories):
+            for verb in verbs:
+                self._rank.setdefault(verb, rank)
+
+        # a igual posición, la alternativa más prioritaria primero
+        verbs = sorted(self._rank, key=self._rank.__getitem__)
+        self._pattern = re.compile(
+            "(?=(" + "|".join(re.escape(v) for v in verbs) + "))"
+        )
+
+    def __call__(self, event_name):
+        best = None
+
+        for match in self._pattern.finditer(event_name.lower()):
+            rank = self._rank[match.group(1)]
+            if best is None or rank < best:
+                best = rank
+                if rank == 0:
+                    break
+
+        return self.default if best is None else self.categories[best][0]
+
+
+OPERATION_CLASSIFIER = ActivityClassifier(OPERATION_VERBS, default="read")
+
+ACCESS_CLASSIFIER = ActivityClassifier(
+    ((GDPR_EVENTS["WRITE"], WRITE_VERBS),), default=GDPR_EVENTS["READ"]
+)
+
+
+def _cached(classifier, maxsize):
+    return functools.lru_cache(maxsize=maxsize)(classifier)
+
+
+_classify_operation = _cached(OPERATION_CLASSIFIER, CLASSIFICATION_CACHE_SIZE)
+_classify_access = _cached(ACCESS_CLASSIFIER, CLASSIFICATION_CACHE_SIZE)
+
+
+def classify_data_access(event_name):
+    return _classify_access(event_name)
+
+
+def classify_data_operation(event_name):
+    return _classify_operation(event_name)
+
+
+def configure_classification(
+    operation=None, access=None, maxsize=CLASSIFICATION_CACHE_SIZE
+):
+    """
+    Sustituye los clasificadores (cualquier callable nombre -> etiqueta,
+    p.ej. un `ActivityClassifier` con otros verbos) y/o el tamaño de
+    la caché LRU. Las cachés y sus contadores se reinician.
+
+    La configuración es por proceso: con `run_log(workers > 1)` debe
+    aplicarse también en los workers (p.ej. al importar el módulo de
+    despliegue).
+    """
+    global _classify_operation, _classify_access
+
+    _classify_operation = _cached(
+        operation or _classify_operation.__wrapped__, maxsize
+    )
+    _classify_access = _cached(
+        access or _classify_access.__wrapped__, maxsize
+    )
+
+
+def classification_cache_info():
+    """
+    Aciertos, fallos y tasa de acierto de las cachés de clasificación.
+    """
+    info = {}
+
+    for name, cached in (
+        ("operation", _classify_operation), ("access", _classify_access)
+    ):
+        stats = cached.cache_info()
+        calls = stats.hits + stats.misses
+        info[name] = {
+            "hits": stats.hits,
+            "misses": stats.misses,
+            "size": stats.currsize,
+            "maxsize": stats.maxsize,
+            "hit_rate": stats.hits / calls if calls else 0.0,
+        }
+
+    return info
+
+
+# ============================================================
+# REGISTRO DE ACTIVIDADES (interning)
+# ============================================================
+
+class ActivityRegistry:
+    """
+    Nombres de actividad <-> códigos enteros pequeños.
+
+    Un log real tiene unos cientos de actividades distintas y
+    millones de eventos: cada nombre se registra una vez.
+
+    Los códigos son locales al proceso: no deben persistirse ni
+    compararse entre procesos (cada worker tiene su registro).
+
+    Se puede usar desde varios hilos (p.ej. las etapas de `async_run`):
+    los nombres nuevos se registran con un lock; los ya registrados se
+    leen sin él.
+    """
+
+    def __init__(self, names=()):
+        self.names = []
+        self.codes = {}
+        self._lock = threading.Lock()
+
+        for name in names:
+            self.intern(name)
+
+    def intern(self, name):
+        code = self.codes.get(name)
+        if code is None:
+            with self._lock:
+                code = self.codes.get(name)
+                if code is None:
+                    # el nombre se añade antes de publicar su código
+                    self.names.append(name)
+                    code = self.codes[name] = len(self.names) - 1
+        return code
+
+    def intern_all(self, names):
+        codes = self.codes
+        return [
+            code if (code := codes.get(name)) is not None else self.intern(name)
+            for name in names
+        ]
+
+    def name(self, code):
+        return self.names[code]
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self.codes
+
+
+# Registro del proceso: el vocabulario GDPR ocupa los primeros códigos
+ACTIVITIES = ActivityRegistry(GDPR_EVENTS.values())
+
+GDPR_CODES = {key: ACTIVITIES.codes[name] for key, name in GDPR_EVENTS.items()}
@@ -1,27 +1,25 @@
-from pm4py.objects.log.exporter.xes import exporter as xes_exporter
-from pm4py.objects.log.obj import EventLog
+import asyncio
 import os
 import matplotlib.pyplot as plt
 from collections import Counter
+from contextlib import ExitStack
 
 from gdpr.importers import load_event_log
-from gdpr.pipelines import (
-    build_compliant_trace,
-    build_non_compliant_trace
+from gdpr.pipelines import async_run, iter_run_log
+from gdpr.result_cache import ResultCache
+from gdpr.exporters import (
+    export_recommendations,
+    export_markdown_report,
+    export_pdf_report,
+    XESStreamWriter,
+    ParquetStreamWriter
 )
-from gdpr.validators.validators import (
-    validate_trace,
-    annotate_violations_on_trace
+from gdpr.reporting import (
+    build_gdpr_analysis_report,
+    build_gdpr_executive_report,
+    trace_report_record
 )
-from gdpr.recommendations import (
-    generate_recommendations,
-    generate_sp_recommendations
-)
-from gdpr.scoring import compute_gdpr_risk_score, classify_risk
-from gdpr.remediation import apply_recommendations
-from gdpr.sticky_policies import build_sticky_policy_from_trace
-from gdpr.exporters import export_recommendations, export_markdown_report, export_pdf_report
-from gdpr.reporting import build_gdpr_analysis_report, build_gdpr_executive_report
+from gdpr.charts import generate_severity_chart
 
 
 # ============================================================
@@ -33,236 +31,203 @@ OUTPUT_DIR = "data/output"
 log_filename = "Sepsis Cases - Event Log.xes.gz"
 
 log_path = os.path.join(INPUT_DIR, log_filename)
-os.makedirs(OUTPUT_DIR, exist_ok=True)
 
+# Paralelismo y reproducibilidad (semilla por traza derivada de SEED)
+WORKERS = os.cpu_count() or 1
+CHUNKSIZE = 8
+SEED = 0
 
-# ============================================================
-# CARGA DEL LOG
-# ============================================================
+# Salidas XES comprimidas (.xes.gz)
+COMPRESS_XES = False
 
-log = load_event_log(log_path)
+# Copia Parquet de los tres logs anotados (requiere pyarrow)
+EXPORT_PARQUET = False
 
-print(f"Número de trazas: {len(log)}")
-print(f"Número de eventos de la primera traza: {len(log[0])}")
+# Caché de resultados por traza (None para desactivarla): en una
+# re-ejecución solo se procesan los casos nuevos o modificados. Al
+# terminar se borran los resultados no usados en la ejecución (casos
+# modificados o eliminados, versiones anteriores del código)
+RESULT_CACHE = os.path.join(OUTPUT_DIR, "gdpr_result_cache.sqlite")
 
+# Pipeline asíncrono (lectura, etapas y escritura solapadas); solo
+# compensa con varios núcleos
+ASYNC_PIPELINE = False
 
-# ============================================================
-# CONTEXTO GDPR A NIVEL DE TRAZA
-# ============================================================
-
-for trace in log:
-    trace.attributes.update({
-        "gdpr:personal_data": True,
-        "gdpr:data_category": "unspecified",
-        "gdpr:processing_context": "generic",
-        "gdpr:legal_basis": "consent",
-        "gdpr:default_purpose": "service_provision"
-    })
+OUTPUTS = {
+    "compliant": "GDPR_compliant",
+    "non_compliant": "GDPR_NON_compliant",
+    "remediated": "GDPR_REMEDIATED",
+}
 
 
 # ============================================================
-# PIPELINE GDPR
+# PIPELINE GDPR EN STREAMING
 # ============================================================
+# lectura perezosa → pipeline por traza (en paralelo) → escritura
+# incremental de los tres logs (XES y, opcionalmente, Parquet). De
+# cada traza solo se conserva para los informes `trace_report_record`
+# (violaciones serializadas, sin la traza ni su Sticky Policy)
+
+def run_pipeline(output_subdir, base_name):
+    xes_ext = ".xes.gz" if COMPRESS_XES else ".xes"
+
+    log = load_event_log(log_path, lazy=True)
+
+    trace_evidence = []
+    violation_counter = Counter()
+
+    with ExitStack() as stack:
+        cache = None
+        if RESULT_CACHE:
+            cache = stack.enter_context(ResultCache(RESULT_CACHE))
+
+        writers = []
+
+        for key, suffix in OUTPUTS.items():
+            output_path = os.path.join(output_subdir, f"{base_name}_{suffix}")
+
+            writers.append((key, stack.enter_context(
+                XESStreamWriter(output_path + xes_ext)
+            )))
+            if EXPORT_PARQUET:
+                writers.append((key, stack.enter_context(
+                    ParquetStreamWriter(output_path + ".parquet")
+                )))
+
+        if ASYNC_PIPELINE:
+            trace_evidence = asyncio.run(async_run(
+                log, writers, workers=WORKERS, chunksize=CHUNKSIZE,
+                seed=SEED, cache=cache, evidence_record=trace_report_record
+            ))
+        else:
+            for result in iter_run_log(
+                log, workers=WORKERS, chunksize=CHUNKSIZE, seed=SEED,
+                cache=cache
+            ):
+                for key, writer in writers:
+                    writer.write_trace(result[key])
+                trace_evidence.append(trace_report_record(result["evidence"]))
+
+        for evidence in trace_evidence:
+            for v in evidence["violations"]:
+                violation_counter[v["type"]] += 1
+
+        if cache is not None:
+            removed = cache.prune()
+            print(f"Caché de resultados: {cache.hits} reutilizados, "
+                  f"{cache.misses} procesados, {removed} descartados")
+
+    print(f"Número de trazas: {len(trace_evidence)}")
+    print("Logs exportados correctamente.")
+
+    return trace_evidence
 
-compliant_log = []
-non_compliant_log = []
-remediated_log = []
-trace_evidence = []
 
-violation_counter = Counter()
-
-for trace in log:
+# ============================================================
+# INFORME TÉCNICO (JSON)
+# ============================================================
 
-    # 1️⃣ COMPLIANT
-    compliant = build_compliant_trace(trace)
-    compliant.attributes["gdpr:sticky_policy"] = (
-        build_sticky_policy_from_trace(compliant)
+def export_technical_report(trace_evidence, output_subdir, base_name):
+    technical_report = build_gdpr_analysis_report(
+        trace_evidence,
+        log_filename
     )
-    compliant_log.append(compliant)
 
-    # 2️⃣ NON-COMPLIANT
-    non_compliant = build_non_compliant_trace(compliant)
-    non_compliant.attributes["gdpr:sticky_policy"] = (
-        build_sticky_policy_from_trace(non_compliant)
+    json_path = export_recommendations(
+        technical_report,
+        output_subdir,
+        filename=f"{base_name}_gdpr_case_analysis.json"
     )
-    non_compliant_log.append(non_compliant)
 
-    # 3️⃣ VALIDACIÓN
-    violations = validate_trace(non_compliant)
+    os.remove(json_path)
 
-    # ⬅️ NUEVO: contar violaciones
-    for v in violations:
-        violation_counter[v["type"]] += 1
-
-    annotate_violations_on_trace(non_compliant, violations)
-
-    # 4️⃣ RECOMENDACIONES
-    recommendations = generate_recommendations(violations)
-    recommendations.extend(
-        generate_sp_recommendations(non_compliant)
-    )
 
-    # 5️⃣ SCORING
-    risk_score = compute_gdpr_risk_score(recommendations)
-    risk_level = classify_risk(risk_score)
-
-    non_compliant.attributes.update({
-        "gdpr:risk_score": risk_score,
-        "gdpr:risk_level": risk_level
-    })
+# ============================================================
+# INFORME EJECUTIVO (MD + PDF)
+# ============================================================
 
-    # 6️⃣ REMEDIATION
-    remediated = apply_recommendations(non_compliant, recommendations)
-    remediated.attributes["gdpr:sticky_policy"] = (
-        build_sticky_policy_from_trace(remediated)
+def export_executive_report(trace_evidence, output_subdir, base_name):
+    executive_report = build_gdpr_executive_report(
+        trace_evidence,
+        log_filename
     )
-    remediated_log.append(remediated)
 
-    # 7️⃣ REVALIDACIÓN
-    corrected_violations = validate_trace(remediated)
-    corrected_recommendations = generate_recommendations(
-        corrected_violations
+    chart_path = generate_severity_chart(
+        executive_report["violations_summary"],
+        output_subdir
     )
 
-    corrected_score = compute_gdpr_risk_score(
-        corrected_recommendations
+    md_path = export_markdown_report(
+        executive_report,
+        output_subdir,
+        filename=f"{base_name}_gdpr_case_analysis.md",
+        severity_chart_path=chart_path
     )
-    corrected_level = classify_risk(corrected_score)
-
-    trace_evidence.append({
-        "trace_id": non_compliant.attributes.get("concept:name"),
-
-        # 🔴 ESTADO BASE PARA ANÁLISIS
-        "violations": violations,
-        "recommendations": recommendations,
-        "risk_score": risk_score,
-        "risk_level": risk_level,
-        "sticky_policy": non_compliant.attributes.get("gdpr:sticky_policy"),
-
-        # 🔵 CONTEXTO ADICIONAL (no analítico)
-        "initial_state": {
-            "violations": violations,
-            "risk_score": risk_score,
-            "risk_level": risk_level
-        },
-        "post_remediation_state": {
-            "violations": corrected_violations,
-            "risk_score": corrected_score,
-            "risk_level": corrected_level
-        },
-
-        "remediation": {
-            "corrected_violations": corrected_violations
-        }
-    })
 
+    pdf_path = export_pdf_report(md_path)
 
-# ============================================================
-# EXPORTACIÓN
-# ============================================================
-
-base_name = os.path.splitext(log_filename)[0]
-output_subdir = os.path.join(OUTPUT_DIR, base_name)
-os.makedirs(output_subdir, exist_ok=True)
+    print("Informe ejecutivo GDPR exportado:")
+    print(" - PDF:", pdf_path)
 
-print(f"Exportando resultados en: {output_subdir}")
+    os.remove(md_path)
 
 
 # ----------------------------
-# XES
+# GRÁFICA BEFORE vs AFTER
 # ----------------------------
 
-xes_exporter.apply(
-    EventLog(compliant_log),
-    os.path.join(output_subdir, f"{base_name}_GDPR_compliant.xes")
-)
-xes_exporter.apply(
-    EventLog(non_compliant_log),
-    os.path.join(output_subdir, f"{base_name}_GDPR_NON_compliant.xes")
-)
-xes_exporter.apply(
-    EventLog(remediated_log),
-    os.path.join(output_subdir, f"{base_name}_GDPR_REMEDIATED.xes")
-)
-
-print("Logs XES exportados correctamente.")
+def export_risk_chart(trace_evidence, output_subdir, base_name):
+    before_avg = sum(
+        t["initial_state"]["risk_score"] for t in trace_evidence
+    ) / len(trace_evidence)
 
+    after_avg = sum(
+        t["post_remediation_state"]["risk_score"] for t in trace_evidence
+    ) / len(trace_evidence)
 
-# ============================================================
-# INFORME TÉCNICO (JSON)
-# ============================================================
-
-technical_report = build_gdpr_analysis_report(
-    trace_evidence,
-    log_filename
-)
-
-json_path = export_recommendations(
-    technical_report,
-    output_subdir,
-    filename=f"{base_name}_gdpr_case_analysis.json"
-)
-
-os.remove(json_path)
-# ============================================================
-# INFORME EJECUTIVO (MD + PDF)
-# ============================================================
-
-executive_report = build_gdpr_executive_report(
-    trace_evidence,
-    log_filename
-)
-
-from gdpr.charts import generate_severity_chart
+    plt.figure()
+    plt.bar(
+        ["Before remediation", "After remediation"],
+        [before_avg, after_avg]
+    )
 
-chart_path = generate_severity_chart(
-    executive_report["violations_summary"],
-    output_subdir
-)
-
-md_path = export_markdown_report(
-    executive_report,
-    output_subdir,
-    filename=f"{base_name}_gdpr_case_analysis.md",
-    severity_chart_path=chart_path
-)
+    plt.title("GDPR Risk Score – Before vs After Remediation")
+    plt.ylabel("Risk score")
 
+    plot_path = os.path.join(
+        output_subdir,
+        f"{base_name}_gdpr_risk_before_after.png"
+    )
 
-pdf_path = export_pdf_report(md_path)
+    plt.savefig(plot_path)
+    plt.close()
 
-print("Informe ejecutivo GDPR exportado:")
-print(" - PDF:", pdf_path)
+    print("Gráfica GDPR Before vs After exportada en:")
+    print(" -", plot_path)
 
-os.remove(md_path)
 
-# ----------------------------
-# GRÁFICA BEFORE vs AFTER
-# ----------------------------
+# ============================================================
+# MAIN
+# ============================================================
+# Con el método de arranque spawn/forkserver (Windows, macOS) cada
+# worker del pool importa este módulo: el script solo se ejecuta
+# desde el proceso principal
 
-before_avg = sum(
-    t["initial_state"]["risk_score"] for t in trace_evidence
-) / len(trace_evidence)
+def main():
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-after_avg = sum(
-    t["post_remediation_state"]["risk_score"] for t in trace_evidence
-) / len(trace_evidence)
+    base_name = os.path.splitext(log_filename)[0]
+    output_subdir = os.path.join(OUTPUT_DIR, base_name)
+    os.makedirs(output_subdir, exist_ok=True)
 
-plt.figure()
-plt.bar(
-    ["Before remediation", "After remediation"],
-    [before_avg, after_avg]
-)
+    print(f"Exportando resultados en: {output_subdir}")
 
-plt.title("GDPR Risk Score – Before vs After Remediation")
-plt.ylabel("Risk score")
+    trace_evidence = run_pipeline(output_subdir, base_name)
 
-plot_path = os.path.join(
-    output_subdir,
-    f"{base_name}_gdpr_risk_before_after.png"
-)
+    export_technical_report(trace_evidence, output_subdir, base_name)
+    export_executive_report(trace_evidence, output_subdir, base_name)
+    export_risk_chart(trace_evidence, output_subdir, base_name)
 
-plt.savefig(plot_path)
-plt.close()
 
-print("Gráfica GDPR Before vs After exportada en:")
-print(" -", plot_path)
+if __name__ == "__main__":
+    main()
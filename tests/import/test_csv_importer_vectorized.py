@@ -0,0 +1,62 @@
+from datetime import datetime
+
+import pandas as pd
+
+from gdpr.importers import load_event_log
+from gdpr.importers.csv_importer import CSVImporter
+
+
+def reference_load(path):
+    # Importador original (groupby + iterrows)
+    df = pd.read_csv(path)
+    traces = []
+
+    for case_id, group in df.groupby("case_id"):
+        events = []
+        for _, row in group.iterrows():
+            events.append({
+                "concept:name": row["activity"],
+                "time:timestamp": datetime.fromisoformat(row["timestamp"]),
+                "gdpr:access": bool(row["gdpr_access"]),
+            })
+        traces.append((str(case_id), events))
+
+    return traces
+
+
+def as_plain(traces):
+    return [
+        (t.attributes["concept:name"], [dict(e) for e in t])
+        for t in traces
+    ]
+
+
+def test_csv_importer_matches_reference(tmp_path):
+    path = tmp_path / "log.csv"
+    path.write_text(
+        "case_id,activity,timestamp,gdpr_access\n"
+        "2,register,2024-01-01T10:00:00,0\n"
+        "1,register,2024-01-01T09:00:00+01:00,1\n"
+        "2,triage,2024-01-01T11:00:00,1\n"
+        "1,triage,2024-01-01T09:30:00+01:00,0\n"
+        "3,register,2024-01-02T08:00:00,1\n"
+    )
+
+    log = load_event_log(str(path))
+    print(f"Traces: {len(log)}")
+
+    assert as_plain(log) == reference_load(path)
+
+
+def test_csv_chunked_reading_matches_load(tmp_path):
+    path = tmp_path / "log.csv"
+    rows = ["case_id,activity,timestamp"]
+    for case in range(1, 6):
+        for i in range(case):
+            rows.append(f"{case},act_{i},2024-01-0{case}T1{i}:00:00")
+    path.write_text("\n".join(rows) + "\n")
+
+    # bloques de 3 filas: los casos quedan partidos entre bloques
+    streamed = list(CSVImporter(chunksize=3).iter_traces(str(path)))
+
+    assert as_plain(streamed) == as_plain(load_event_log(str(path)))
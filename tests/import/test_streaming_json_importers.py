@@ -0,0 +1,106 @@
+import io
+import json
+import types
+
+import pytest
+
+from gdpr.importers import load_event_log
+from gdpr.importers.json_importer import _iter_json_array
+
+CASES = [
+    {
+        "case_id": "case_1",
+        "events": [
+            {"activity": "register", "timestamp": "2024-01-01T10:00:00"},
+            {"activity": "triage", "timestamp": "2024-01-01T11:00:00",
+             "gdpr_access": True},
+        ],
+    },
+    {
+        "case_id": "case_2",
+        "events": [
+            {"activity": "register", "timestamp": "2024-01-02T09:00:00"},
+        ],
+    },
+]
+
+
+def as_plain(traces):
+    return [
+        (t.attributes["concept:name"], [dict(e) for e in t])
+        for t in traces
+    ]
+
+
+def test_json_array_is_parsed_incrementally(tmp_path):
+    path = tmp_path / "log.json"
+    path.write_text(json.dumps(CASES, indent=2))
+
+    stream = load_event_log(str(path), lazy=True)
+    assert isinstance(stream, types.GeneratorType)
+
+    expected = as_plain(load_event_log(str(path)))
+    assert as_plain(stream) == expected
+    print(f"Traces: {len(expected)}")
+
+    # bloques de 7 caracteres: cada caso queda partido en varias lecturas
+    text = json.dumps(CASES)
+    assert list(_iter_json_array(io.StringIO(text), read_size=7)) == CASES
+
+
+def test_json_lines_cases_and_events(tmp_path):
+    reference = as_plain(load_event_log(_write(tmp_path, "ref.json", CASES)))
+
+    # un caso por línea
+    case_lines = _write_lines(tmp_path, "cases.jsonl", CASES)
+
+    # un evento por línea
+    event_lines = _write_lines(tmp_path, "events.ndjson", [
+        dict(e, case_id=case["case_id"])
+        for case in CASES for e in case["events"]
+    ])
+
+    for path in (case_lines, event_lines):
+        assert as_plain(load_event_log(path, lazy=True)) == reference
+        assert as_plain(load_event_log(path)) == reference
+
+
+def test_json_lines_case_split_across_lines(tmp_path):
+    # eventos sueltos y un caso completo con el mismo case_id
+    path = _write_lines(tmp_path, "mixed.jsonl", [
+        dict(CASES[0]["events"][0], case_id="case_1"),
+        CASES[1],
+        {"case_id": "case_1", "events": CASES[0]["events"][1:]},
+    ])
+
+    reference = as_plain(load_event_log(_write(tmp_path, "ref.json", CASES)))
+    assert as_plain(load_event_log(path)) == reference
+
+    # en streaming los casos deben ser contiguos
+    with pytest.raises(ValueError, match="no es contiguo"):
+        list(load_event_log(path, lazy=True))
+
+
+def test_json_lines_case_record_followed_by_event_lines(tmp_path):
+    # caso completo seguido de eventos sueltos del mismo caso: contiguo
+    path = _write_lines(tmp_path, "continued.jsonl", [
+        {"case_id": "case_1", "events": CASES[0]["events"][:1]},
+        dict(CASES[0]["events"][1], case_id="case_1"),
+        CASES[1],
+    ])
+
+    reference = as_plain(load_event_log(_write(tmp_path, "ref.json", CASES)))
+    assert as_plain(load_event_log(path, lazy=True)) == reference
+    assert as_plain(load_event_log(path)) == reference
+
+
+def _write(tmp_path, name, data):
+    path = tmp_path / name
+    path.write_text(json.dumps(data))
+    return str(path)
+
+
+def _write_lines(tmp_path, name, records):
+    path = tmp_path / name
+    path.write_text("\n".join(json.dumps(r) for r in records) + "\n")
+    return str(path)
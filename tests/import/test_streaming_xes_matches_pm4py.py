@@ -0,0 +1,24 @@
+import types
+
+from gdpr.importers import load_event_log
+
+
+def as_plain(trace):
+    return dict(trace.attributes), [dict(e) for e in trace]
+
+
+def test_streaming_xes_reader_matches_pm4py():
+    for path in (
+        "data/input/log_original.xes",
+        "data/input/Sepsis Cases - Event Log.xes.gz",
+    ):
+        log = load_event_log(path)
+        stream = load_event_log(path, lazy=True)
+
+        assert isinstance(stream, types.GeneratorType)
+
+        traces = list(stream)
+        print(f"{path}: {len(traces)} traces")
+
+        assert len(traces) == len(log)
+        assert [as_plain(t) for t in traces] == [as_plain(t) for t in log]
@@ -0,0 +1,41 @@
+from gdpr.importers import load_event_log
+
+TEST_LOGS = (
+    "data/input/test/log_original.xes",
+    "data/input/test/log_long_case.xes",
+    "data/input/test/log_with_erasure.xes",
+)
+
+VARIANTS = ("compliant", "non_compliant", "remediated")
+
+
+def load_traces():
+    """
+    Carga (de nuevo en cada llamada) las trazas de los tres logs de
+    prueba: el pipeline puede anotar las trazas de entrada.
+    """
+    traces = []
+    for path in TEST_LOGS:
+        traces.extend(load_event_log(path))
+    return traces
+
+
+def summarize(results):
+    """
+    Resumen comparable de los resultados de `run_log`: evidencia y
+    eventos de las tres variantes de cada traza.
+    """
+    return [
+        (
+            r["evidence"]["trace_id"],
+            [v["type"] for v in r["evidence"]["violations"]],
+            r["evidence"]["risk_score"],
+            r["evidence"]["post_remediation_state"]["risk_score"],
+            repr(r["evidence"]["sticky_policy"]),
+            [
+                [sorted((k, repr(v)) for k, v in e.items()) for e in r[key]]
+                for key in VARIANTS
+            ],
+        )
+        for r in results
+    ]
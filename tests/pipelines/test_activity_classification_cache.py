@@ -0,0 +1,76 @@
+import itertools
+
+from gdpr.vocabulary import (
+    GDPR_EVENTS,
+    OPERATION_CLASSIFIER,
+    OPERATION_VERBS,
+    WRITE_VERBS,
+    ActivityClassifier,
+    classification_cache_info,
+    classify_data_access,
+    classify_data_operation,
+    configure_classification
+)
+
+
+def reference_operation(event_name):
+    name = event_name.lower()
+    for operation, verbs in OPERATION_VERBS:
+        if any(v in name for v in verbs):
+            return operation
+    return "read"
+
+
+def reference_access(event_name):
+    name = event_name.lower()
+    if any(v in name for v in WRITE_VERBS):
+        return GDPR_EVENTS["WRITE"]
+    return GDPR_EVENTS["READ"]
+
+
+def test_compiled_classifier_matches_substring_loops():
+    verbs = sorted({v for _, vs in OPERATION_VERBS for v in vs} | set(WRITE_VERBS))
+    names = [
+        "ER Registration", "Leucocytes", "Release A", "Reset Password",
+        "sendelete", "Export Update", "CRP", "Admission NC", "presetting",
+    ]
+    # combinaciones solapadas de verbos (el último carácter de uno
+    # puede ser el primero del siguiente)
+    names += [a + b for a, b in itertools.product(verbs, repeat=2)]
+    names += [a[:-1] + b for a, b in itertools.product(verbs, repeat=2)]
+
+    for name in names:
+        assert classify_data_operation(name) == reference_operation(name), name
+        assert classify_data_access(name) == reference_access(name), name
+
+    print(f"{len(names)} nombres clasificados")
+
+
+def test_cache_counters_and_custom_classifier():
+    configure_classification()
+
+    for _ in range(10):
+        for name in ("ER Registration", "Leucocytes", "CRP"):
+            classify_data_operation(name)
+
+    info = classification_cache_info()["operation"]
+    print(info)
+    assert info["misses"] == 3 and info["hits"] == 27
+    assert info["hit_rate"] == 0.9
+
+    try:
+        configure_classification(
+            operation=ActivityClassifier(
+                [("collect", ["registration"]), ("share", ["release"])],
+                default="read"
+            ),
+            maxsize=2
+        )
+        assert classify_data_operation("ER Registration") == "collect"
+        assert classify_data_operation("Release A") == "share"
+        assert classify_data_operation("Delete") == "read"
+        assert classification_cache_info()["operation"]["size"] == 2
+    finally:
+        configure_classification(operation=OPERATION_CLASSIFIER)
+
+    assert classify_data_operation("Delete") == "delete"
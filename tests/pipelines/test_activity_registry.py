@@ -0,0 +1,80 @@
+import threading
+import time
+
+from gdpr.vocabulary import (
+    ACTIVITIES,
+    GDPR_CODES,
+    GDPR_EVENTS,
+    ActivityRegistry
+)
+from gdpr.validators.engine import FusedValidator
+
+
+class DummyTrace(list):
+    def __init__(self, events):
+        super().__init__(events)
+        self.attributes = {}
+
+
+def test_registry_interns_activity_names():
+    registry = ActivityRegistry(["ER Registration", "Leucocytes"])
+
+    assert registry.intern("ER Registration") == 0
+    assert registry.intern_all(["Leucocytes", "Release A", "Leucocytes"]) == [1, 2, 1]
+    assert registry.name(2) == "Release A"
+    assert len(registry) == 3
+    assert "Release A" in registry and "Release B" not in registry
+
+
+class SlowCodes(dict):
+    """Cede el hilo al registrar un código: abre la ventana de carrera."""
+
+    def __setitem__(self, key, value):
+        time.sleep(0.001)
+        super().__setitem__(key, value)
+
+
+def test_registry_codes_are_unique_across_threads():
+    registry = ActivityRegistry()
+    registry.codes = SlowCodes()
+    names = [f"activity {i}" for i in range(100)]
+    start = threading.Barrier(4)
+
+    def intern_all():
+        start.wait()
+        for name in names:
+            registry.intern(name)
+
+    threads = [threading.Thread(target=intern_all) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert registry.names == names
+    assert all(registry.name(registry.codes[n]) == n for n in names)
+
+
+def test_gdpr_vocabulary_has_the_first_codes():
+    assert sorted(GDPR_CODES.values()) == list(range(len(set(GDPR_EVENTS.values()))))
+    for key, code in GDPR_CODES.items():
+        assert ACTIVITIES.name(code) == GDPR_EVENTS[key]
+
+
+def test_engine_dispatch_with_new_activities():
+    trace = DummyTrace([
+        {"concept:name": GDPR_EVENTS["ERASE"], "time:timestamp": 1},
+        {"concept:name": "actividad nueva del registro", "time:timestamp": 2,
+         "gdpr:access": True, "gdpr:operation": "update"},
+    ])
+
+    # registrada después de construir las tablas de despacho
+    ACTIVITIES.intern("actividad nueva del registro")
+
+    fed = FusedValidator(trace)
+    for event in trace:
+        fed.feed(event)
+
+    batch = FusedValidator(trace).run(trace)
+    assert [v["type"] for v in fed.finish()] == [v["type"] for v in batch]
+    assert "access_after_erasure" in [v["type"] for v in batch]
@@ -0,0 +1,74 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from gdpr.pipelines import async_run, run_log
+from gdpr.reporting import trace_report_record
+from gdpr.result_cache import ResultCache
+
+from pipeline_helpers import load_traces, summarize
+
+KEYS = ("compliant", "non_compliant", "remediated")
+
+
+class CollectingWriter:
+    def __init__(self):
+        self.traces = []
+
+    def write_trace(self, trace):
+        self.traces.append([dict(e) for e in trace])
+
+
+def run_async(traces, seed, **kwargs):
+    """
+    Resultados de `async_run` con la forma de los de `run_log`.
+    """
+    writers = [(key, CollectingWriter()) for key in KEYS]
+    evidence = asyncio.run(async_run(traces, writers, seed=seed, **kwargs))
+    return [
+        {"evidence": e, **{key: w.traces[i] for key, w in writers}}
+        for i, e in enumerate(evidence)
+    ]
+
+
+def test_async_run_matches_run_log():
+    reference = summarize(run_log(load_traces(), seed=5))
+
+    with ThreadPoolExecutor(2) as executor:
+        for kwargs in (
+            {},
+            {"chunksize": 2, "queue_size": 1},
+            {"workers": 2},
+            {"executor": executor, "workers": 2},
+        ):
+            print(f"async_run({kwargs})")
+            assert summarize(run_async(load_traces(), 5, **kwargs)) == reference
+
+
+def test_async_run_uses_result_cache(tmp_path):
+    reference = summarize(run_log(load_traces(), seed=5))
+
+    with ResultCache(str(tmp_path / "cache.sqlite")) as cache:
+        results = run_async(load_traces(), 5, cache=cache)
+        assert summarize(results) == reference
+        assert (cache.hits, cache.misses) == (0, 3)
+
+        results = run_async(load_traces(), 5, cache=cache, chunksize=2)
+        assert summarize(results) == reference
+        assert (cache.hits, cache.misses) == (3, 3)
+
+
+def test_async_run_keeps_only_report_records():
+    reference = [
+        trace_report_record(r["evidence"])
+        for r in run_log(load_traces(), seed=5)
+    ]
+
+    records = asyncio.run(async_run(
+        load_traces(), seed=5, evidence_record=trace_report_record
+    ))
+    assert records == reference
+
+    for record in records:
+        assert "sticky_policy" not in record
+        for v in record["violations"]:
+            assert all(type(e) is dict for e in v["events"])
@@ -0,0 +1,79 @@
+import json
+import random
+
+from gdpr.exporters import export_recommendations
+from gdpr.importers import load_event_log
+from gdpr.pipelines import (
+    build_compliant_trace,
+    build_non_compliant_trace,
+    process_trace,
+)
+from gdpr.reporting import build_gdpr_analysis_report
+from gdpr.trace_overlay import CowEvent, cow_trace
+
+
+def as_plain(trace):
+    return dict(trace.attributes), [dict(e) for e in trace]
+
+
+def test_cow_trace_only_materializes_written_events():
+    trace = build_compliant_trace(
+        load_event_log("data/input/log_original.xes")[0]
+    )
+    before = as_plain(trace)
+
+    copy = cow_trace(trace)
+    copy[0]["gdpr:purpose"] = "unauthorized_purpose"
+    copy.attributes["gdpr:compliance"] = "non_compliant"
+
+    materialized = [e.materialized for e in copy]
+    print(f"Materialized events: {sum(materialized)}/{len(copy)}")
+
+    assert materialized == [True] + [False] * (len(copy) - 1)
+    assert as_plain(trace) == before
+    assert copy[0]["gdpr:purpose"] == "unauthorized_purpose"
+
+
+def test_non_compliant_generation_leaves_source_untouched():
+    compliant = build_compliant_trace(
+        load_event_log("data/input/test/log_long_case.xes")[0]
+    )
+    before = as_plain(compliant)
+
+    for seed in range(20):
+        build_non_compliant_trace(compliant, rng=random.Random(seed))
+
+    assert as_plain(compliant) == before
+
+
+def test_report_serializes_cow_events_as_dicts(tmp_path):
+    evidence = [
+        process_trace(trace, rng=random.Random(i))["evidence"]
+        for i, trace in enumerate(
+            load_event_log("data/input/test/log_long_case.xes")
+        )
+    ]
+    events = [
+        e
+        for record in evidence
+        for v in record["violations"]
+        for e in v.get("events", [])
+    ]
+    assert any(isinstance(e, CowEvent) for e in events)
+
+    path = export_recommendations(
+        build_gdpr_analysis_report(evidence, "log_long_case.xes"),
+        str(tmp_path)
+    )
+    with open(path, encoding="utf-8") as f:
+        report = json.load(f)
+
+    exported = [
+        e
+        for trace in report["traces"]
+        for v in trace["violations"]
+        for e in v.get("events", [])
+    ]
+    assert len(exported) == len(events)
+    assert all(isinstance(e, dict) for e in exported)
+    assert all("concept:name" in e for e in exported)
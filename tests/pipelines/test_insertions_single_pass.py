@@ -0,0 +1,59 @@
+import random
+from datetime import datetime, timedelta
+
+from gdpr.generators import insert_access_logs_and_history
+from gdpr.utils import insert_events
+from gdpr.vocabulary import GDPR_EVENTS
+
+
+class DummyTrace(list):
+    def __init__(self, events):
+        super().__init__(events)
+        self.attributes = {}
+
+
+def test_insert_events_matches_successive_inserts():
+    rng = random.Random(0)
+
+    for _ in range(200):
+        base = list(range(rng.randint(0, 20)))
+        insertions = sorted(
+            ((rng.randint(0, len(base) + 2), f"e{k}") for k in range(5)),
+            key=lambda item: item[0]
+        )
+
+        # referencia: list.insert desplazando los índices ya insertados
+        expected = list(base)
+        for shift, (pos, event) in enumerate(insertions):
+            expected.insert(pos + shift, event)
+
+        trace = DummyTrace(base)
+        insert_events(trace, insertions)
+
+        assert list(trace) == expected
+
+
+def test_access_logs_follow_each_access():
+    t0 = datetime(2024, 1, 1)
+    trace = DummyTrace([
+        {
+            "concept:name": f"activity_{i}",
+            "time:timestamp": t0 + timedelta(minutes=i),
+            "gdpr:access": i % 3 == 0,
+            "gdpr:actor": "controller",
+            "gdpr:purpose": "service_provision",
+        }
+        for i in range(3000)
+    ])
+
+    insert_access_logs_and_history(trace)
+    print(f"Events after insertion: {len(trace)}")
+
+    for i, event in enumerate(trace[:-1]):
+        if event.get("gdpr:access"):
+            log = trace[i + 1]
+            assert log["concept:name"] == GDPR_EVENTS["ACCESS_LOG"]
+            assert log["gdpr:related_activity"] == event["concept:name"]
+
+    assert len(trace) == 3000 + 1000 + 1
+    assert trace[-1]["concept:name"] == "gdpr:updateAccessHistory"
@@ -0,0 +1,106 @@
+from gdpr.importers import load_event_log
+from gdpr.pipelines import iter_run_log, run_log
+from gdpr.result_cache import ResultCache
+
+from pipeline_helpers import load_traces, summarize
+
+
+def test_cached_run_matches_uncached_run(tmp_path):
+    expected = summarize(run_log(load_traces(), seed=5))
+
+    with ResultCache(str(tmp_path / "cache.sqlite")) as cache:
+        first = run_log(load_traces(), seed=5, cache=cache)
+        assert (cache.hits, cache.misses) == (0, 3)
+
+        second = run_log(load_traces(), seed=5, cache=cache)
+        assert (cache.hits, cache.misses) == (3, 3)
+
+    assert summarize(first) == expected
+    assert summarize(second) == expected
+
+
+def test_only_changed_or_new_traces_are_processed(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+
+    with ResultCache(path) as cache:
+        run_log(load_traces(), seed=5, cache=cache)
+
+    traces = load_traces()
+    traces[1][0]["org:resource"] = "changed"
+    traces.append(load_event_log("data/input/test/log_original.xes")[0])
+    traces[-1].attributes["concept:name"] = "new_case"
+
+    # reabierta desde disco
+    with ResultCache(path) as cache:
+        results = run_log(traces, workers=2, seed=5, cache=cache)
+        print(f"hits={cache.hits} misses={cache.misses}")
+        assert (cache.hits, cache.misses) == (2, 2)
+
+        run_log(load_traces(), seed=6, cache=cache)
+        assert cache.misses == 5
+
+    assert [r["evidence"]["trace_id"] for r in results] == \
+        [t.attributes["concept:name"] for t in traces]
+
+
+def test_rows_of_other_versions_are_deleted_on_open(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+
+    with ResultCache(path, version="old") as cache:
+        run_log(load_traces(), seed=5, cache=cache)
+        assert len(cache) == 3
+
+    with ResultCache(path, version="new") as cache:
+        assert len(cache) == 0
+
+
+def test_prune_drops_keys_not_used_in_the_run(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+
+    with ResultCache(path) as cache:
+        run_log(load_traces(), seed=5, cache=cache)
+
+    def changed_log():
+        traces = load_traces()
+        traces[1][0]["org:resource"] = "changed"
+        del traces[2]
+        return traces
+
+    with ResultCache(path) as cache:
+        run_log(changed_log(), seed=5, cache=cache)
+        assert len(cache) == 4
+
+        removed = cache.prune()
+        print(f"removed={removed}")
+        assert removed == 2
+        assert len(cache) == 2
+
+        run_log(changed_log(), seed=5, cache=cache)
+        assert (cache.hits, cache.misses) == (3, 1)
+
+
+def test_cached_run_reads_a_bounded_window_ahead(tmp_path):
+    def doubled_log():
+        return load_traces() + load_traces()
+
+    read = []
+
+    def counted(traces):
+        for trace in traces:
+            read.append(trace)
+            yield trace
+
+    with ResultCache(str(tmp_path / "cache.sqlite")) as cache:
+        run_log(doubled_log(), seed=5, cache=cache)
+        hits, misses = cache.hits, cache.misses
+
+        results = iter_run_log(
+            counted(doubled_log()), workers=2, seed=5, cache=cache
+        )
+        next(results)
+        print(f"read before the first result: {len(read)}")
+        # dos ventanas de chunksize * workers trazas
+        assert len(read) == 4
+
+        assert len(list(results)) == 5
+        assert (cache.hits, cache.misses) == (hits + 6, misses)
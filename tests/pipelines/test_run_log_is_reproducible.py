@@ -0,0 +1,21 @@
+from gdpr.pipelines import run_log
+
+from pipeline_helpers import load_traces, summarize
+
+
+def test_parallel_run_matches_serial_run():
+    serial = run_log(load_traces(), workers=1, seed=7)
+    parallel = run_log(load_traces(), workers=2, chunksize=1, seed=7)
+
+    for record in summarize(serial):
+        print(record[:4])
+
+    assert len(serial) == len(parallel)
+    assert summarize(serial) == summarize(parallel)
+
+
+def test_run_log_is_reproducible_per_seed():
+    first = run_log(load_traces(), seed=3)
+    second = run_log(load_traces(), seed=3)
+
+    assert summarize(first) == summarize(second)
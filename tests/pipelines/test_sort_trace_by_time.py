@@ -0,0 +1,51 @@
+import random
+from datetime import datetime, timedelta
+
+from pm4py.objects.log.obj import Event, Trace
+
+from gdpr.trace_index import invalidate_trace_index
+from gdpr.utils import sort_trace_by_time
+
+
+def build_trace(rng, n_sorted, n_tail):
+    t0 = datetime(2024, 1, 1)
+    minutes = sorted(rng.randint(0, 50) for _ in range(n_sorted))
+    minutes += [rng.randint(0, 60) for _ in range(n_tail)]
+
+    return Trace([
+        Event({"concept:name": f"e{i}", "time:timestamp": t0 + timedelta(minutes=m)})
+        for i, m in enumerate(minutes)
+    ])
+
+
+def test_sort_matches_stable_full_sort():
+    rng = random.Random(0)
+
+    for _ in range(200):
+        trace = build_trace(rng, rng.randint(0, 30), rng.randint(0, 10))
+        expected = sorted(trace, key=lambda e: e["time:timestamp"])
+
+        sort_trace_by_time(trace)
+
+        assert [e["concept:name"] for e in trace] == [
+            e["concept:name"] for e in expected
+        ]
+
+
+def test_sorted_flag_and_invalidation():
+    trace = build_trace(random.Random(1), 20, 5)
+
+    sort_trace_by_time(trace)
+    events = trace._list
+
+    # segunda llamada: sin cambios en la lista, no se reordena
+    sort_trace_by_time(trace)
+    assert trace._list is events
+
+    # cambio de timestamp in-place → hay que invalidar
+    trace[0]["time:timestamp"] += timedelta(days=1)
+    invalidate_trace_index(trace)
+    sort_trace_by_time(trace)
+
+    print(f"Last event: {trace[-1]['concept:name']}")
+    assert trace[-1] is events[0]
@@ -0,0 +1,79 @@
+import random
+
+from gdpr.importers import load_event_log
+from gdpr.pipelines import build_compliant_trace, process_trace
+from gdpr.sticky_policies import (
+    StickyPolicyBuilder,
+    build_sticky_policy_from_trace,
+    derive_sticky_policy,
+)
+from gdpr.trace_overlay import shared_prefix
+
+
+def full_build(trace):
+    return StickyPolicyBuilder.from_trace(trace).snapshot()
+
+
+def test_derived_sticky_policy_matches_full_build():
+    for seed in range(20):
+        trace = load_event_log("data/input/test/log_long_case.xes")[0]
+        result = process_trace(trace, rng=random.Random(seed))
+        compliant = result["compliant"]
+        non_compliant = result["non_compliant"]
+        remediated = result["remediated"]
+
+        for variant in (compliant, non_compliant, remediated):
+            assert variant.attributes["gdpr:sticky_policy"] == \
+                full_build(variant)
+        assert build_sticky_policy_from_trace(compliant) == \
+            full_build(compliant)
+
+        print(
+            f"seed={seed} prefix={shared_prefix(compliant, non_compliant)}"
+            f"/{len(non_compliant)}"
+        )
+
+        assert derive_sticky_policy(non_compliant, compliant) == \
+            full_build(non_compliant)
+        assert derive_sticky_policy(remediated, non_compliant) == \
+            full_build(remediated)
+
+
+def test_snapshots_are_independent_of_the_builder():
+    trace = build_compliant_trace(
+        load_event_log("data/input/test/log_long_case.xes")[0]
+    )
+
+    builder = StickyPolicyBuilder(trace.attributes["concept:name"])
+    half = len(trace) // 2
+    for event in trace[:half]:
+        builder.feed(event)
+
+    first = builder.snapshot()
+    before = (
+        set(first.permissions), len(first.access_history),
+        {k: dict(v) for k, v in first.third_parties.items()}
+    )
+
+    for event in trace[half:]:
+        builder.feed(event)
+
+    assert (
+        set(first.permissions), len(first.access_history),
+        {k: dict(v) for k, v in first.third_parties.items()}
+    ) == before
+    assert builder.snapshot() == full_build(trace)
+
+
+def test_resume_at_continues_from_a_checkpoint():
+    trace = build_compliant_trace(
+        load_event_log("data/input/test/log_long_case.xes")[0]
+    )
+    builder = StickyPolicyBuilder.from_trace(trace)
+
+    for position in (0, 1, len(trace) // 2, len(trace)):
+        resumed = builder.resume_at(position)
+        assert resumed.position <= position
+
+        resumed.feed_trace(trace)
+        assert resumed.snapshot() == builder.snapshot()
@@ -0,0 +1,75 @@
+import pickle
+from datetime import datetime, timedelta
+
+from gdpr.importers import load_event_log
+from gdpr.pipelines import build_compliant_trace
+from gdpr.sticky_policies import (
+    AccessHistory,
+    StickyPolicy,
+    ThirdPartyRecord,
+    build_sticky_policy_from_trace,
+)
+
+
+def test_access_history_behaves_like_a_list_of_dicts():
+    t0 = datetime(2024, 1, 1, 10, 0, 0)
+    entries = [
+        {
+            "timestamp": t0 + timedelta(hours=i),
+            "access": "write" if i % 2 else "read",
+            "purpose": "service_provision",
+            "actor": None if i == 2 else f"user_{i}",
+            "activity": "gdpr:readData",
+        }
+        for i in range(5)
+    ]
+
+    history = AccessHistory(entries)
+
+    assert len(history) == 5
+    assert history == entries
+    assert list(history) == entries
+    assert history[-1] == entries[-1]
+    assert history[1:3] == entries[1:3]
+    assert repr(history) == repr(entries)
+
+    assert history.has_access_after(t0 + timedelta(hours=3))
+    assert not history.has_access_after(t0 + timedelta(hours=4))
+
+    copy = history.copy()
+    copy.append(entries[0])
+    assert len(history) == 5 and len(copy) == 6
+
+
+def test_third_party_record_keeps_dict_interface():
+    tp = ThirdPartyRecord(role="independent_controller", country="US")
+    tp["purposes"].add("marketing")
+    tp["active"] = False
+
+    assert tp.get("country") == "US"
+    assert tp.get("unknown", "default") == "default"
+    assert dict(tp)["purposes"] == {"marketing"}
+    assert not tp.active
+    assert repr(tp) == repr(dict(tp.items()))
+
+    copy = tp.copy()
+    copy.purposes.add("analytics")
+    assert tp.purposes == {"marketing"}
+
+
+def test_sticky_policy_is_slotted_and_picklable():
+    trace = build_compliant_trace(
+        load_event_log("data/input/test/log_long_case.xes")[0]
+    )
+    sp = build_sticky_policy_from_trace(trace)
+
+    print(f"Accesses: {len(sp.access_history)}")
+
+    assert not hasattr(sp, "__dict__")
+    assert isinstance(sp.access_history, AccessHistory)
+    assert pickle.loads(pickle.dumps(sp)) == sp
+
+    legacy = StickyPolicy(
+        data_id="legacy", access_history=list(sp.access_history)
+    )
+    assert legacy.access_history == sp.access_history
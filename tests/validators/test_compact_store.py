@@ -0,0 +1,35 @@
+from gdpr.compact import CompactLog
+from gdpr.validators.validators import validate_trace
+
+from validator_helpers import build_traces, violation_key
+
+
+def test_compact_log_roundtrip_and_validation():
+    for seed in range(5):
+        traces = build_traces(seed)
+        views = list(CompactLog.from_traces(traces))
+
+        print(f"seed={seed} | events={sum(len(t) for t in views)}")
+
+        for trace, view in zip(traces, views):
+            assert [dict(e) for e in view] == [dict(e) for e in trace]
+
+            assert violation_key(view, validate_trace(view)) == (
+                violation_key(trace, validate_trace(trace))
+            )
+
+
+def test_compact_event_writes():
+    log = CompactLog.from_traces(build_traces(0)[:1])
+    event = log[0][0]
+
+    event["gdpr:access"] = True
+    event["gdpr:purpose"] = "unauthorized_purpose"
+    event["gdpr:violations"] = [{"type": "purpose_violation"}]
+    del event["gdpr:event"]
+
+    view = log[0][0]
+    assert view["gdpr:access"] is True
+    assert view["gdpr:purpose"] == "unauthorized_purpose"
+    assert view["gdpr:violations"] == [{"type": "purpose_violation"}]
+    assert "gdpr:event" not in view
@@ -0,0 +1,118 @@
+import random
+from datetime import datetime, timedelta, timezone
+
+from gdpr.validators.dataframe import log_to_dataframe, validate_log_dataframe
+from gdpr.validators.validators import validate_trace_sequential
+from gdpr.vocabulary import GDPR_EVENTS
+
+from validator_helpers import DummyTrace, build_traces, build_unsorted_trace
+
+
+def expected(trace):
+    positions = {id(e): i for i, e in enumerate(trace)}
+    return [
+        (v["type"], v["severity"], v.get("blocking", False), v["message"],
+         [positions[id(e)] for e in v["events"]])
+        for v in validate_trace_sequential(trace)
+        if not v["type"].startswith("sp_")
+    ]
+
+
+def test_dataframe_validation_matches_per_trace_validators():
+    for seed in range(5):
+        traces = build_traces(seed) + [build_unsorted_trace()]
+        for i, trace in enumerate(traces):
+            trace.attributes["concept:name"] = f"case_{i}"
+
+        df = log_to_dataframe(traces)
+
+        # casos intercalados (se mantiene el orden dentro de cada caso)
+        df["rank"] = df.groupby("case_id").cumcount()
+        df = df.sort_values("rank", kind="stable").drop(columns="rank")
+
+        violations = validate_log_dataframe(df)
+        print(f"seed={seed} | rows={len(df)} | violations={len(violations)}")
+
+        for trace in traces:
+            case_id = trace.attributes["concept:name"]
+            case_rows = df.index[df["case_id"] == case_id].tolist()
+            rows = violations[violations["case_id"] == case_id]
+
+            found = [
+                (r.type, r.severity, r.blocking, r.message,
+                 [case_rows.index(label) for label in r.events])
+                for r in rows.itertuples()
+            ]
+            assert found == expected(trace)
+
+
+def check_against_validators(traces):
+    df = log_to_dataframe(traces)
+    violations = validate_log_dataframe(df)
+
+    for trace in traces:
+        case_id = trace.attributes["concept:name"]
+        case_rows = df.index[df["case_id"] == case_id].tolist()
+        rows = violations[violations["case_id"] == case_id]
+
+        found = [
+            (r.type, r.severity, r.blocking, r.message,
+             [case_rows.index(label) for label in r.events])
+            for r in rows.itertuples()
+        ]
+        print(f"{case_id}: {[f[0] for f in found]}")
+        assert found == expected(trace)
+
+
+def test_log_without_consent():
+    t0 = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    traces = []
+    for i in range(2):
+        trace = DummyTrace([
+            {"concept:name": "read", "time:timestamp": t0,
+             "gdpr:access": True},
+            {"concept:name": GDPR_EVENTS["BREACH"],
+             "time:timestamp": t0 + timedelta(hours=1)},
+        ])
+        trace.attributes["concept:name"] = f"case_{i}"
+        traces.append(trace)
+
+    check_against_validators(traces)
+
+
+def test_single_case_with_consent_after_access():
+    t0 = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    trace = DummyTrace([
+        {"concept:name": "read", "time:timestamp": t0, "gdpr:access": True},
+        {"concept:name": GDPR_EVENTS["CONSENT"],
+         "time:timestamp": t0 + timedelta(hours=1),
+         "gdpr:consent_type": "explicit"},
+    ])
+
+    check_against_validators([trace])
+
+
+def test_case_with_thousands_of_deadlines():
+    # miles de solicitudes y respuestas en un caso, fuera de orden
+    # temporal y con solicitudes sin responder
+    rng = random.Random(0)
+    t0 = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    events = []
+    for request, response in (("BREACH", "NOTIFY_BREACH"),
+                              ("REQUEST_INFO", "PROVIDE_INFO")):
+        for _ in range(1500):
+            events.append({
+                "concept:name": GDPR_EVENTS[request],
+                "time:timestamp": t0 + timedelta(hours=rng.randint(0, 50_000)),
+            })
+            if rng.random() < 0.9:
+                events.append({
+                    "concept:name": GDPR_EVENTS[response],
+                    "time:timestamp":
+                        t0 + timedelta(hours=rng.randint(0, 50_000)),
+                })
+    rng.shuffle(events)
+
+    trace = DummyTrace(events)
+    trace.attributes["concept:name"] = "long_case"
+    check_against_validators([trace])
@@ -0,0 +1,107 @@
+import random
+from datetime import datetime, timedelta
+
+from pm4py.objects.log.obj import Event, Trace
+
+from gdpr.deadlines import DeadlineScheduler
+from gdpr.trace_index import invalidate_trace_index
+from gdpr.validators.engine import (
+    BreachNotificationRule,
+    DataSubjectRightsRule,
+    FusedValidator,
+)
+from gdpr.validators.phase5_breach import validate_breach_notification_time
+from gdpr.validators.phase6_rights_arco import validate_data_subject_rights
+
+T0 = datetime(2024, 1, 1)
+
+
+def reference(trace, request_name, response_name, deadline):
+    # emparejamiento cuadrático original
+    requests = [e for e in trace if e["concept:name"] == request_name]
+    responses = [e for e in trace if e["concept:name"] == response_name]
+
+    result = []
+    for req in requests:
+        later = [r for r in responses if r["time:timestamp"] > req["time:timestamp"]]
+        if not later:
+            result.append(("missing", req["time:timestamp"]))
+        elif later[0]["time:timestamp"] > req["time:timestamp"] + deadline:
+            result.append(("late", req["time:timestamp"], later[0]["time:timestamp"]))
+    return result
+
+
+def summarize(violations):
+    return [
+        ("missing", v["events"][0]["time:timestamp"])
+        if v["type"].startswith("missing") else
+        ("late", v["events"][0]["time:timestamp"], v["events"][1]["time:timestamp"])
+        for v in violations
+    ]
+
+
+def random_trace(rng, request_name, response_name, n):
+    # timestamps desordenados: la respuesta usada es la primera en
+    # orden de la traza, no la más próxima en el tiempo
+    trace = Trace()
+    for _ in range(n):
+        trace.append(Event({
+            "concept:name": rng.choice([request_name, response_name]),
+            "time:timestamp": T0 + timedelta(hours=rng.randint(0, 2000)),
+        }))
+    return trace
+
+
+def test_scheduler_matches_quadratic_matching():
+    rng = random.Random(0)
+    cases = (
+        (BreachNotificationRule, validate_breach_notification_time,
+         timedelta(hours=72)),
+        (DataSubjectRightsRule, validate_data_subject_rights,
+         timedelta(days=30)),
+    )
+
+    for rule, validator, deadline in cases:
+        for _ in range(300):
+            trace = random_trace(
+                rng, rule.request_name, rule.response_name, rng.randint(0, 30)
+            )
+            expected = reference(
+                trace, rule.request_name, rule.response_name, deadline
+            )
+
+            invalidate_trace_index(trace)
+            assert summarize(validator(trace)) == expected
+            assert summarize(FusedValidator(trace, (rule,)).run(trace)) == \
+                expected
+
+
+def test_expire_resolve_and_discard():
+    scheduler = DeadlineScheduler()
+    deadline = timedelta(hours=72)
+
+    a = scheduler.request("case_a", "breach_a", T0, deadline)
+    b = scheduler.request("case_b", "breach_b", T0 + timedelta(hours=10), deadline)
+    assert len(scheduler) == 2
+    assert scheduler.expire(T0 + timedelta(hours=72)) == []
+
+    # vence a (su plazo es anterior al watermark); b sigue en plazo
+    assert scheduler.expire(T0 + timedelta(hours=73)) == [a]
+    assert a.overdue and a.is_open
+    assert scheduler.expire(T0 + timedelta(hours=80)) == []
+
+    # una respuesta solo resuelve obligaciones de su clave
+    assert scheduler.respond("case_b", "notify_b", T0 + timedelta(hours=20)) == [b]
+    assert not b.late and b.response == "notify_b"
+    late = scheduler.respond("case_a", "notify_a", T0 + timedelta(hours=90))
+    assert late == [a] and a.late
+
+    # respuesta previa en la llegada pero posterior en el tiempo
+    c = scheduler.request("case_a", "breach_c", T0 + timedelta(hours=50), deadline)
+    assert c.response == "notify_a" and not c.late
+
+    d = scheduler.request("case_c", "breach_d", T0, deadline)
+    assert scheduler.pending("case_c") == [d]
+    assert scheduler.discard("case_c") == [d]
+    assert scheduler.expire(T0 + timedelta(days=30)) == []
+    assert len(scheduler) == 0
@@ -0,0 +1,46 @@
+import copy
+import random
+
+from gdpr.importers import load_event_log
+from gdpr.pipelines import build_compliant_trace, build_non_compliant_trace
+from gdpr.sticky_policies import build_sticky_policy_from_trace
+from gdpr.validators.validators import validate_trace, validate_trace_sequential
+
+
+def violation_key(violations):
+    return [
+        (
+            v["type"],
+            v["severity"],
+            v["message"],
+            v.get("blocking"),
+            tuple(id(e) for e in v["events"])
+        )
+        for v in violations
+    ]
+
+
+def test_fused_engine_matches_sequential_validators():
+    logs = [
+        load_event_log("data/input/test/log_original.xes"),
+        load_event_log("data/input/test/log_long_case.xes"),
+        load_event_log("data/input/test/log_with_erasure.xes"),
+    ]
+
+    for seed in range(20):
+        random.seed(seed)
+
+        for original in (trace for log in logs for trace in log):
+            compliant = build_compliant_trace(copy.deepcopy(original))
+            non_compliant = build_non_compliant_trace(compliant)
+            non_compliant.attributes["gdpr:sticky_policy"] = (
+                build_sticky_policy_from_trace(non_compliant)
+            )
+
+            for trace in (compliant, non_compliant):
+                fused = validate_trace(trace)
+                sequential = validate_trace_sequential(trace)
+
+                print(f"seed={seed} | violations={len(fused)}")
+
+                assert violation_key(fused) == violation_key(sequential)
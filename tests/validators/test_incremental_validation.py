@@ -0,0 +1,132 @@
+import random
+from datetime import timedelta
+
+from pm4py.objects.log.obj import Trace
+
+from gdpr.importers import load_event_log
+from gdpr.pipelines import build_compliant_trace, build_non_compliant_trace
+from gdpr.sticky_policies import build_sticky_policy_from_trace
+from gdpr.validators.incremental import (
+    IncrementalLogValidator,
+    IncrementalValidator,
+)
+from gdpr.validators.validators import validate_trace
+from gdpr.vocabulary import GDPR_EVENTS
+
+
+def summarize(violations):
+    return [
+        (
+            v["type"],
+            v["message"],
+            [(e["concept:name"], e["time:timestamp"]) for e in v["events"]],
+        )
+        for v in violations
+    ]
+
+
+def full_validation(events, attributes):
+    trace = Trace(list(events), attributes=dict(attributes))
+    trace.attributes["gdpr:sticky_policy"] = \
+        build_sticky_policy_from_trace(trace)
+    return summarize(validate_trace(trace))
+
+
+def non_compliant_traces():
+    rng = random.Random(3)
+    traces = []
+    for path in (
+        "data/input/test/log_original.xes",
+        "data/input/test/log_long_case.xes",
+        "data/input/test/log_with_erasure.xes",
+    ):
+        for trace in load_event_log(path):
+            compliant = build_compliant_trace(trace, rng=rng)
+            traces.append(build_non_compliant_trace(compliant, rng=rng))
+    return traces
+
+
+def test_incremental_matches_full_validation_after_each_batch():
+    rng = random.Random(0)
+
+    for trace in non_compliant_traces():
+        events = list(trace)
+        state = IncrementalValidator(trace.attributes)
+        current = []
+
+        i = 0
+        while i < len(events):
+            k = rng.randint(1, 6)
+            delta = state.extend(events[i:i + k])
+            i += k
+
+            for v in summarize(delta["resolved"]):
+                current.remove(v)
+            current.extend(summarize(delta["added"]))
+
+            expected = full_validation(events[:i], trace.attributes)
+            assert summarize(state.violations) == expected
+            assert sorted(current) == sorted(expected)
+
+        print(f"{trace.attributes['concept:name']}: {len(current)} violaciones")
+
+
+def test_breach_notification_resolves_missing_notification():
+    trace = build_compliant_trace(
+        load_event_log("data/input/log_original.xes")[0]
+    )
+    breach_time = trace[-1]["time:timestamp"] + timedelta(minutes=1)
+
+    state = IncrementalValidator(trace.attributes)
+    state.extend(trace)
+
+    delta = state.extend([{
+        "concept:name": GDPR_EVENTS["BREACH"],
+        "time:timestamp": breach_time,
+        "gdpr:event": True,
+        "gdpr:actor": "Controller"
+    }])
+    assert [v["type"] for v in delta["added"]] == \
+        ["missing_breach_notification"]
+
+    delta = state.extend([{
+        "concept:name": GDPR_EVENTS["NOTIFY_BREACH"],
+        "time:timestamp": breach_time + timedelta(hours=1),
+        "gdpr:event": True,
+        "gdpr:actor": "Controller"
+    }])
+    print(delta)
+    assert delta["added"] == []
+    assert [v["type"] for v in delta["resolved"]] == \
+        ["missing_breach_notification"]
+
+
+def test_checkpoints_only_evaluate_new_events(tmp_path):
+    path = str(tmp_path / "checkpoints.sqlite")
+    traces = non_compliant_traces()
+
+    with IncrementalLogValidator(path) as store:
+        for trace in traces:
+            store.update(Trace(trace[:len(trace) // 2],
+                               attributes=trace.attributes))
+
+    with IncrementalLogValidator(path) as store:
+        for trace in traces:
+            case_id = trace.attributes["concept:name"]
+            assert store.position(case_id) == len(trace) // 2
+            store.update(trace)
+            assert store.case(case_id).position == len(trace)
+
+            assert summarize(store.case(case_id).violations) == \
+                full_validation(trace, trace.attributes)
+
+        # sin eventos nuevos: delta vacío
+        assert store.update(traces[0]) == {"added": [], "resolved": []}
+
+        # traza más corta que lo procesado: se valida de nuevo
+        case_id = traces[0].attributes["concept:name"]
+        previous = summarize(store.case(case_id).violations)
+        delta = store.update(Trace(traces[0][:1],
+                                   attributes=traces[0].attributes))
+        assert summarize(delta["resolved"]) == previous
+        assert store.position(case_id) == 1
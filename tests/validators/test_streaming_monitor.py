@@ -0,0 +1,170 @@
+import json
+import random
+import socket
+import threading
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+from gdpr.importers import load_event_log
+from gdpr.monitor import ComplianceMonitor, socket_events, tail_events
+from gdpr.pipelines import build_compliant_trace, build_non_compliant_trace
+from gdpr.trace_index import invalidate_trace_index
+from gdpr.validators.validators import validate_trace
+from gdpr.vocabulary import GDPR_EVENTS
+
+T0 = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def event(name, hours, **attributes):
+    return {"concept:name": name, "time:timestamp": T0 + timedelta(hours=hours),
+            **attributes}
+
+
+def key(v):
+    return (
+        v["type"],
+        tuple((e["concept:name"], e["time:timestamp"]) for e in v["events"]),
+    )
+
+
+def test_monitor_matches_batch_validation():
+    # con casos más largos que `max_case_events` las reglas de fin de
+    # caso se compactan varias veces: el resultado no cambia
+    for max_case_events in (10_000, 3):
+        check_against_batch(max_case_events)
+
+
+def check_against_batch(max_case_events):
+    rng = random.Random(1)
+
+    for path in (
+        "data/input/test/log_original.xes",
+        "data/input/test/log_long_case.xes",
+        "data/input/test/log_with_erasure.xes",
+    ):
+        for trace in load_event_log(path):
+            trace = build_non_compliant_trace(
+                build_compliant_trace(trace, rng=rng), rng=rng
+            )
+            trace.attributes.pop("gdpr:sticky_policy", None)
+            invalidate_trace_index(trace)
+            expected = Counter(map(key, validate_trace(trace)))
+
+            monitor = ComplianceMonitor(max_case_events=max_case_events)
+            found = []
+            for e in trace:
+                found.extend(monitor.feed("case", e, trace.attributes))
+            found.extend(monitor.close_all())
+
+            # un plazo vencido se avisa antes de la respuesta tardía
+            late = {key(v)[1][:1] for v in found if v["type"].startswith("late_")}
+            extra = Counter(map(key, found)) - expected
+            print(max_case_events, path, sorted(expected), sorted(extra))
+
+            assert not expected - Counter(map(key, found))
+            assert all(
+                t.startswith("missing_") and events in late
+                for t, events in extra
+            )
+            assert all(v["case_id"] == "case" for v in found)
+
+
+def test_violations_fire_when_decidable():
+    monitor = ComplianceMonitor()
+    no_access = {"gdpr:access": False}
+
+    assert monitor.feed("a", event(GDPR_EVENTS["ERASE"], 0, **no_access)) == []
+    found = monitor.feed("a", event("read", 1, **{"gdpr:access": True,
+                                                 "gdpr:operation": "read"}))
+    assert "access_after_erasure" in [v["type"] for v in found]
+
+    # brecha: nada hasta que vence el plazo de 72 h
+    assert monitor.feed("b", event(GDPR_EVENTS["BREACH"], 2)) == []
+    assert monitor.advance(T0 + timedelta(hours=74)) == []
+    found = monitor.advance(T0 + timedelta(hours=75, seconds=1))
+    assert [(v["type"], v["case_id"]) for v in found] == \
+        [("missing_breach_notification", "b")]
+
+    # la notificación tardía se registra; el cierre no repite el aviso
+    found = monitor.feed("b", event(GDPR_EVENTS["NOTIFY_BREACH"], 80))
+    assert [v["type"] for v in found] == ["late_breach_notification"]
+    assert monitor.close("b") == []
+
+
+def test_end_of_case_rules_span_compactions():
+    monitor = ComplianceMonitor(max_case_events=2)
+    access = {"gdpr:access": True}
+
+    # acceso en el primer bloque, borrado en el segundo
+    found = monitor.feed("a", event("read", 0, **access))
+    found += monitor.feed("a", event("other", 1))
+    found += monitor.feed("a", event(GDPR_EVENTS["ERASE"], 2))
+    found += monitor.close("a")
+    assert "erase_without_processing" not in [v["type"] for v in found]
+
+    # consentimiento en un bloque posterior al acceso
+    found = monitor.feed("b", event("read", 0, **access))
+    found += monitor.feed("b", event("other", 1))
+    found += monitor.feed("b", event(GDPR_EVENTS["CONSENT"], 2))
+    found += monitor.close("b")
+    types = [v["type"] for v in found]
+    print(types)
+    assert "consent_after_access" in types
+    assert "missing_consent" not in types
+
+
+def test_state_is_bounded():
+    monitor = ComplianceMonitor(max_cases=2, idle_timeout=timedelta(days=1))
+    access = {"gdpr:access": True, "gdpr:purpose": None}
+
+    for i, case_id in enumerate("abc"):
+        found = monitor.feed(case_id, event("read", i, **access))
+    # al abrir "c" se expulsa "a" y se evalúan sus reglas de fin de caso
+    assert len(monitor) == 2
+    assert {(v["type"], v["case_id"]) for v in found} >= \
+        {("missing_consent", "a")}
+
+    found = monitor.feed("d", event("read", 100, **access))
+    assert len(monitor) == 1
+    assert {v["case_id"] for v in found} >= {"b", "c"}
+
+
+def write_records(f, case_id, n):
+    for i in range(n):
+        f.write(json.dumps({
+            "case_id": case_id,
+            "activity": GDPR_EVENTS["BREACH"] if i == 0 else "read",
+            "timestamp": (T0 + timedelta(hours=40 * i)).isoformat(),
+            "gdpr_access": i > 0,
+            "case:gdpr_default_purpose": "care",
+        }) + "\n")
+
+
+def test_file_and_socket_sources(tmp_path):
+    path = tmp_path / "events.jsonl"
+    with open(path, "w") as f:
+        write_records(f, "tail", 3)
+
+    found = list(ComplianceMonitor().run(tail_events(str(path), follow=False)))
+    types = Counter(v["type"] for v in found)
+    print(types)
+    assert types["missing_breach_notification"] == 1
+    assert types["purpose_violation"] == 2
+
+    server = socket.create_server(("127.0.0.1", 0))
+
+    def send():
+        conn, _ = server.accept()
+        with conn, conn.makefile("w") as f:
+            write_records(f, "socket", 3)
+
+    thread = threading.Thread(target=send)
+    thread.start()
+    source = socket_events(server.getsockname())
+    found_socket = list(ComplianceMonitor().run(source))
+    thread.join()
+    server.close()
+
+    assert sorted(key(v) for v in found_socket) == \
+        sorted(key(v) for v in found)
+    assert {v["case_id"] for v in found_socket} == {"socket"}
@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta
+
+from pm4py.objects.log.obj import Event, Trace
+
+from gdpr.importers import load_event_log
+from gdpr.pipelines import build_compliant_trace
+from gdpr.trace_index import (
+    get_trace_index,
+    invalidate_trace_index,
+    trace_cache_scope,
+)
+from gdpr.utils import sort_trace_by_time
+from gdpr.validators.phase3_rights import validate_access_after_erasure
+from gdpr.vocabulary import GDPR_EVENTS
+
+
+def test_trace_index_is_rebuilt_when_trace_changes():
+    log = load_event_log("data/input/log_original.xes")
+    trace = build_compliant_trace(log[0])
+
+    with trace_cache_scope():
+        check_cached_index(trace)
+
+    # fuera del ámbito no queda ninguna caché
+    assert not hasattr(trace, "_gdpr_index")
+    assert get_trace_index(trace) is not get_trace_index(trace)
+
+
+def check_cached_index(trace):
+    index = get_trace_index(trace)
+    assert get_trace_index(trace) is index, "The index should be cached"
+
+    access_events = index.access_events()
+    print(f"Access events: {len(access_events)}")
+    assert access_events, "A compliant trace should contain accesses"
+
+    # 1️⃣ Cambio estructural → invalidación automática
+    trace.append({
+        "concept:name": GDPR_EVENTS["ERASE"],
+        "time:timestamp": trace[-1]["time:timestamp"] + timedelta(seconds=1),
+        "gdpr:event": True
+    })
+
+    index = get_trace_index(trace)
+    assert index.has(GDPR_EVENTS["ERASE"])
+
+    # 2️⃣ Cambio de atributos in-place → invalidación explícita
+    access_events[0]["gdpr:access"] = False
+    invalidate_trace_index(trace)
+
+    index = get_trace_index(trace)
+    assert len(index.access_events()) == len(access_events) - 1
+
+
+def test_in_place_changes_outside_scope_are_seen():
+    t0 = datetime(2024, 1, 1)
+    trace = Trace([
+        Event({"concept:name": GDPR_EVENTS["ERASE"], "time:timestamp": t0}),
+        Event({"concept:name": "A", "time:timestamp": t0 + timedelta(hours=1)}),
+    ])
+
+    assert validate_access_after_erasure(trace) == []
+    sort_trace_by_time(trace)
+
+    # evento modificado in-place
+    trace[1]["gdpr:access"] = True
+    violations = validate_access_after_erasure(trace)
+    print(f"in-place: {[v['type'] for v in violations]}")
+    assert [v["type"] for v in violations] == ["access_after_erasure"]
+
+    # evento sustituido (misma lista, misma longitud)
+    trace[1]["gdpr:access"] = False
+    assert validate_access_after_erasure(trace) == []
+    trace[1] = Event({
+        "concept:name": "A",
+        "time:timestamp": t0 + timedelta(hours=1),
+        "gdpr:access": True,
+    })
+    assert len(validate_access_after_erasure(trace)) == 1
+
+    # timestamp modificado in-place: se vuelve a ordenar
+    trace[0]["time:timestamp"] = t0 + timedelta(hours=2)
+    sort_trace_by_time(trace)
+    assert trace[-1]["concept:name"] == GDPR_EVENTS["ERASE"]
@@ -0,0 +1,51 @@
+from gdpr.compact import CompactLog
+from gdpr.validators.validators import validate_trace_sequential
+from gdpr.validators.vectorized import (
+    validate_temporal_log,
+    validate_temporal_trace
+)
+
+from validator_helpers import build_traces, build_unsorted_trace, violation_key
+
+TEMPORAL_TYPES = {
+    "access_after_consent_expiration",
+    "access_after_withdrawal",
+    "access_during_restriction",
+    "access_after_erasure",
+    "missing_breach_notification",
+    "late_breach_notification",
+    "missing_right_response",
+    "late_right_response",
+}
+
+
+def expected(view):
+    return [
+        v for v in validate_trace_sequential(view)
+        if v["type"] in TEMPORAL_TYPES
+    ]
+
+
+def test_vectorized_temporal_rules_match_python_validators():
+    for seed in range(5):
+        traces = build_traces(seed) + [build_unsorted_trace()]
+        log = CompactLog.from_traces(traces)
+        views = list(log)
+
+        by_trace = validate_temporal_log(log)
+        total = 0
+
+        for i, view in enumerate(views):
+            reference = violation_key(view, expected(view))
+            total += len(reference)
+
+            assert violation_key(view, validate_temporal_trace(view)) == reference
+
+            # en modo log, eventos de otra vista: se comparan posiciones
+            whole = by_trace.get(i, [])
+            assert [
+                (v["type"], v["message"], [e.position - view.start for e in v["events"]])
+                for v in whole
+            ] == [(t, m, p) for t, _, _, m, p in reference]
+
+        print(f"seed={seed} | temporal violations={total}")
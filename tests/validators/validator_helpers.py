@@ -0,0 +1,73 @@
+import random
+from datetime import datetime, timedelta, timezone
+
+from gdpr.importers import load_event_log
+from gdpr.pipelines import build_compliant_trace, build_non_compliant_trace
+from gdpr.vocabulary import GDPR_EVENTS
+
+TEST_LOGS = (
+    "data/input/test/log_original.xes",
+    "data/input/test/log_long_case.xes",
+    "data/input/test/log_with_erasure.xes",
+)
+
+
+class DummyTrace(list):
+    def __init__(self, events):
+        super().__init__(events)
+        self.attributes = {"concept:name": "dummy"}
+
+
+def build_traces(seed):
+    """
+    Traza conforme y no conforme de cada log de prueba, generadas con
+    un `random.Random(seed)` compartido.
+    """
+    rng = random.Random(seed)
+    traces = []
+
+    for path in TEST_LOGS:
+        compliant = build_compliant_trace(load_event_log(path)[0], rng=rng)
+        traces.append(compliant)
+        traces.append(build_non_compliant_trace(compliant, rng=rng))
+
+    return traces
+
+
+def build_unsorted_trace():
+    """
+    Traza desordenada en el tiempo: la primera notificación en orden
+    de traza no es la más temprana.
+    """
+    t0 = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+    def event(name, hours, **attrs):
+        return {"concept:name": name, "time:timestamp": t0 + timedelta(hours=hours), **attrs}
+
+    return DummyTrace([
+        event(GDPR_EVENTS["BREACH"], 0),
+        event(GDPR_EVENTS["NOTIFY_BREACH"], 100),
+        event(GDPR_EVENTS["NOTIFY_BREACH"], 10),
+        event(GDPR_EVENTS["BREACH"], 200),
+        event(GDPR_EVENTS["REQUEST_INFO"], 5),
+        event(GDPR_EVENTS["RESTRICT"], 1),
+        event("write", 2, **{"gdpr:access": True, "gdpr:operation": "update"}),
+        event("read", 3, **{"gdpr:access": True}),
+        event(GDPR_EVENTS["LIFT_RESTRICTION"], 4),
+        event("write", 2, **{"gdpr:access": True, "gdpr:operation": "delete"}),
+        event(GDPR_EVENTS["ERASE"], 6, **{"gdpr:access": True}),
+        event("read", 7, **{"gdpr:access": 1, "gdpr:operation": ["read"]}),
+    ])
+
+
+def violation_key(trace, violations):
+    """
+    Violaciones comparables entre representaciones de la traza
+    (eventos como posiciones en ella).
+    """
+    positions = {id(e): i for i, e in enumerate(trace)}
+    return [
+        (v["type"], v["severity"], v.get("blocking"), v["message"],
+         [positions[id(e)] for e in v["events"]])
+        for v in violations
+    ]